@@ -9,10 +9,11 @@ __description__ = "Sequential model evaluation suite for semantic parsing perfor
 
 # Import main components for easy access
 from .config import MODEL_CONFIGS, get_model_config, get_model_list
-from .test_cases import get_test_cases, get_test_summary
+from .test_cases import get_test_cases, get_test_summary, load_test_cases
 from .model_evaluator import create_evaluator, TestResult
 from .results_manager import save_results, generate_comparative_report, print_summary
-from .prompt_manager import get_prompt, get_available_variants
+from .prompt_manager import get_prompt, get_available_variants, count_prompt_tokens
+from .parse_cache import ParseCache, normalize_utterance
 from .test_single_model import test_single_model
 from .run_sequential_tests import SequentialTestRunner
 
@@ -25,6 +26,7 @@ __all__ = [
     # Test cases
     'get_test_cases',
     'get_test_summary',
+    'load_test_cases',
     
     # Model evaluation
     'create_evaluator',
@@ -39,6 +41,11 @@ __all__ = [
     # Prompt management
     'get_prompt',
     'get_available_variants',
+    'count_prompt_tokens',
+    
+    # Production parsing
+    'ParseCache',
+    'normalize_utterance',
     
     # Test runners
     'SequentialTestRunner',
@@ -0,0 +1,303 @@
+"""
+Model Cascade for OdyTest - Model Evaluation Suite
+Cheapest model first, escalating on invalid JSON or low confidence, live or from result files
+"""
+
+import argparse
+import statistics
+import sys
+import os
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import get_model_config, get_model_list, CASCADE_CONFIG
+    from .test_cases import TestCase, get_test_cases
+    from .prompt_manager import get_available_variants
+    from .model_evaluator import create_evaluator
+    from .results_manager import results_manager
+    from .stats_utils import latency_percentiles, pareto_front
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import get_model_config, get_model_list, CASCADE_CONFIG # type: ignore
+    from test_cases import TestCase, get_test_cases
+    from prompt_manager import get_available_variants
+    from model_evaluator import create_evaluator
+    from results_manager import results_manager
+    from stats_utils import latency_percentiles, pareto_front
+
+# Per-stage fields the cascade needs; live results and results files both have them
+STAGE_FIELDS = ("model_name", "test_case_id", "input_query", "success", "json_validity",
+                "confidence_score", "intent_match", "inference_time")
+
+CaseKey = Tuple[str, str]
+
+def _case_key(result: Dict[str, Any], by_content: bool = False) -> CaseKey:
+    # Older results files number cases per run, so the input guards against mismatched suites.
+    # Those numbers never match content-hash IDs: by_content joins such files on the case itself
+    if by_content:
+        return result["input_query"], result["expected_intent"]
+    return result["test_case_id"], result["input_query"]
+
+def accepts(result: Dict[str, Any], threshold: float) -> bool:
+    """Whether a stage's parse is final: valid JSON with confidence above threshold"""
+    return bool(result["success"] and result["json_validity"]) and (result["confidence_score"] or 0.0) > threshold
+
+def simulate_threshold(stages: Sequence[Dict[CaseKey, Dict[str, Any]]], cases: Sequence[CaseKey],
+                       threshold: float) -> Dict[str, Any]:
+    """
+    Replay the cascade at one threshold over per-model results
+
+    A case's latency is the sum over the models it passed through. Results are
+    only needed for the stages a case actually reaches.
+    """
+    latencies, answered_by = [], [0] * len(stages)
+    correct = valid = escalated = 0
+    for key in cases:
+        latency = 0.0
+        for position, stage in enumerate(stages):
+            result = stage[key]
+            latency += result["inference_time"]
+            if position == len(stages) - 1 or accepts(result, threshold):
+                break
+        latencies.append(latency)
+        answered_by[position] += 1
+        correct += bool(result["intent_match"])
+        valid += bool(result["json_validity"])
+        escalated += position > 0
+
+    latency = latency_percentiles(latencies)
+    return {
+        "threshold": threshold,
+        "intent_accuracy": correct / len(cases),
+        "json_validity": valid / len(cases),
+        "mean_latency": statistics.mean(latencies),
+        "p95_latency": latency["p95"],
+        "latency": latency,
+        "escalation_rate": escalated / len(cases),
+        "answered_by": [count / len(cases) for count in answered_by]
+    }
+
+def cascade_curve(stages: Sequence[Dict[CaseKey, Dict[str, Any]]], model_names: List[str],
+                  cases: Sequence[CaseKey], thresholds: Sequence[float],
+                  max_accuracy_drop: float = CASCADE_CONFIG["max_accuracy_drop"]) -> Dict[str, Any]:
+    """Accuracy/latency of the cascade at every threshold, against each model on its own"""
+    single_models = []
+    for model_name, stage in zip(model_names, stages):
+        # In a live cascade later models only saw the escalated cases
+        if not all(key in stage for key in cases):
+            continue
+        results = [stage[key] for key in cases]
+        single_models.append({
+            "model_name": model_name,
+            "intent_accuracy": sum(bool(r["intent_match"]) for r in results) / len(results),
+            "json_validity": sum(bool(r["json_validity"]) for r in results) / len(results),
+            "mean_latency": statistics.mean(r["inference_time"] for r in results),
+            "p95_latency": latency_percentiles([r["inference_time"] for r in results])["p95"]
+        })
+
+    curve = [simulate_threshold(stages, cases, threshold) for threshold in sorted(thresholds)]
+    front = pareto_front(curve, {"intent_accuracy": "max", "mean_latency": "min"})
+    for position, point in enumerate(curve):
+        point["pareto_optimal"] = position in front
+
+    # Live runs only have the first model's answers for every case, so thresholds count as options too
+    reference = max(option["intent_accuracy"] for option in single_models + curve)
+    eligible = [p for p in curve if p["intent_accuracy"] >= reference - max_accuracy_drop]
+    recommended = (min(eligible, key=lambda p: p["mean_latency"]) if eligible
+                   else max(curve, key=lambda p: (p["intent_accuracy"], -p["mean_latency"])))
+    # A cascade only pays off if it is faster than the fastest model that is accurate enough alone
+    sufficient = [m for m in single_models if m["intent_accuracy"] >= reference - max_accuracy_drop]
+    fastest_single = min(sufficient, key=lambda m: m["mean_latency"]) if sufficient else None
+    return {
+        "models": model_names,
+        "test_cases": len(cases),
+        "single_models": single_models,
+        "reference_accuracy": reference,
+        "max_accuracy_drop": max_accuracy_drop,
+        "curve": curve,
+        "recommended_threshold": recommended["threshold"],
+        "meets_accuracy_target": bool(eligible),
+        "fastest_sufficient_model": fastest_single["model_name"] if fastest_single else None,
+        "cascade_pays_off": fastest_single is None or recommended["mean_latency"] < fastest_single["mean_latency"]
+    }
+
+class CascadeEvaluator:
+    """
+    Runs the cascade live: each case goes to the first model and is escalated
+    until a parse is accepted
+
+    The run uses the highest threshold of the sweep. A parse accepted at that
+    threshold is accepted at every lower one too, so the models each case
+    reached cover the whole curve and no case is run twice.
+    """
+
+    def __init__(self, model_keys: List[str], prompt_variant: str = "production",
+                 thresholds: Sequence[float] = CASCADE_CONFIG["thresholds"]):
+        self.model_configs = [get_model_config(key) for key in model_keys]
+        self.prompt_variant = prompt_variant
+        self.thresholds = list(thresholds)
+        self.evaluators = [create_evaluator(config) for config in self.model_configs]
+
+    def run(self, test_cases: Optional[List[TestCase]] = None) -> Optional[Dict[str, Any]]:
+        """Cascade every test case and report the curve over the thresholds"""
+        for config, evaluator in zip(self.model_configs, self.evaluators):
+            if not evaluator.test_model_availability():
+                print(f"❌ Model {config.name} is not available")
+                return None
+
+        test_cases = test_cases or get_test_cases()
+        ceiling = max(self.thresholds)
+        stages: List[Dict[CaseKey, Dict[str, Any]]] = [{} for _ in self.evaluators]
+        cases = []
+        for number, case in enumerate(test_cases, 1):
+            for stage, evaluator in zip(stages, self.evaluators):
+                result = evaluator.execute_test_case(case, self.prompt_variant)
+                record = {name: getattr(result, name) for name in STAGE_FIELDS}
+                stage[_case_key(record)] = record
+                if accepts(record, ceiling):
+                    break
+            cases.append(_case_key(record))
+            print(f"   🪜 {number}/{len(test_cases)}: answered by {record['model_name']}")
+
+        report = cascade_curve(stages, [config.name for config in self.model_configs], cases, self.thresholds)
+        report.update({
+            "source": "live",
+            "prompt_variant": self.prompt_variant,
+            "stage_results": [list(stage.values()) for stage in stages]
+        })
+        return report
+
+def load_stage_results(result_files: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Per-model results from saved runs, cheapest (lowest median latency) first
+
+    Only cases present in every file take part; for a model with several files
+    the latest run is used.
+    """
+    runs: Dict[str, Dict[str, Any]] = {}
+    for filepath in result_files:
+        data = results_manager.load_model_results(filepath)
+        if not data:
+            return None
+        metadata = data["metadata"]
+        current = runs.get(metadata["model_name"])
+        if current is None or metadata["timestamp"] > current["metadata"]["timestamp"]:
+            runs[metadata["model_name"]] = data
+
+    variants = {data["metadata"]["prompt_variant"] for data in runs.values()}
+    if len(variants) > 1:
+        print(f"⚠️  Results mix prompt variants: {', '.join(sorted(variants))}")
+
+    def median_latency(data: Dict[str, Any]) -> float:
+        latencies = [r["inference_time"] for r in data["detailed_results"] if r["success"]]
+        return statistics.median(latencies) if latencies else float("inf")
+
+    ordered = sorted(runs.values(), key=median_latency)
+    # Files written before content-hash IDs have int IDs numbered per run
+    numbered = {isinstance(r["test_case_id"], int) for data in ordered for r in data["detailed_results"]}
+    by_content = len(numbered) > 1
+    if by_content:
+        print("⚠️  Results mix numbered and content-hash case IDs; matching cases on input and expected intent")
+    stages = [{_case_key(r, by_content): {name: r.get(name) for name in STAGE_FIELDS}
+               for r in data["detailed_results"]}
+              for data in ordered]
+    cases = [key for key in stages[0] if all(key in stage for stage in stages[1:])] if stages else []
+    return {
+        "model_names": [data["metadata"]["model_name"] for data in ordered],
+        "prompt_variant": ", ".join(sorted(variants)),
+        "stages": stages,
+        "cases": cases
+    }
+
+def print_cascade_report(report: Dict[str, Any]):
+    """Print single models and the cascade at each threshold"""
+    print(f"\n📈 Cascade {' → '.join(report['models'])} ({report['prompt_variant']}, "
+          f"{report['test_cases']} cases, {report['source']})")
+    width = max([28] + [len(name) for name in report["models"]])
+    print(f"   {'':<{width}} {'accuracy':>8} {'json':>6} {'mean':>7} {'p95':>7} {'escalated':>9}")
+    for model in report["single_models"]:
+        print(f"   {model['model_name']:<{width}} {model['intent_accuracy']:>8.1%} {model['json_validity']:>6.1%} "
+              f"{model['mean_latency']:>6.2f}s {model['p95_latency']:>6.2f}s")
+    for point in report["curve"]:
+        marker = " ✅" if point["threshold"] == report["recommended_threshold"] else \
+            " ★" if point["pareto_optimal"] else ""
+        shares = " / ".join(f"{share:.0%}" for share in point["answered_by"])
+        print(f"   {'confidence > ' + format(point['threshold'], 'g'):<{width}} {point['intent_accuracy']:>8.1%} "
+              f"{point['json_validity']:>6.1%} {point['mean_latency']:>6.2f}s {point['p95_latency']:>6.2f}s "
+              f"{point['escalation_rate']:>9.1%}  ({shares}){marker}")
+    if report["meets_accuracy_target"]:
+        print(f"   ✅ Recommended threshold: {report['recommended_threshold']:g} "
+              f"(within {report['max_accuracy_drop']:.0%} of {report['reference_accuracy']:.1%} accuracy)")
+    else:
+        print(f"   ⚠️  No threshold within {report['max_accuracy_drop']:.0%} of {report['reference_accuracy']:.1%} "
+              f"accuracy; most accurate: {report['recommended_threshold']:g}")
+    if not report["cascade_pays_off"]:
+        print(f"   ⚠️  {report['fastest_sufficient_model']} alone is as accurate and faster than the cascade")
+
+def main():
+    """Main entry point for the model cascade"""
+
+    parser = argparse.ArgumentParser(
+        description="Cascade models cheapest first, escalating on invalid JSON or low confidence",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python cascade.py run
+  python cascade.py run gemma3_1b qwen3_1_7b --thresholds 0.7 0.8 0.9
+  python cascade.py offline results/gemma3_1b_production_*.json results/qwen3_1.7b_production_*.json
+        """
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the cascade against the models")
+    # No choices: Python < 3.12 rejects an empty list against them
+    run_parser.add_argument("models", nargs="*", metavar="MODEL",
+                            help=f"Models cheapest first: {', '.join(get_model_list())} "
+                                 f"(default: {' '.join(CASCADE_CONFIG['models'])})")
+    run_parser.add_argument(
+        "--prompt",
+        choices=list(get_available_variants().keys()),
+        default="production",
+        help="Prompt variant to render test cases with (default: production)"
+    )
+
+    offline_parser = subparsers.add_parser("offline", help="Compute the cascade from per-model results files")
+    offline_parser.add_argument("results_files", nargs="+", help="Results files of the same prompt variant")
+
+    for subparser in (run_parser, offline_parser):
+        subparser.add_argument("--thresholds", nargs="+", type=float, default=CASCADE_CONFIG["thresholds"],
+                               help=f"Confidence thresholds to sweep (default: {CASCADE_CONFIG['thresholds']})")
+
+    args = parser.parse_args()
+
+    print(f"\n🚀 OdyTest - Model Cascade")
+    print("=" * 60)
+
+    if args.command == "offline":
+        loaded = load_stage_results(args.results_files)
+        if not loaded or not loaded["cases"]:
+            print("❌ No test cases common to all results files")
+            sys.exit(2)
+        report = cascade_curve(loaded["stages"], loaded["model_names"], loaded["cases"], args.thresholds)
+        report.update({"source": "offline", "prompt_variant": loaded["prompt_variant"],
+                       "result_files": args.results_files})
+        print_cascade_report(report)
+        return
+
+    model_keys = args.models or CASCADE_CONFIG["models"]
+    unknown = [model for model in model_keys if model not in get_model_list()]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+    report = CascadeEvaluator(model_keys, args.prompt, args.thresholds).run()
+    if report is None:
+        sys.exit(2)
+    print_cascade_report(report)
+    results_manager.save_benchmark_results("cascade", "+".join(report["models"]), report)
+
+if __name__ == "__main__":
+    main()
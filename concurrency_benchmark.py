@@ -0,0 +1,192 @@
+"""
+Concurrency Benchmark for OdyTest - Model Evaluation Suite
+Sweeps client concurrency per model to find the useful degree of parallelism
+"""
+
+import argparse
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import (ModelConfig, get_model_config, get_model_list, CONCURRENCY_CONFIG,
+                         LOAD_TEST_CONFIG)
+    from .test_cases import TestCase, get_test_cases
+    from .prompt_manager import get_prompt, get_available_variants
+    from .test_ollama_library import OllamaClient, OllamaConfig
+    from .results_manager import results_manager
+    from .stats_utils import latency_percentiles
+    from .timing import Timer
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import (ModelConfig, get_model_config, get_model_list, CONCURRENCY_CONFIG, # type: ignore
+                        LOAD_TEST_CONFIG)
+    from test_cases import TestCase, get_test_cases
+    from prompt_manager import get_prompt, get_available_variants
+    from test_ollama_library import OllamaClient, OllamaConfig
+    from results_manager import results_manager
+    from stats_utils import latency_percentiles
+    from timing import Timer
+
+class ConcurrencyBenchmark:
+    """
+    Closed-loop throughput and latency at increasing client concurrency
+    
+    Each level runs N workers that send the next test case as soon as their previous
+    request returns. Throughput only scales while the server actually runs requests
+    in parallel, so OLLAMA_NUM_PARALLEL must be at least the highest level swept.
+    """
+    
+    def __init__(self, model_config: ModelConfig, prompt_variant: str = "production",
+                 test_cases: Optional[List[TestCase]] = None):
+        self.model_config = model_config
+        self.prompt_variant = prompt_variant
+        self.prompts = [get_prompt(prompt_variant, case.input) for case in (test_cases or get_test_cases())]
+        self.client = OllamaClient(OllamaConfig(
+            model=model_config.name,
+            temperature=model_config.temperature,
+            top_p=model_config.top_p,
+            timeout=model_config.timeout,
+            max_retries=model_config.max_retries,
+            stop_at_json=model_config.stop_at_json,
+            think=model_config.think,
+            options=model_config.runtime_options
+        ))
+    
+    def _send(self, prompt: str) -> Dict[str, Any]:
+        timer = Timer()
+        try:
+            self.client.generate_detailed(prompt)
+            return {"success": True, "latency": timer.stop()}
+        except Exception:
+            return {"success": False, "latency": timer.stop()}
+    
+    def run_level(self, concurrency: int,
+                  requests: Optional[int] = CONCURRENCY_CONFIG["requests_per_level"]) -> Dict[str, Any]:
+        """Replay the prompts with a fixed number of concurrent clients"""
+        count = requests or len(self.prompts)
+        prompts = [self.prompts[i % len(self.prompts)] for i in range(count)]
+        
+        print(f"   🔀 concurrency {concurrency}: {count} requests")
+        with Timer() as wall:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(self._send, prompts))
+        
+        latencies = [o["latency"] for o in outcomes if o["success"]]
+        return {
+            "concurrency": concurrency,
+            "requests": count,
+            "wall_clock_time": wall.elapsed,
+            "throughput_rps": len(latencies) / wall.elapsed if wall.elapsed > 0 else 0.0,
+            "error_rate": (count - len(latencies)) / count,
+            "latency": latency_percentiles(latencies)
+        }
+    
+    def recommend(self, levels: List[Dict[str, Any]]) -> Optional[int]:
+        """Highest concurrency that still pays for itself in throughput within the SLO"""
+        recommended = None
+        previous_rps = 0.0
+        for level in levels:
+            latency = level["latency"]
+            if (latency is None or latency["p95"] > LOAD_TEST_CONFIG["latency_slo"]
+                    or level["error_rate"] > LOAD_TEST_CONFIG["max_error_rate"]):
+                break
+            if recommended is not None and \
+                    level["throughput_rps"] < previous_rps * (1 + CONCURRENCY_CONFIG["min_throughput_gain"]):
+                break
+            recommended = level["concurrency"]
+            previous_rps = level["throughput_rps"]
+        return recommended
+    
+    def run_sweep(self, levels: List[int] = CONCURRENCY_CONFIG["levels"],
+                  requests: Optional[int] = CONCURRENCY_CONFIG["requests_per_level"]) -> Dict[str, Any]:
+        """Measure the scaling curve and pick a recommended concurrency"""
+        # Load the model first so the first level does not pay for it
+        self._send(self.prompts[0])
+        
+        results = [self.run_level(level, requests) for level in sorted(levels)]
+        baseline_rps = results[0]["throughput_rps"]
+        for level in results:
+            level["speedup"] = level["throughput_rps"] / baseline_rps if baseline_rps else 0.0
+            level["efficiency"] = level["speedup"] / level["concurrency"]
+        
+        recommended = self.recommend(results)
+        best = next((level for level in results if level["concurrency"] == recommended), None)
+        
+        return {
+            "model_name": self.model_config.name,
+            "prompt_variant": self.prompt_variant,
+            "levels": results,
+            "recommended_concurrency": recommended,
+            "recommended_throughput_rps": best["throughput_rps"] if best else None,
+            "recommended_p95_latency": best["latency"]["p95"] if best else None
+        }
+
+def print_scaling_report(report: Dict[str, Any]):
+    """Print the scaling curve for one model"""
+    print(f"\n📈 {report['model_name']} ({report['prompt_variant']})")
+    print(f"   {'clients':>7} {'req/s':>7} {'speedup':>8} {'efficiency':>10} {'p95':>7} {'errors':>7}")
+    for level in report["levels"]:
+        p95 = f"{level['latency']['p95']:>6.2f}s" if level["latency"] else f"{'-':>7}"
+        print(f"   {level['concurrency']:>7} {level['throughput_rps']:>7.2f} {level['speedup']:>7.2f}x "
+              f"{level['efficiency']:>10.0%} {p95} {level['error_rate']:>7.1%}")
+    if report["recommended_concurrency"] is None:
+        print(f"   ⚠️  No level met the latency SLO and error budget")
+    else:
+        print(f"   ✅ Recommended concurrency: {report['recommended_concurrency']}")
+
+def main():
+    """Main entry point for the concurrency sweep"""
+    
+    parser = argparse.ArgumentParser(
+        description="Sweep client concurrency per model and recommend a parallelism level",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python concurrency_benchmark.py
+  python concurrency_benchmark.py gemma3_1b --levels 1 2 4 8 16
+  OLLAMA_NUM_PARALLEL=8 ollama serve   # server must allow the highest level
+        """
+    )
+    
+    # No choices: Python < 3.12 rejects an empty list against them
+    parser.add_argument("models", nargs="*", metavar="MODEL",
+                        help=f"Models to benchmark: {', '.join(get_model_list())} (default: all)")
+    parser.add_argument(
+        "--prompt",
+        choices=list(get_available_variants().keys()),
+        default="production",
+        help="Prompt variant to render test cases with (default: production)"
+    )
+    parser.add_argument(
+        "--levels",
+        nargs="+",
+        type=int,
+        default=CONCURRENCY_CONFIG["levels"],
+        help=f"Client concurrency levels (default: {CONCURRENCY_CONFIG['levels']})"
+    )
+    parser.add_argument("--requests", type=int, help="Requests per level (default: one per test case)")
+    
+    args = parser.parse_args()
+    unknown = [model for model in args.models if model not in get_model_list()]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+    
+    print(f"\n🚀 OdyTest - Concurrency Benchmark")
+    print("=" * 60)
+    
+    for model_key in args.models or get_model_list():
+        model_config = get_model_config(model_key)
+        report = ConcurrencyBenchmark(model_config, args.prompt).run_sweep(args.levels, args.requests)
+        print_scaling_report(report)
+        results_manager.save_benchmark_results("concurrency", model_config.name, report)
+    
+    print(f"\n💡 Run 'python run_sequential_tests.py --generate-report-only' to include the curves in the comparative report")
+
+if __name__ == "__main__":
+    main()
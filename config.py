@@ -3,8 +3,8 @@ Configuration module for OdyTest - Model Evaluation Suite
 Contains model configurations and test parameters
 """
 
-from typing import Dict, Any, List
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
 
 @dataclass
 class ModelConfig:
@@ -15,6 +15,24 @@ class ModelConfig:
     timeout: int
     max_retries: int
     description: str
+    # Stream responses, recording when each JSON field (e.g. intent) completed
+    stream: bool = False
+    # Stream and stop generating once the first complete JSON object has arrived
+    stop_at_json: bool = False
+    # Reasoning models: server think option (None keeps the model default, False
+    # falls back to a /no_think prompt directive on servers without the option)
+    think: Optional[bool] = None
+    # Extra output tokens on top of each prompt variant's cap for <think> blocks
+    # (not added when think is False)
+    reasoning_allowance: int = 0
+    # Ollama runtime options sent with every request (num_ctx, num_thread, num_batch, ...);
+    # empty uses the server defaults. See tune_runtime.py
+    runtime_options: Dict[str, Any] = field(default_factory=dict)
+    # Hedged requests: a request still running after this percentile (0-100) of recent
+    # latencies is sent again and the first answer wins; None disables hedging.
+    # hedge_hosts are Ollama servers for the duplicates (empty: the same server)
+    hedge_percentile: Optional[float] = None
+    hedge_hosts: List[str] = field(default_factory=list)
 
 # Model configurations for testing
 MODEL_CONFIGS = {
@@ -32,7 +50,8 @@ MODEL_CONFIGS = {
         top_p=0.95,
         timeout=10,
         max_retries=3,
-        description="qwen3 1.7b - Superior human preference alignment"
+        description="qwen3 1.7b - Superior human preference alignment",
+        reasoning_allowance=1024
     ),
     "qwen3_0_6b": ModelConfig(
         name="qwen3:0.6b",
@@ -40,7 +59,8 @@ MODEL_CONFIGS = {
         top_p=0.95,
         timeout=10,
         max_retries=3,
-        description="qwen3 0.6b - Superior human preference alignment"
+        description="qwen3 0.6b - Superior human preference alignment",
+        reasoning_allowance=1024
     ),
     "qwen3_0_6b_mod": ModelConfig(
         name="goekdenizguelmez/JOSIEFIED-Qwen3:0.6b",
@@ -48,7 +68,8 @@ MODEL_CONFIGS = {
         top_p=0.95,
         timeout=10,
         max_retries=3,
-        description="qwen3 0.6b JOSIEFIED - Modified version of Qwen3 0.6b"
+        description="qwen3 0.6b JOSIEFIED - Modified version of Qwen3 0.6b",
+        reasoning_allowance=1024
     )
 }
 
@@ -58,16 +79,163 @@ TEST_CONFIG = {
     "retry_delay": 1.0,
     "save_raw_outputs": True,
     "validate_checksums": True,
-    "monitor_resources": True
+    "monitor_resources": True,
+    "confidence_level": 0.95,
+    "sample_seed": 42
+}
+
+# Adaptive evaluation: stop combinations that are clearly losing against the
+# best completed run once the upper confidence bound drops below best - margin
+EARLY_STOPPING_CONFIG = {
+    "enabled": False,
+    "min_cases": 8,
+    "margin": 0.05,
+    "confidence_level": 0.95
+}
+
+# Self-consistency: repeated samples per test case with majority-vote parsing;
+# majority voting is considered worth the N-times cost above min_accuracy_gain
+SELF_CONSISTENCY_CONFIG = {
+    "samples": 1,
+    "min_accuracy_gain": 0.05
+}
+
+# Resource metering of the Ollama server process (set pid to pin a specific process)
+RESOURCE_MONITOR_CONFIG = {
+    "pid": None,
+    "process_name": "ollama",
+    "interval": 0.1,
+    "include_children": True,
+    "sample_gpu": False
+}
+
+# Live Prometheus-style metrics endpoint (enable with --metrics-port)
+METRICS_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 9464,
+    "latency_buckets": [0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+    "tokens_per_second_buckets": [1, 5, 10, 20, 50, 100, 200],
+    # Cache hits answer in microseconds, misses take a model call
+    "parse_cache_latency_buckets": [0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0]
+}
+
+# Output caps per prompt variant: num_predict is the variant's JSON schema size
+# (estimated tokens) times headroom, at least min_tokens, plus any reasoning
+# allowance; stop sequences end generation right after the JSON object (the
+# server strips the matched "}", which the client puts back). Stop sequences are
+# not sent while a reasoning model's thinking arrives inline in the output
+GENERATION_LIMITS_CONFIG = {
+    "enabled": True,
+    "headroom": 1.5,
+    "min_tokens": 128,
+    "stop": ["}\n\n", "}\n```"]
+}
+
+# Context window sizing: each suite requests num_ctx = largest prompt of the
+# variant over the test inputs plus its output cap (default_output_tokens when
+# caps are disabled), rounded up to granularity. Estimated prompt counts get
+# estimate_margin on top; server-reported counts are used as they are.
+# A num_ctx in ModelConfig.runtime_options takes precedence.
+CONTEXT_SIZING_CONFIG = {
+    "enabled": True,
+    "estimate_margin": 1.25,
+    "granularity": 256,
+    "min_ctx": 512,
+    "default_output_tokens": 512
+}
+
+# Runtime options grid search (tune_runtime.py): every combination of the grid
+# values (None = server default) is run for the model and each alternative
+# quantization tag. Among the Pareto-optimal settings (latency, tokens/sec, memory,
+# accuracy) the fastest one within max_accuracy_drop of the best accuracy is recommended.
+RUNTIME_TUNING_CONFIG = {
+    "grid": {
+        "num_ctx": [None, 2048, 4096],
+        "num_batch": [None, 128],
+        "num_thread": [None]
+    },
+    "quantization_tags": {
+        "gemma3_1b": ["gemma3:1b-it-q8_0"],
+        "qwen3_1_7b": ["qwen3:1.7b-q8_0"],
+        "qwen3_0_6b": ["qwen3:0.6b-q8_0"]
+    },
+    "sample_fraction": 0.25,
+    "max_accuracy_drop": 0.05
+}
+
+# Parse cache in front of the model (parse_cache.py): validated parses are kept
+# per model and prompt variant under the normalized utterance (Unicode NFKC,
+# case-folded, punctuation dropped, whitespace collapsed), evicting the least
+# recently used entry beyond max_entries and entries older than ttl seconds
+# (None = no expiry). The replay draws test inputs with Zipf-distributed
+# popularity and rewrites perturb_rate of them (case, spacing, punctuation,
+# Unicode form) the way repeated real traffic varies.
+PARSE_CACHE_CONFIG = {
+    "max_entries": 1024,
+    "ttl": 3600.0,
+    "latency_window": 10000,
+    "replay_requests": 300,
+    "zipf_exponent": 1.1,
+    "perturb_rate": 0.5
+}
+
+# Model cascade (cascade.py): each model's parse is accepted when it is valid
+# JSON with confidence above the threshold, otherwise the next model is asked;
+# the last model's answer is always taken. Models are listed cheapest first.
+# The recommended threshold is the fastest one whose intent accuracy is within
+# max_accuracy_drop of the most accurate option (a single model or a threshold).
+CASCADE_CONFIG = {
+    "models": ["gemma3_1b", "qwen3_0_6b", "qwen3_1_7b"],
+    "thresholds": [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95],
+    "max_accuracy_drop": 0.02
+}
+
+# Open-loop load testing: a level counts as saturated when achieved throughput
+# drops below saturation_ratio of offered load, p95 latency exceeds the SLO or
+# errors plus timeouts exceed max_error_rate
+LOAD_TEST_CONFIG = {
+    "rates": [0.25, 0.5, 1.0, 2.0, 4.0],
+    "duration": 60.0,
+    "arrivals": "poisson",
+    "max_workers": 64,
+    "saturation_ratio": 0.9,
+    "latency_slo": 5.0,
+    "max_error_rate": 0.05
+}
+
+# Closed-loop concurrency sweep: the recommended level is the last one that still
+# adds min_throughput_gain over the previous level while meeting the load test's
+# p95 SLO and error budget. requests_per_level None replays every test case once.
+CONCURRENCY_CONFIG = {
+    "levels": [1, 2, 4, 8],
+    "requests_per_level": None,
+    "min_throughput_gain": 0.1
+}
+
+# Regression checks against a stored baseline run (baselines live in
+# results/cache so report-only runs skip them). Latency and tokens/sec
+# thresholds are relative changes, accuracy thresholds are absolute drops; a
+# change only counts as a regression when it is also statistically significant.
+REGRESSION_CONFIG = {
+    "baselines_file": "baselines.json",
+    "latency_threshold": 0.10,
+    "tokens_per_second_threshold": 0.10,
+    "accuracy_threshold": 0.05,
+    "alpha": 0.05,
+    "bootstrap_resamples": 2000
 }
 
 # Output settings
 OUTPUT_CONFIG = {
     "results_dir": "results",
     "timestamp_format": "%Y%m%d_%H%M%S",
-    "json_indent": 2,
+    "json_indent": 2,  # orjson can only indent by 2 (any other value is written with 2)
     "save_individual_results": True,
-    "generate_summary": True
+    "generate_summary": True,
+    "cache_dir": "cache",
+    "benchmarks_dir": "benchmarks",
+    "token_cache_file": "token_counts.json",
+    "completion_cache_file": "completion_counts.json"
 }
 
 # Evaluation criteria
@@ -0,0 +1,153 @@
+"""
+Context Sizing for OdyTest - Model Evaluation Suite
+Compares model memory and load time with sized context windows against the server default
+"""
+
+import argparse
+import statistics
+import sys
+import os
+from typing import Dict, Any, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import ModelConfig, get_model_config, get_model_list
+    from .test_cases import TestCase, get_test_cases
+    from .prompt_manager import prompt_manager, get_available_variants
+    from .test_ollama_library import OllamaClient, OllamaConfig
+    from .results_manager import results_manager
+    from .resource_monitor import running_model_memory, unload_model
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import ModelConfig, get_model_config, get_model_list # type: ignore
+    from test_cases import TestCase, get_test_cases
+    from prompt_manager import prompt_manager, get_available_variants
+    from test_ollama_library import OllamaClient, OllamaConfig
+    from results_manager import results_manager
+    from resource_monitor import running_model_memory, unload_model
+
+class ContextSizingBenchmark:
+    """
+    Cold-loads a model with each variant's sized num_ctx and with the server default
+
+    The KV cache grows linearly with num_ctx, so the memory the server reports
+    for the loaded model (ollama ps) and the time to load it show what the
+    default context window costs over what the prompts actually need.
+    """
+
+    def __init__(self, model_config: ModelConfig, test_cases: Optional[List[TestCase]] = None):
+        self.model_config = model_config
+        self.user_inputs = [case.input for case in (test_cases or get_test_cases())]
+        self.client = OllamaClient(OllamaConfig(
+            model=model_config.name,
+            temperature=model_config.temperature,
+            top_p=model_config.top_p,
+            timeout=model_config.timeout,
+            max_retries=model_config.max_retries,
+            think=model_config.think,
+            options={k: v for k, v in model_config.runtime_options.items() if k != "num_ctx"}
+        ))
+
+    def measure(self, num_ctx: Optional[int], repeats: int = 3) -> Dict[str, Any]:
+        """Median load time and loaded size with num_ctx (None = server default)"""
+        options = {"num_predict": 1}
+        if num_ctx is not None:
+            options["num_ctx"] = num_ctx
+
+        load_times = []
+        memory = None
+        for _ in range(repeats):
+            unload_model(self.model_config.name)
+            generation = self.client.generate_detailed("Test", options=options)
+            if generation.load_duration is not None:
+                load_times.append(generation.load_duration)
+            memory = running_model_memory(self.model_config.name)
+
+        return {
+            "num_ctx": num_ctx if num_ctx is not None else (memory or {}).get("context_length"),
+            "load_time": statistics.median(load_times) if load_times else None,
+            "memory_mb": memory["size_mb"] if memory else None,
+            "memory_vram_mb": memory["size_vram_mb"] if memory else None
+        }
+
+    def run(self, variants: List[str], repeats: int = 3) -> Dict[str, Any]:
+        """Measure the default once and every variant's sized window"""
+        print(f"   📏 {self.model_config.name}: server default")
+        default = self.measure(None, repeats)
+
+        sized = []
+        for variant in variants:
+            window = prompt_manager.get_context_window(variant, self.user_inputs, self.model_config.name,
+                                                       0 if self.model_config.think is False
+                                                       else self.model_config.reasoning_allowance)
+            print(f"   📏 {self.model_config.name}: {variant} (num_ctx {window['num_ctx']})")
+            measured = {**window, **self.measure(window["num_ctx"], repeats)}
+            if default["memory_mb"] is not None and measured["memory_mb"] is not None:
+                measured["memory_saved_mb"] = default["memory_mb"] - measured["memory_mb"]
+            if default["load_time"] is not None and measured["load_time"] is not None:
+                measured["load_time_saved"] = default["load_time"] - measured["load_time"]
+            sized.append(measured)
+
+        return {"model_name": self.model_config.name, "default": default, "variants": sized}
+
+def print_sizing_report(report: Dict[str, Any]):
+    """Print sized windows against the server default for one model"""
+    def row(label: str, data: Dict[str, Any]) -> str:
+        num_ctx = f"{data['num_ctx']:>7}" if data["num_ctx"] else f"{'?':>7}"
+        memory = f"{data['memory_mb']:>9.0f}" if data["memory_mb"] is not None else f"{'-':>9}"
+        load = f"{data['load_time']:>7.2f}s" if data["load_time"] is not None else f"{'-':>8}"
+        return f"   {label:<18} {num_ctx} {memory} {load}"
+
+    print(f"\n📈 {report['model_name']}")
+    print(f"   {'context':<18} {'num_ctx':>7} {'memory MB':>9} {'load':>8}")
+    print(row("server default", report["default"]))
+    for data in report["variants"]:
+        line = row(data["variant"], data)
+        if "memory_saved_mb" in data:
+            line += f"   ({data['memory_saved_mb']:+.0f} MB saved)"
+        print(line)
+
+def main():
+    """Main entry point for the context sizing comparison"""
+
+    parser = argparse.ArgumentParser(
+        description="Compare memory and load time of sized context windows against the server default",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python context_sizing.py
+  python context_sizing.py gemma3_1b --prompts production concise --repeats 5
+        """
+    )
+
+    # No choices: Python < 3.12 rejects an empty list against them
+    parser.add_argument("models", nargs="*", metavar="MODEL",
+                        help=f"Models to measure: {', '.join(get_model_list())} (default: all)")
+    parser.add_argument(
+        "--prompts",
+        nargs="+",
+        choices=list(get_available_variants().keys()),
+        default=list(get_available_variants().keys()),
+        help="Prompt variants to size the context for (default: all)"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Cold loads per setting (default: 3)")
+
+    args = parser.parse_args()
+    unknown = [model for model in args.models if model not in get_model_list()]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+
+    print(f"\n🚀 OdyTest - Context Window Sizing")
+    print("=" * 60)
+
+    for model_key in args.models or get_model_list():
+        model_config = get_model_config(model_key)
+        report = ContextSizingBenchmark(model_config).run(args.prompts, args.repeats)
+        print_sizing_report(report)
+        results_manager.save_benchmark_results("context_sizing", model_config.name, report)
+
+if __name__ == "__main__":
+    main()
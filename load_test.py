@@ -0,0 +1,264 @@
+"""
+Load Test for OdyTest - Model Evaluation Suite
+Open-loop request generator replaying test cases at a target arrival rate
+"""
+
+import argparse
+import random
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Any, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import ModelConfig, get_model_config, get_model_list, LOAD_TEST_CONFIG, TEST_CONFIG
+    from .test_cases import TestCase, get_test_cases
+    from .prompt_manager import get_prompt, get_available_variants
+    from .test_ollama_library import OllamaClient, OllamaConfig, OllamaTimeoutError
+    from .results_manager import results_manager
+    from .stats_utils import latency_percentiles
+    from .timing import monotonic
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import ModelConfig, get_model_config, get_model_list, LOAD_TEST_CONFIG, TEST_CONFIG # type: ignore
+    from test_cases import TestCase, get_test_cases
+    from prompt_manager import get_prompt, get_available_variants
+    from test_ollama_library import OllamaClient, OllamaConfig, OllamaTimeoutError
+    from results_manager import results_manager
+    from stats_utils import latency_percentiles
+    from timing import monotonic
+
+class LoadTester:
+    """
+    Replays test case inputs against one model at a fixed offered load
+    
+    Requests are dispatched on an arrival schedule (Poisson or constant) without
+    waiting for earlier requests to finish. Latency is measured from the scheduled
+    arrival time, so queueing inside the client counts against the model instead
+    of silently lowering the offered rate (no coordinated omission).
+    
+    With coalesce, requests for a prompt that is already in flight share its
+    generation (OllamaConfig.coalesce), as a production parser would.
+    
+    With the model's hedge_percentile set, slow requests are duplicated
+    (OllamaConfig.hedge_percentile); the duplicates add load, so compare the
+    p99 and the saturation point against an unhedged sweep.
+    """
+    
+    def __init__(self, model_config: ModelConfig, prompt_variant: str = "production",
+                 test_cases: Optional[List[TestCase]] = None,
+                 max_workers: int = LOAD_TEST_CONFIG["max_workers"], coalesce: bool = False):
+        self.model_config = model_config
+        self.prompt_variant = prompt_variant
+        self.prompts = [get_prompt(prompt_variant, case.input) for case in (test_cases or get_test_cases())]
+        self.max_workers = max_workers
+        self.coalesce = coalesce
+        self.client = OllamaClient(OllamaConfig(
+            model=model_config.name,
+            temperature=model_config.temperature,
+            top_p=model_config.top_p,
+            timeout=model_config.timeout,
+            # Retries would hide saturation behind backoff sleeps
+            max_retries=1,
+            stop_at_json=model_config.stop_at_json,
+            think=model_config.think,
+            options=model_config.runtime_options,
+            coalesce=coalesce,
+            hedge_percentile=model_config.hedge_percentile,
+            hedge_hosts=model_config.hedge_hosts
+        ))
+    
+    def _arrival_times(self, rate: float, duration: float, arrivals: str, rng: random.Random) -> List[float]:
+        """Offsets (seconds from level start) at which requests are issued"""
+        times = []
+        t = 0.0
+        while True:
+            t += rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+            if t >= duration:
+                return times
+            times.append(t)
+    
+    def run_level(self, rate: float, duration: float = LOAD_TEST_CONFIG["duration"],
+                  arrivals: str = LOAD_TEST_CONFIG["arrivals"],
+                  seed: int = TEST_CONFIG["sample_seed"]) -> Dict[str, Any]:
+        """Run one offered-load level and report throughput, latency and error rates"""
+        rng = random.Random(seed)
+        schedule = self._arrival_times(rate, duration, arrivals, rng)
+        outcomes: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+        
+        def send(prompt: str, scheduled: float):
+            started = monotonic()
+            outcome = {"scheduled": scheduled, "dispatch_lag": started - scheduled}
+            try:
+                self.client.generate_detailed(prompt)
+                outcome["status"] = "success"
+            except OllamaTimeoutError:
+                outcome["status"] = "timeout"
+            except Exception:
+                outcome["status"] = "error"
+            outcome["finished"] = monotonic()
+            outcome["latency"] = outcome["finished"] - scheduled
+            with lock:
+                outcomes.append(outcome)
+        
+        print(f"   🚦 {rate:g} req/s ({arrivals}) for {duration:g}s: {len(schedule)} requests")
+        coalesced_before = self.client.coalescing_stats()["coalesced_requests"]
+        hedged_before = self.client.hedging_stats()["hedged_requests"]
+        level_start = monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for offset in schedule:
+                scheduled = level_start + offset
+                delay = scheduled - monotonic()
+                if delay > 0:
+                    threading.Event().wait(delay)
+                pool.submit(send, rng.choice(self.prompts), scheduled)
+        
+        successes = [o for o in outcomes if o["status"] == "success"]
+        timeouts = [o for o in outcomes if o["status"] == "timeout"]
+        errors = [o for o in outcomes if o["status"] == "error"]
+        # Completions that drain after the arrival window still count, but over a longer window
+        elapsed = max(max((o["finished"] for o in outcomes), default=level_start) - level_start, duration)
+        
+        return {
+            "offered_rps": rate,
+            "arrivals": arrivals,
+            "duration": duration,
+            "requests": len(outcomes),
+            # Poisson arrivals issue a random number of requests; compare against what was sent
+            "issued_rps": len(outcomes) / duration,
+            "achieved_rps": len(successes) / elapsed,
+            "error_rate": len(errors) / len(outcomes) if outcomes else 0.0,
+            "timeout_rate": len(timeouts) / len(outcomes) if outcomes else 0.0,
+            "latency": latency_percentiles([o["latency"] for o in successes]),
+            "max_dispatch_lag": max((o["dispatch_lag"] for o in outcomes), default=0.0),
+            "coalesced_requests": self.client.coalescing_stats()["coalesced_requests"] - coalesced_before,
+            "hedged_requests": self.client.hedging_stats()["hedged_requests"] - hedged_before
+        }
+    
+    def find_saturation(self, levels: List[Dict[str, Any]]) -> Optional[float]:
+        """First offered rate where throughput, latency or errors break down"""
+        for level in levels:
+            latency = level["latency"]
+            if (level["achieved_rps"] < LOAD_TEST_CONFIG["saturation_ratio"] * level["issued_rps"]
+                    or level["error_rate"] + level["timeout_rate"] > LOAD_TEST_CONFIG["max_error_rate"]
+                    or latency is None or latency["p95"] > LOAD_TEST_CONFIG["latency_slo"]):
+                return level["offered_rps"]
+        return None
+    
+    def run_sweep(self, rates: List[float], duration: float = LOAD_TEST_CONFIG["duration"],
+                  arrivals: str = LOAD_TEST_CONFIG["arrivals"],
+                  seed: int = TEST_CONFIG["sample_seed"]) -> Dict[str, Any]:
+        """Run increasing offered loads and report the saturation point"""
+        levels = [self.run_level(rate, duration, arrivals, seed) for rate in sorted(rates)]
+        saturation = self.find_saturation(levels)
+        sustainable = [level["offered_rps"] for level in levels
+                       if saturation is None or level["offered_rps"] < saturation]
+        
+        return {
+            "model_name": self.model_config.name,
+            "prompt_variant": self.prompt_variant,
+            "coalesce": self.coalesce,
+            "hedge": self.model_config.hedge_percentile,
+            "criteria": {
+                "saturation_ratio": LOAD_TEST_CONFIG["saturation_ratio"],
+                "latency_slo": LOAD_TEST_CONFIG["latency_slo"],
+                "max_error_rate": LOAD_TEST_CONFIG["max_error_rate"]
+            },
+            "levels": levels,
+            "saturation_rps": saturation,
+            "max_sustainable_rps": max(sustainable) if sustainable else None
+        }
+
+def print_load_report(report: Dict[str, Any]):
+    """Print latency and throughput versus offered load"""
+    coalesce = report.get("coalesce")
+    hedge = report.get("hedge")
+    modes = (", coalescing" if coalesce else "") + (f", hedging at p{hedge:g}" if hedge is not None else "")
+    print(f"\n📈 {report['model_name']} ({report['prompt_variant']}{modes})")
+    print(f"   {'offered':>8} {'achieved':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'errors':>7} {'timeouts':>9}"
+          + (f" {'coalesced':>9}" if coalesce else "") + (f" {'hedged':>7}" if hedge is not None else ""))
+    for level in report["levels"]:
+        latency = level["latency"]
+        quantiles = " ".join(f"{latency[q]:>6.2f}s" if latency else f"{'-':>7}" for q in ("p50", "p95", "p99"))
+        coalesced = level["coalesced_requests"] / level["requests"] if level["requests"] else 0.0
+        hedged = level.get("hedged_requests", 0) / level["requests"] if level["requests"] else 0.0
+        print(f"   {level['offered_rps']:>8.2f} {level['achieved_rps']:>9.2f} {quantiles} "
+              f"{level['error_rate']:>7.1%} {level['timeout_rate']:>9.1%}"
+              + (f" {coalesced:>9.1%}" if coalesce else "") + (f" {hedged:>7.1%}" if hedge is not None else ""))
+    if report["saturation_rps"] is None:
+        print(f"   ✅ No saturation up to {report['levels'][-1]['offered_rps']:g} req/s")
+    else:
+        print(f"   ⚠️  Saturates at {report['saturation_rps']:g} req/s "
+              f"(max sustainable: {report['max_sustainable_rps']} req/s)")
+
+def main():
+    """Main entry point for load testing"""
+    
+    parser = argparse.ArgumentParser(
+        description="Open-loop load test of models against the parser prompt",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python load_test.py gemma3_1b
+  python load_test.py gemma3_1b qwen3_1_7b --rates 0.5 1 2 4 --duration 30
+  python load_test.py qwen3_0_6b --arrivals constant --prompt concise
+  python load_test.py gemma3_1b --rates 2 4 8 --coalesce
+  python load_test.py gemma3_1b --rates 1 2 4 --hedge 95
+        """
+    )
+    
+    parser.add_argument("models", nargs="+", choices=get_model_list(), help="Models to load test")
+    parser.add_argument(
+        "--prompt",
+        choices=list(get_available_variants().keys()),
+        default="production",
+        help="Prompt variant to render test cases with (default: production)"
+    )
+    parser.add_argument(
+        "--rates",
+        nargs="+",
+        type=float,
+        default=LOAD_TEST_CONFIG["rates"],
+        help=f"Offered loads in requests per second (default: {LOAD_TEST_CONFIG['rates']})"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=LOAD_TEST_CONFIG["duration"],
+        help=f"Seconds per load level (default: {LOAD_TEST_CONFIG['duration']})"
+    )
+    parser.add_argument(
+        "--arrivals",
+        choices=["poisson", "constant"],
+        default=LOAD_TEST_CONFIG["arrivals"],
+        help="Arrival process (default: poisson)"
+    )
+    parser.add_argument("--seed", type=int, default=TEST_CONFIG["sample_seed"], help="Random seed for arrivals")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="Share one generation between concurrent requests for the same prompt")
+    parser.add_argument("--hedge", type=float, metavar="PERCENTILE",
+                        help="Duplicate requests still running after this latency percentile (default: model config)")
+    
+    args = parser.parse_args()
+    
+    print(f"\n🚀 OdyTest - Load Test")
+    print("=" * 60)
+    
+    for model_key in args.models:
+        model_config = get_model_config(model_key)
+        if args.hedge is not None:
+            model_config = replace(model_config, hedge_percentile=args.hedge)
+        tester = LoadTester(model_config, args.prompt, coalesce=args.coalesce)
+        report = tester.run_sweep(args.rates, args.duration, args.arrivals, args.seed)
+        print_load_report(report)
+        results_manager.save_benchmark_results("load_test", model_config.name, report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Metrics Server for OdyTest - Model Evaluation Suite
+Prometheus-style live metrics exposed over a local HTTP endpoint during evaluation runs
+"""
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import METRICS_CONFIG
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import METRICS_CONFIG # type: ignore
+
+LabelValues = Tuple[str, ...]
+
+def _escape_label_value(value: str) -> str:
+    """Escape backslashes, double quotes and newlines as the text format requires"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    """Render a Prometheus label set"""
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value))
+
+class Metric(ABC):
+    """Base class for labelled metrics"""
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+    
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of the exposition, one per label set (and bucket)"""
+    
+    def expose(self) -> str:
+        """Render the metric in the Prometheus text exposition format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                    for key, value in self._values.items()]
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def set(self, value: float, **labels: Any):
+        with self._lock:
+            self._values[self._key(labels)] = value
+    
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels: Any):
+        self.inc(-amount, **labels)
+    
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                    for key, value in self._values.items()]
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets"""
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)):
+        super().__init__(name, documentation, labels)
+        self.buckets = sorted(buckets)
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[LabelValues, List[Any]] = {}
+    
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + [float('inf')], counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+class EvaluationMetrics:
+    """Live metrics updated by OllamaClient and ModelEvaluator"""
+    
+    def __init__(self):
+        self.requests_in_flight = Gauge(
+            "odytest_requests_in_flight", "Model requests currently in flight", ["model"])
+        self.requests_total = Counter(
+            "odytest_requests_total", "Model requests by outcome (success, error, timeout)", ["model", "outcome"])
+        self.request_latency = Histogram(
+            "odytest_request_latency_seconds", "Model request latency", ["model"],
+            buckets=METRICS_CONFIG["latency_buckets"])
+        self.time_to_intent = Histogram(
+            "odytest_time_to_intent_seconds", "Time until the intent field of a streamed answer was complete",
+            ["model"], buckets=METRICS_CONFIG["latency_buckets"])
+        self.timeouts_total = Counter(
+            "odytest_timeouts_total", "Model requests that hit the client timeout", ["model"])
+        self.retries_total = Counter(
+            "odytest_retries_total", "Model requests retried after a server error", ["model"])
+        self.coalesced_requests_total = Counter(
+            "odytest_coalesced_requests_total", "Requests served by an identical generation already in flight",
+            ["model"])
+        self.hedged_requests_total = Counter(
+            "odytest_hedged_requests_total", "Requests duplicated after the hedging delay, by the attempt that answered",
+            ["model", "winner"])
+        self.tokens_per_second = Histogram(
+            "odytest_tokens_per_second", "Generation speed reported by the server", ["model"],
+            buckets=METRICS_CONFIG["tokens_per_second_buckets"])
+        self.json_results_total = Counter(
+            "odytest_json_results_total", "Parsed model outputs by JSON validity", ["model", "valid"])
+        self.intent_results_total = Counter(
+            "odytest_intent_results_total", "Scored test cases by intent match", ["model", "match"])
+        self.parse_cache_lookups_total = Counter(
+            "odytest_parse_cache_lookups_total", "Parse cache lookups by outcome (hit, miss)",
+            ["model", "prompt_variant", "outcome"])
+        self.parse_cache_latency = Histogram(
+            "odytest_parse_cache_latency_seconds", "Parse latency behind the parse cache by outcome",
+            ["model", "outcome"], buckets=METRICS_CONFIG["parse_cache_latency_buckets"])
+        self.parse_cache_entries = Gauge(
+            "odytest_parse_cache_entries", "Parses currently held by the parse cache")
+        self._all: List[Metric] = [
+            self.requests_in_flight, self.requests_total, self.request_latency, self.time_to_intent, self.timeouts_total,
+            self.retries_total, self.coalesced_requests_total, self.hedged_requests_total, self.tokens_per_second,
+            self.json_results_total, self.intent_results_total, self.parse_cache_lookups_total,
+            self.parse_cache_latency, self.parse_cache_entries
+        ]
+    
+    def expose(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.expose() for metric in self._all) + "\n"
+
+# Global instance for easy access
+metrics = EvaluationMetrics()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the server's registry"""
+    
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Keep evaluation console output clean
+
+class MetricsServer:
+    """Local HTTP endpoint serving live metrics in a background thread"""
+    
+    def __init__(self, port: int = METRICS_CONFIG["port"], host: str = METRICS_CONFIG["host"],
+                 registry: Optional[EvaluationMetrics] = None):
+        self.host = host
+        self.port = port
+        self.registry = registry or metrics
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    def start(self) -> str:
+        """Start serving (port 0 picks a free port); returns the metrics URL"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+    
+    def stop(self):
+        """Stop serving"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+def start_metrics_server(port: int = METRICS_CONFIG["port"],
+                         registry: Optional[EvaluationMetrics] = None) -> MetricsServer:
+    """Start the live metrics endpoint (serving the global registry by default)"""
+    server = MetricsServer(port, registry=registry)
+    server.start()
+    return server
+
+def test_metrics_endpoint():
+    """Scrape a locally started endpoint and check the exposed metrics"""
+    # A registry of its own, so the check leaves the process-wide metrics alone
+    registry = EvaluationMetrics()
+    server = start_metrics_server(port=0, registry=registry)
+    try:
+        registry.requests_total.inc(model="selfcheck", outcome="success")
+        registry.request_latency.observe(0.42, model="selfcheck")
+        registry.requests_total.inc(model='odd\\name "q"\nx', outcome="success")
+        
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+        
+        assert 'odytest_requests_total{model="selfcheck",outcome="success"} 1.0' in body
+        assert 'odytest_request_latency_seconds_bucket{model="selfcheck",le="0.5"} 1' in body
+        assert 'odytest_request_latency_seconds_count{model="selfcheck"} 1' in body
+        assert 'odytest_requests_total{model="odd\\\\name \\"q\\"\\nx",outcome="success"} 1.0' in body, body
+        assert "selfcheck" not in metrics.expose()
+        print(f"✅ Metrics endpoint OK at {server.url}")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_metrics_endpoint()
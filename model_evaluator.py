@@ -4,32 +4,88 @@ Handles model testing, JSON validation, and performance metrics
 """
 
 import json
-import time
 import re
-import psutil
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     # Try relative imports first (when used as module)
-    from .config import ModelConfig, EVALUATION_CRITERIA, TEST_CONFIG
+    from .config import (ModelConfig, EVALUATION_CRITERIA, TEST_CONFIG, EARLY_STOPPING_CONFIG, SELF_CONSISTENCY_CONFIG,
+                         CONTEXT_SIZING_CONFIG)
     from .test_cases import TestCase
-    from .prompt_manager import get_prompt
-    from .test_ollama_library import OllamaClient, OllamaConfig, OllamaError, JSONParseError
+    from .prompt_manager import get_prompt, get_generation_options, estimate_tokens, prompt_manager
+    from .test_ollama_library import OllamaClient, OllamaConfig, OllamaError, JSONParseError, GenerationResult
+    from .stats_utils import wilson_interval, percentile
+    from .resource_monitor import ResourceSampler, running_model_memory
+    from .profiling import Profiler
+    from .timing import Timer, summarize_timeline
+    from .metrics_server import metrics
+    from .result_store import ResultStore
 except ImportError:
     # Fall back to direct imports (when run as script)
-    from config import ModelConfig, EVALUATION_CRITERIA, TEST_CONFIG # type: ignore
+    from config import (ModelConfig, EVALUATION_CRITERIA, TEST_CONFIG, EARLY_STOPPING_CONFIG, # type: ignore
+                        SELF_CONSISTENCY_CONFIG, CONTEXT_SIZING_CONFIG)
     from test_cases import TestCase
-    from prompt_manager import get_prompt
-    from test_ollama_library import OllamaClient, OllamaConfig, OllamaError, JSONParseError
+    from prompt_manager import get_prompt, get_generation_options, estimate_tokens, prompt_manager
+    from test_ollama_library import OllamaClient, OllamaConfig, OllamaError, JSONParseError, GenerationResult
+    from stats_utils import wilson_interval, percentile
+    from resource_monitor import ResourceSampler, running_model_memory
+    from profiling import Profiler
+    from timing import Timer, summarize_timeline
+    from metrics_server import metrics
+    from result_store import ResultStore
+
+def extract_and_validate_json(llm_output: str) -> Tuple[bool, Optional[Dict[str, Any]], str]:
+    """Extract JSON from model output and check it against the parser schema"""
+    
+    # Find JSON in the response
+    json_match = re.search(r'\{.*\}', llm_output, re.DOTALL)
+    if not json_match:
+        return False, None, "No JSON found in output"
+    
+    try:
+        parsed_json = json.loads(json_match.group())
+        
+        # Validate required fields
+        missing_fields = [
+            field for field in EVALUATION_CRITERIA["required_fields"] 
+            if field not in parsed_json
+        ]
+        
+        if missing_fields:
+            return False, parsed_json, f"Missing required fields: {missing_fields}"
+        
+        # Validate intent
+        if parsed_json.get('intent') not in EVALUATION_CRITERIA["valid_intents"]:
+            return False, parsed_json, f"Invalid intent: {parsed_json.get('intent')}"
+        
+        # Validate confidence range
+        confidence = parsed_json.get('confidence')
+        if not isinstance(confidence, (int, float)):
+            return False, parsed_json, "Confidence must be a number"
+        
+        min_conf, max_conf = EVALUATION_CRITERIA["confidence_range"]
+        if not (min_conf <= confidence <= max_conf):
+            return False, parsed_json, f"Confidence {confidence} outside valid range {min_conf}-{max_conf}"
+        
+        # Validate entities structure
+        if not isinstance(parsed_json.get('entities'), dict):
+            return False, parsed_json, "Entities must be a dictionary"
+        
+        return True, parsed_json, "Valid JSON"
+        
+    except json.JSONDecodeError as e:
+        return False, None, f"Invalid JSON: {e}"
 
 @dataclass
 class TestResult:
     """Result of a single test case execution"""
     model_name: str
     prompt_variant: str
-    test_case_id: int
+    test_case_id: str
     input_query: str
     expected_intent: str
     expected_entities: Dict[str, Any]
@@ -53,100 +109,206 @@ class TestResult:
     entity_accuracy: Dict[str, Any]
     confidence_score: Optional[float]
     
-    # System metrics
-    cpu_usage: Optional[float]
-    memory_usage: Optional[float]
-    
     # Error information
     error_message: Optional[str]
+    
+    # Unix time the model request started (from the monotonic clock)
+    start_timestamp: Optional[float] = None
+    
+    # Ollama server resources attributed to this case
+    cpu_seconds: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    gpu_memory_mb: Optional[float] = None
+    
+    # Token accounting (server-reported)
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    # Server time spent generating the completion tokens, in seconds
+    eval_duration: Optional[float] = None
+    
+    # Streaming stopped after the first complete JSON object (None when not enabled)
+    early_terminated: Optional[bool] = None
+    tokens_saved: Optional[int] = None
+    # Token counts above are estimates (the stream was closed before the server reported them)
+    tokens_estimated: Optional[bool] = None
+    
+    # Streaming: seconds from request start until the intent field was complete
+    time_to_intent: Optional[float] = None
+    
+    # Output hit the variant's num_predict cap (None when no cap was set)
+    output_truncated: Optional[bool] = None
+    # A closing brace was appended to the answer, assuming a stop sequence consumed
+    # it (None when no stop sequences were sent)
+    brace_restored: Optional[bool] = None
+    
+    # Reasoning (<think> block or the server's thinking field), kept out of raw_output
+    thinking: Optional[str] = None
+    thinking_tokens: Optional[int] = None
+    
+    # Hedged requests: a duplicate was sent, and it answered first (None when hedging is off)
+    hedged: Optional[bool] = None
+    hedge_won: Optional[bool] = None
+    
+    # Self-consistency (only with multiple samples per case)
+    sample_stats: Optional[Dict[str, Any]] = None
+
+class EarlyStoppingMonitor:
+    """Tracks running accuracy of a test suite and decides when it is clearly losing"""
+    
+    def __init__(self, best_intent_accuracy: float, best_json_validity: Optional[float] = None,
+                 margin: float = EARLY_STOPPING_CONFIG["margin"],
+                 min_cases: int = EARLY_STOPPING_CONFIG["min_cases"],
+                 confidence_level: float = EARLY_STOPPING_CONFIG["confidence_level"]):
+        """
+        Args:
+            best_intent_accuracy: Intent accuracy of the best completed combination so far
+            best_json_validity: JSON validity of the best completed combination, if known
+            margin: How far the upper confidence bound must fall below the best
+            min_cases: Cases to run before any stop decision
+            confidence_level: Confidence level of the Wilson bounds
+        """
+        self.best_intent_accuracy = best_intent_accuracy
+        self.best_json_validity = best_json_validity
+        self.margin = margin
+        self.min_cases = min_cases
+        self.confidence_level = confidence_level
+        self.cases_seen = 0
+        self.intent_matches = 0
+        self.valid_json = 0
+    
+    def update(self, result: TestResult) -> Optional[str]:
+        """Record a result and return a stop reason if the combination is clearly losing"""
+        self.cases_seen += 1
+        self.intent_matches += int(result.intent_match)
+        self.valid_json += int(result.json_validity)
+        
+        if self.cases_seen < self.min_cases:
+            return None
+        
+        _, intent_upper = wilson_interval(self.intent_matches, self.cases_seen, self.confidence_level)
+        if intent_upper < self.best_intent_accuracy - self.margin:
+            return (f"intent accuracy upper bound {intent_upper:.1%} below best "
+                    f"{self.best_intent_accuracy:.1%} - {self.margin:.1%} margin")
+        
+        if self.best_json_validity is not None:
+            _, json_upper = wilson_interval(self.valid_json, self.cases_seen, self.confidence_level)
+            if json_upper < self.best_json_validity - self.margin:
+                return (f"JSON validity upper bound {json_upper:.1%} below best "
+                        f"{self.best_json_validity:.1%} - {self.margin:.1%} margin")
+        
+        return None
 
 class ModelEvaluator:
     """Evaluates model performance on test cases"""
     
-    def __init__(self, model_config: ModelConfig):
+    def __init__(self, model_config: ModelConfig, profiler: Optional[Profiler] = None):
         self.model_config = model_config
+        self.profiler = profiler or Profiler(enabled=False)
+        self.truncation: Optional[Dict[str, Any]] = None
+        self.resource_sampler: Optional[ResourceSampler] = None
+        # Context window sized for the current suite, and what loading the model cost
+        self.context_window: Optional[Dict[str, Any]] = None
+        self.load_time: Optional[float] = None
+        self.model_memory: Optional[Dict[str, Any]] = None
         # Create OllamaClient configuration
         ollama_config = OllamaConfig(
             model=model_config.name,
             temperature=model_config.temperature,
             top_p=model_config.top_p,
             timeout=model_config.timeout,
-            max_retries=model_config.max_retries
+            max_retries=model_config.max_retries,
+            stop_at_json=model_config.stop_at_json,
+            think=model_config.think,
+            options=model_config.runtime_options,
+            hedge_percentile=model_config.hedge_percentile,
+            hedge_hosts=model_config.hedge_hosts
         )
         self.ollama_client = OllamaClient(ollama_config)
     
     def test_model_availability(self) -> bool:
         """Test if model is available via Ollama"""
         try:
-            # Use a simple test prompt
-            self.ollama_client.generate("Test", stream=False)
+            # Use a simple test prompt; this loads the model with the suite's context window
+            generation = self.ollama_client.generate_detailed(
+                "Test", options={**self._context_options(), "num_predict": 1}
+            )
+            self.load_time = generation.load_duration
             return True
         except Exception:
             return False
     
-    def query_model(self, prompt: str) -> Tuple[bool, Optional[str], float, Optional[str]]:
+    def query_model(self, prompt: str,
+                    options: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[GenerationResult], float, Optional[str]]:
         """
-        Query model and return success, response, timing, and error
+        Query model and return success, generation, timing, and error
+        
+        options are extra Ollama options, e.g. the prompt variant's num_predict and stop
         
         Returns:
-            (success, response, inference_time, error_message)
+            (success, generation, inference_time, error_message)
         """
-        start_time = time.time()
+        timer = Timer()
         
         try:
-            response = self.ollama_client.generate(prompt, stream=False)
-            inference_time = time.time() - start_time
-            return True, response, inference_time, None
+            with self.profiler.span("query_model", model=self.model_config.name):
+                generation = self.ollama_client.generate_detailed(prompt, stream=self.model_config.stream,
+                                                                  options=options)
+            return True, generation, timer.stop(), None
             
         except OllamaError as e:
-            inference_time = time.time() - start_time
-            return False, None, inference_time, str(e)
+            return False, None, timer.stop(), str(e)
             
         except Exception as e:
-            inference_time = time.time() - start_time
-            return False, None, inference_time, f"Unexpected error: {str(e)}"
+            return False, None, timer.stop(), f"Unexpected error: {str(e)}"
+    
+    def _reasoning_allowance(self) -> int:
+        """Extra output tokens for <think> blocks, unless thinking is switched off"""
+        return 0 if self.model_config.think is False else self.model_config.reasoning_allowance
+    
+    def _inline_thinking(self) -> bool:
+        """Reasoning model whose thinking arrives in the output text (no stop sequences then)"""
+        return self.model_config.reasoning_allowance > 0 and self.ollama_client.thinks_inline()
+    
+    def _prompt_tokens(self, generation: GenerationResult, prompt_variant: str, user_input: str) -> Optional[int]:
+        """Server-reported prompt tokens, or the cached count (else an estimate) when the stream was cut early"""
+        if generation.prompt_tokens is not None or not generation.tokens_estimated:
+            return generation.prompt_tokens
+        return prompt_manager.count_prompt_tokens(prompt_variant, user_input, self.model_config.name)
+    
+    def _answer_tokens(self, generation: GenerationResult) -> Optional[int]:
+        """Completion tokens spent on the answer, i.e. without thinking"""
+        if not generation.completion_tokens:
+            return None
+        return max(0, generation.completion_tokens - self._count_thinking_tokens(generation))
+    
+    def _tokens_saved(self, generation: GenerationResult, prompt_variant: str) -> Optional[int]:
+        """Typical full answer length minus what an early-terminated stream generated"""
+        if not generation.early_terminated:
+            return None
+        typical = prompt_manager.typical_completion_tokens(self.model_config.name, prompt_variant)
+        if typical is None:
+            return None
+        return max(0, typical - (self._answer_tokens(generation) or 0))
+    
+    def _context_options(self) -> Dict[str, Any]:
+        """num_ctx for the current suite, if it was sized"""
+        return {"num_ctx": self.context_window["num_ctx"]} if self.context_window else {}
+    
+    def _count_thinking_tokens(self, generation: GenerationResult) -> int:
+        """Thinking tokens: streamed count, or the thinking share of the server's completion count"""
+        if generation.thinking_tokens is not None:
+            return generation.thinking_tokens
+        if not generation.thinking:
+            return 0
+        thinking = estimate_tokens(generation.thinking)
+        if not generation.completion_tokens:
+            return thinking
+        answer = estimate_tokens(generation.text)
+        return round(generation.completion_tokens * thinking / (thinking + answer))
     
     def extract_and_validate_json(self, llm_output: str) -> Tuple[bool, Optional[Dict[str, Any]], str]:
         """Extract and validate JSON from LLM output"""
-        
-        # Find JSON in the response
-        json_match = re.search(r'\{.*\}', llm_output, re.DOTALL)
-        if not json_match:
-            return False, None, "No JSON found in output"
-        
-        try:
-            parsed_json = json.loads(json_match.group())
-            
-            # Validate required fields
-            missing_fields = [
-                field for field in EVALUATION_CRITERIA["required_fields"] 
-                if field not in parsed_json
-            ]
-            
-            if missing_fields:
-                return False, parsed_json, f"Missing required fields: {missing_fields}"
-            
-            # Validate intent
-            if parsed_json.get('intent') not in EVALUATION_CRITERIA["valid_intents"]:
-                return False, parsed_json, f"Invalid intent: {parsed_json.get('intent')}"
-            
-            # Validate confidence range
-            confidence = parsed_json.get('confidence')
-            if not isinstance(confidence, (int, float)):
-                return False, parsed_json, "Confidence must be a number"
-            
-            min_conf, max_conf = EVALUATION_CRITERIA["confidence_range"]
-            if not (min_conf <= confidence <= max_conf):
-                return False, parsed_json, f"Confidence {confidence} outside valid range {min_conf}-{max_conf}"
-            
-            # Validate entities structure
-            if not isinstance(parsed_json.get('entities'), dict):
-                return False, parsed_json, "Entities must be a dictionary"
-            
-            return True, parsed_json, "Valid JSON"
-            
-        except json.JSONDecodeError as e:
-            return False, None, f"Invalid JSON: {e}"
+        return extract_and_validate_json(llm_output)
     
     def evaluate_intent_accuracy(self, expected: str, actual: str) -> Tuple[bool, str]:
         """
@@ -207,28 +369,74 @@ class ModelEvaluator:
         
         return results
     
-    def execute_test_case(self, test_case: TestCase, prompt_variant: str, test_id: int) -> TestResult:
-        """Execute a single test case"""
+    def _summarize_samples(self, test_case: TestCase,
+                           outcomes: List[Tuple[bool, Optional[GenerationResult], float, Optional[str]]]) -> Dict[str, Any]:
+        """Summarize agreement and majority vote across repeated samples of one case"""
+        intents: List[Optional[str]] = []
+        for success, generation, _, _ in outcomes:
+            parsed_json = None
+            if success and generation is not None:
+                json_valid, parsed_json, _ = self.extract_and_validate_json(generation.text)
+                if not json_valid:
+                    parsed_json = None
+            intents.append(parsed_json.get('intent') if parsed_json else None)
+        
+        # Invalid samples abstain from the vote but still count against agreement
+        votes = Counter(intent for intent in intents if intent is not None)
+        majority_intent, majority_votes = votes.most_common(1)[0] if votes else (None, 0)
+        
+        return {
+            "samples": len(outcomes),
+            "valid_samples": sum(votes.values()),
+            "intents": intents,
+            "majority_intent": majority_intent,
+            "majority_match": majority_intent == test_case.expected_intent,
+            "agreement_rate": majority_votes / len(outcomes),
+            "latencies": [inference_time for success, _, inference_time, _ in outcomes if success]
+        }
+    
+    def execute_test_case(self, test_case: TestCase, prompt_variant: str, test_id: Optional[str] = None,
+                          samples: int = 1) -> TestResult:
+        """
+        Execute a single test case (test_id defaults to the case's content-hash ID)
         
-        # Get system metrics before test
-        cpu_before = psutil.cpu_percent()
-        memory_before = psutil.virtual_memory().percent
+        With samples > 1 the prompt is sent that many times concurrently; the first
+        sample fills the regular result fields and all samples feed sample_stats.
+        """
+        with self.profiler.span("test_case", case_id=test_case.case_id, model=self.model_config.name,
+                                prompt_variant=prompt_variant, samples=samples):
+            return self._execute_test_case(test_case, prompt_variant, test_id, samples)
+    
+    def _execute_test_case(self, test_case: TestCase, prompt_variant: str, test_id: Optional[str],
+                           samples: int) -> TestResult:
+        """Run the pipeline stages of one test case (see execute_test_case)"""
         
         # Generate prompt
-        prompt = get_prompt(prompt_variant, test_case.input)
-        
-        # Query model
-        success, response, inference_time, error_message = self.query_model(prompt)
+        with self.profiler.span("render_prompt"):
+            prompt = get_prompt(prompt_variant, test_case.input)
+            options = get_generation_options(prompt_variant, self._reasoning_allowance(), self._inline_thinking())
+            options.update(self._context_options())
+        
+        sampler = self.resource_sampler
+        resource_token = sampler.begin_request() if sampler else None
+        
+        # Query model (repeated samples are issued concurrently so the server can batch them)
+        request_timer = Timer()
+        if samples > 1:
+            with ThreadPoolExecutor(max_workers=samples) as pool:
+                outcomes = list(pool.map(self.query_model, [prompt] * samples, [options] * samples))
+        else:
+            outcomes = [self.query_model(prompt, options)]
+        success, generation, inference_time, error_message = outcomes[0]
+        response = generation.text if generation else None
         
-        # Get system metrics after test
-        cpu_after = psutil.cpu_percent()
-        memory_after = psutil.virtual_memory().percent
+        usage = sampler.end_request(resource_token) if sampler else {}
         
         # Initialize result
         result = TestResult(
             model_name=self.model_config.name,
             prompt_variant=prompt_variant,
-            test_case_id=test_id,
+            test_case_id=test_id if test_id is not None else test_case.case_id,
             input_query=test_case.input,
             expected_intent=test_case.expected_intent,
             expected_entities=test_case.expected_entities,
@@ -245,61 +453,131 @@ class ModelEvaluator:
             intent_accuracy_type="unknown",
             entity_accuracy={},
             confidence_score=None,
-            cpu_usage=(cpu_after - cpu_before) if cpu_after > cpu_before else 0.0,
-            memory_usage=(memory_after - memory_before) if memory_after > memory_before else 0.0,
-            error_message=error_message
+            error_message=error_message,
+            start_timestamp=request_timer.start_timestamp,
+            cpu_seconds=usage.get("cpu_seconds"),
+            peak_rss_mb=usage.get("peak_rss_mb"),
+            gpu_memory_mb=usage.get("gpu_memory_mb"),
+            prompt_tokens=self._prompt_tokens(generation, prompt_variant, test_case.input) if generation else None,
+            completion_tokens=generation.completion_tokens if generation else None,
+            eval_duration=generation.eval_duration if generation else None,
+            early_terminated=generation.early_terminated if generation and self.model_config.stop_at_json else None,
+            tokens_saved=self._tokens_saved(generation, prompt_variant) if generation else None,
+            tokens_estimated=True if generation and generation.tokens_estimated else None,
+            time_to_intent=(generation.field_times or {}).get("intent") if generation else None,
+            output_truncated=generation.done_reason == "length" if generation and "num_predict" in options else None,
+            brace_restored=generation.brace_restored if generation and "stop" in options else None,
+            thinking=generation.thinking if generation else None,
+            thinking_tokens=self._count_thinking_tokens(generation) if generation else None,
+            hedged=generation.hedged if generation else None,
+            hedge_won=generation.hedge_won if generation else None
         )
         
+        if samples > 1:
+            result.sample_stats = self._summarize_samples(test_case, outcomes)
+        
+        if result.prompt_tokens and not result.tokens_estimated:
+            prompt_manager.record_prompt_tokens(
+                self.model_config.name, prompt_variant, test_case.input, result.prompt_tokens
+            )
+        
         if not success or response is None:
             return result
         
         # Validate JSON
-        json_valid, parsed_json, validation_error = self.extract_and_validate_json(response)
+        with self.profiler.span("extract_json"):
+            json_valid, parsed_json, validation_error = self.extract_and_validate_json(response)
+        metrics.json_results_total.inc(model=self.model_config.name, valid=str(json_valid).lower())
         result.json_validity = json_valid
         result.parsed_json = parsed_json
         result.validation_error = validation_error if not json_valid else None
         
+        # Only valid answers that ended on their own are a fair baseline for tokens saved
+        if (json_valid and not generation.early_terminated and not generation.tokens_estimated
+                and generation.done_reason != "length"):
+            answer_tokens = self._answer_tokens(generation)
+            if answer_tokens:
+                prompt_manager.record_completion_tokens(self.model_config.name, prompt_variant, answer_tokens)
+        
         if not json_valid or parsed_json is None:
             return result
         
         # Evaluate intent accuracy
-        intent_match, accuracy_type = self.evaluate_intent_accuracy(
-            test_case.expected_intent,
-            parsed_json.get('intent', 'unknown')
-        )
+        with self.profiler.span("score_intent"):
+            intent_match, accuracy_type = self.evaluate_intent_accuracy(
+                test_case.expected_intent,
+                parsed_json.get('intent', 'unknown')
+            )
+        metrics.intent_results_total.inc(model=self.model_config.name, match=str(intent_match).lower())
         result.intent_match = intent_match
         result.intent_accuracy_type = accuracy_type
         
         # Evaluate entity extraction
-        result.entity_accuracy = self.evaluate_entity_extraction(
-            test_case.expected_entities,
-            parsed_json.get('entities', {})
-        )
+        with self.profiler.span("score_entities"):
+            result.entity_accuracy = self.evaluate_entity_extraction(
+                test_case.expected_entities,
+                parsed_json.get('entities', {})
+            )
         
         # Extract confidence score
         result.confidence_score = parsed_json.get('confidence', 0.0)
         
         return result
     
-    def execute_test_suite(self, test_cases: List[TestCase], prompt_variant: str = "production") -> List[TestResult]:
-        """Execute full test suite for this model"""
+    def execute_test_suite(self, test_cases: List[TestCase], prompt_variant: str = "production",
+                           early_stopping: Optional[EarlyStoppingMonitor] = None,
+                           samples: int = SELF_CONSISTENCY_CONFIG["samples"]) -> ResultStore:
+        """
+        Execute full test suite for this model
+        
+        Results come back in a ResultStore, which behaves like a list of TestResult.
+        
+        With samples > 1 every case is sampled repeatedly to measure output
+        stability and majority-vote accuracy (see execute_test_case).
+        
+        With an early_stopping monitor the suite ends as soon as the combination is
+        clearly worse than the best one so far; the run is then recorded in
+        self.truncation and reported as truncated in the summary statistics.
+        """
+        self.truncation = None
         
         print(f"✅ Model '{self.model_config.name}' validated successfully")
         print("=" * 60)
         
+        # Request just enough context for the longest prompt plus the output cap
+        self.context_window = None
+        self.load_time = None
+        if CONTEXT_SIZING_CONFIG["enabled"] and "num_ctx" not in self.model_config.runtime_options:
+            self.context_window = prompt_manager.get_context_window(
+                prompt_variant, [case.input for case in test_cases], self.model_config.name,
+                self._reasoning_allowance()
+            )
+            print(f"📐 Context window: {self.context_window['num_ctx']} tokens "
+                  f"(prompt ≤ {self.context_window['max_prompt_tokens']}, output ≤ {self.context_window['output_tokens']})")
+        
         # Check model availability
         if not self.test_model_availability():
             print(f"❌ Model {self.model_config.name} not available")
             return []
         
-        results = []
+        # Meter the Ollama server process rather than system-wide percentages
+        self.resource_sampler = None
+        if TEST_CONFIG["monitor_resources"]:
+            sampler = ResourceSampler()
+            if sampler.start():
+                self.resource_sampler = sampler
+            else:
+                print("⚠️  Ollama server process not found - resource metering disabled")
+        
+        # Columnar storage keeps long sweeps small; the loop still works on full TestResults
+        results = ResultStore()
         
         for i, test_case in enumerate(test_cases):
             print(f"📝 Test {i+1}/{len(test_cases)}: {test_case.input[:50]}...")
             print(f"   Language: {test_case.language}")
             print(f"   Difficulty: {test_case.difficulty}")
             
-            result = self.execute_test_case(test_case, prompt_variant, i)
+            result = self.execute_test_case(test_case, prompt_variant, samples=samples)
             results.append(result)
             
             # Print immediate feedback
@@ -311,12 +589,32 @@ class ModelEvaluator:
                 print(f"   {intent_status} Intent: {result.parsed_json.get('intent')} (Expected: {test_case.expected_intent})")
                 print(f"   Entity Accuracy: {entity_score:.1%}, Confidence: {result.confidence_score:.2f}")
                 print(f"   Time: {result.inference_time:.2f}s")
+                if result.sample_stats:
+                    majority_status = "✅" if result.sample_stats["majority_match"] else "❌"
+                    print(f"   {majority_status} Majority: {result.sample_stats['majority_intent']} "
+                          f"(agreement {result.sample_stats['agreement_rate']:.0%} of {samples} samples)")
             elif result.success:
                 print(f"   ❌ Response: JSON Invalid - {result.validation_error}")
                 print(f"   Time: {result.inference_time:.2f}s")
             else:
                 print(f"   ❌ Response: Failed - {result.error_message}")
                 print(f"   Time: {result.inference_time:.2f}s")
+            
+            stop_reason = early_stopping.update(result) if early_stopping else None
+            if stop_reason:
+                self.truncation = {
+                    "truncated": True,
+                    "reason": stop_reason,
+                    "cases_run": len(results),
+                    "cases_planned": len(test_cases)
+                }
+                print(f"⏹️  Stopping early after {len(results)}/{len(test_cases)} cases: {stop_reason}")
+                break
+        
+        if self.resource_sampler:
+            self.resource_sampler.stop()
+        prompt_manager.save_token_cache()
+        self.model_memory = running_model_memory(self.model_config.name)
         
         return results
     
@@ -330,6 +628,7 @@ class ModelEvaluator:
         successful_tests = [r for r in results if r.success]
         valid_json_tests = [r for r in results if r.json_validity]
         intent_matches = [r for r in results if r.intent_match]
+        confidence_level = TEST_CONFIG["confidence_level"]
         
         # Basic metrics
         stats = {
@@ -337,20 +636,49 @@ class ModelEvaluator:
             "success_rate": len(successful_tests) / total_tests,
             "json_validity_rate": len(valid_json_tests) / total_tests,
             "intent_accuracy_rate": len(intent_matches) / total_tests,
+            "confidence_level": confidence_level,
+            "json_validity_ci": wilson_interval(len(valid_json_tests), total_tests, confidence_level),
+            "intent_accuracy_ci": wilson_interval(len(intent_matches), total_tests, confidence_level),
             "model_name": self.model_config.name,
             "model_description": self.model_config.description
         }
         
+        if self.truncation:
+            stats["truncation"] = self.truncation
+        
         if successful_tests:
             # Timing statistics
             inference_times = [r.inference_time for r in successful_tests]
             stats["timing"] = {
                 "avg_inference_time": statistics.mean(inference_times),
                 "median_inference_time": statistics.median(inference_times),
+                "p95_inference_time": percentile(inference_times, 95),
+                "p99_inference_time": percentile(inference_times, 99),
                 "min_inference_time": min(inference_times),
                 "max_inference_time": max(inference_times)
             }
             
+            # Suite wall-clock versus summed inference time, and achieved throughput
+            timeline = summarize_timeline(
+                (r.start_timestamp, r.inference_time) for r in results if r.start_timestamp is not None
+            )
+            if timeline:
+                stats["timing"].update({
+                    "wall_clock_time": timeline["wall_clock_time"],
+                    "summed_inference_time": timeline["summed_request_time"],
+                    "throughput_rps": timeline["throughput_rps"]
+                })
+            
+            # Streaming: how much earlier than the full response the intent is known
+            intent_times = [r for r in successful_tests if r.time_to_intent is not None]
+            if intent_times:
+                stats["timing"].update({
+                    "avg_time_to_intent": statistics.mean(r.time_to_intent for r in intent_times),
+                    "median_time_to_intent": statistics.median(r.time_to_intent for r in intent_times),
+                    "p95_time_to_intent": percentile([r.time_to_intent for r in intent_times], 95),
+                    "avg_intent_lead_time": statistics.mean(r.inference_time - r.time_to_intent for r in intent_times)
+                })
+            
             # Confidence statistics
             if valid_json_tests:
                 confidence_scores = [r.confidence_score for r in valid_json_tests if r.confidence_score is not None]
@@ -362,6 +690,147 @@ class ModelEvaluator:
                         "max_confidence": max(confidence_scores)
                     }
         
+        # Token accounting and cost per correct answer
+        token_results = [r for r in results if r.prompt_tokens is not None]
+        if token_results:
+            prompt_tokens = sum(r.prompt_tokens or 0 for r in token_results)
+            completion_tokens = sum(r.completion_tokens or 0 for r in token_results)
+            total_time = sum(r.inference_time for r in successful_tests)
+            stats["tokens"] = {
+                "avg_prompt_tokens": prompt_tokens / len(token_results),
+                "avg_completion_tokens": completion_tokens / len(token_results),
+                "total_prompt_tokens": prompt_tokens,
+                "total_completion_tokens": completion_tokens,
+                "tokens_per_correct_answer": (prompt_tokens + completion_tokens) / len(intent_matches) if intent_matches else None,
+                "seconds_per_correct_answer": total_time / len(intent_matches) if intent_matches else None,
+                # Early-terminated cases: cached or estimated prompt counts, chunk-counted completions
+                "estimated_cases": sum(1 for r in token_results if r.tokens_estimated)
+            }
+        
+        # Early termination: how often streaming stopped right after the JSON object
+        streamed = [r for r in results if r.early_terminated is not None]
+        if streamed:
+            terminated = [r for r in streamed if r.early_terminated]
+            saved = [r.tokens_saved for r in terminated if r.tokens_saved is not None]
+            stats["early_termination"] = {
+                "cases": len(streamed),
+                "terminated": len(terminated),
+                "rate": len(terminated) / len(streamed),
+                "avg_streamed_tokens": statistics.mean(r.completion_tokens or 0 for r in terminated) if terminated else None,
+                # Against the mean valid full-length answer (cached across runs); None until one was seen
+                "est_tokens_saved": sum(saved) if saved else None,
+                "avg_est_tokens_saved": statistics.mean(saved) if saved else None
+            }
+        
+        # Context window and what the loaded model costs with it
+        if self.context_window or self.load_time is not None or self.model_memory:
+            window = self.context_window or {}
+            observed = [r.prompt_tokens for r in results if r.prompt_tokens is not None and not r.tokens_estimated]
+            stats["context_window"] = {
+                "num_ctx": window.get("num_ctx", self.model_config.runtime_options.get("num_ctx")),
+                "sized": bool(window),
+                "max_prompt_tokens": window.get("max_prompt_tokens"),
+                "output_tokens": window.get("output_tokens"),
+                "max_observed_prompt_tokens": max(observed) if observed else None,
+                "load_time": self.load_time,
+                "memory_mb": self.model_memory["size_mb"] if self.model_memory else None,
+                "memory_vram_mb": self.model_memory["size_vram_mb"] if self.model_memory else None
+            }
+        
+        # Thinking: reasoning tokens spent per answer (compare runs with think on and off)
+        counted = [r for r in successful_tests if r.thinking_tokens is not None]
+        if counted and (self.model_config.think is not None or any(r.thinking_tokens for r in counted)):
+            thinking_tokens = sum(r.thinking_tokens for r in counted)
+            completion_tokens = sum(r.completion_tokens or 0 for r in counted)
+            stats["thinking"] = {
+                "think": self.model_config.think,
+                "cases_with_thinking": sum(1 for r in counted if r.thinking_tokens),
+                "avg_thinking_tokens": thinking_tokens / len(counted),
+                "total_thinking_tokens": thinking_tokens,
+                "thinking_token_share": thinking_tokens / completion_tokens if completion_tokens else None
+            }
+        
+        # Hedging: how many requests were duplicated, and how often the duplicate won
+        if self.model_config.hedge_percentile is not None:
+            hedged = [r for r in results if r.hedged]
+            stats["hedging"] = {
+                "hedge_percentile": self.model_config.hedge_percentile,
+                "hedge_hosts": self.model_config.hedge_hosts,
+                "requests": len(results),
+                "hedged": len(hedged),
+                "hedge_rate": len(hedged) / len(results) if results else 0.0,
+                "hedge_wins": sum(1 for r in hedged if r.hedge_won),
+                "hedge_win_rate": sum(1 for r in hedged if r.hedge_won) / len(hedged) if hedged else None
+            }
+        
+        # Output caps: how often answers were cut off, and whether that cost validity
+        capped = [r for r in results if r.output_truncated is not None]
+        if capped:
+            truncated = [r for r in capped if r.output_truncated]
+            complete = [r for r in capped if not r.output_truncated]
+            variants = sorted({r.prompt_variant for r in capped})
+            stats["generation_limits"] = {
+                "num_predict": {
+                    variant: get_generation_options(variant, self._reasoning_allowance()).get("num_predict")
+                    for variant in variants
+                },
+                "cases": len(capped),
+                "truncated": len(truncated),
+                "truncation_rate": len(truncated) / len(capped),
+                "json_validity_truncated": sum(r.json_validity for r in truncated) / len(truncated) if truncated else None,
+                "json_validity_complete": sum(r.json_validity for r in complete) / len(complete) if complete else None,
+                # With stop sequences a missing "}" is put back, which also repairs answers
+                # that really lacked it: validity as scored and with those counted invalid
+                "brace_restored": sum(1 for r in capped if r.brace_restored),
+                "json_validity": sum(r.json_validity for r in capped) / len(capped),
+                "json_validity_without_restored": sum(r.json_validity and not r.brace_restored
+                                                      for r in capped) / len(capped),
+                "avg_completion_tokens": statistics.mean(r.completion_tokens or 0 for r in capped)
+            }
+        
+        # Time spent per pipeline stage (harness overhead vs model call)
+        if self.profiler.enabled and self.profiler.spans:
+            stats["stages"] = self.profiler.stage_summary()
+        
+        # Ollama server resources per case and for the whole model run
+        metered = [r for r in results if r.cpu_seconds is not None]
+        if metered:
+            gpu_peaks = [r.gpu_memory_mb for r in metered if r.gpu_memory_mb is not None]
+            stats["resources"] = {
+                "total_cpu_seconds": sum(r.cpu_seconds for r in metered),
+                "avg_cpu_seconds_per_case": statistics.mean(r.cpu_seconds for r in metered),
+                "peak_rss_mb": max(r.peak_rss_mb for r in metered),
+                "avg_peak_rss_mb": statistics.mean(r.peak_rss_mb for r in metered),
+                "peak_gpu_memory_mb": max(gpu_peaks) if gpu_peaks else None
+            }
+        
+        # Self-consistency: does majority voting pay for its N-times cost?
+        sampled = [r for r in results if r.sample_stats]
+        if sampled:
+            samples_per_case = max(r.sample_stats["samples"] for r in sampled)
+            single_matches = sum(1 for r in sampled if r.intent_match)
+            majority_matches = sum(1 for r in sampled if r.sample_stats["majority_match"])
+            accuracy_gain = (majority_matches - single_matches) / len(sampled)
+            sample_latencies = [t for r in sampled for t in r.sample_stats["latencies"]]
+            stats["self_consistency"] = {
+                "samples_per_case": samples_per_case,
+                "cost_multiplier": samples_per_case,
+                "single_sample_accuracy": single_matches / len(sampled),
+                "majority_vote_accuracy": majority_matches / len(sampled),
+                "majority_vote_accuracy_ci": wilson_interval(majority_matches, len(sampled), confidence_level),
+                "accuracy_gain": accuracy_gain,
+                "cases_fixed_by_vote": sum(1 for r in sampled if not r.intent_match and r.sample_stats["majority_match"]),
+                "cases_broken_by_vote": sum(1 for r in sampled if r.intent_match and not r.sample_stats["majority_match"]),
+                "avg_agreement_rate": statistics.mean(r.sample_stats["agreement_rate"] for r in sampled),
+                "unanimous_rate": sum(1 for r in sampled if r.sample_stats["agreement_rate"] == 1.0) / len(sampled),
+                "latency": {
+                    "p50": percentile(sample_latencies, 50),
+                    "p95": percentile(sample_latencies, 95),
+                    "max": max(sample_latencies)
+                } if sample_latencies else None,
+                "majority_vote_justified": accuracy_gain >= SELF_CONSISTENCY_CONFIG["min_accuracy_gain"]
+            }
+        
         # Language breakdown
         languages = {}
         for lang in set(r.language for r in results):
@@ -369,7 +838,8 @@ class ModelEvaluator:
             lang_matches = [r for r in lang_results if r.intent_match]
             languages[lang] = {
                 "total": len(lang_results),
-                "accuracy": len(lang_matches) / len(lang_results) if lang_results else 0.0
+                "accuracy": len(lang_matches) / len(lang_results) if lang_results else 0.0,
+                "accuracy_ci": wilson_interval(len(lang_matches), len(lang_results), confidence_level)
             }
         stats["by_language"] = languages
         
@@ -380,7 +850,8 @@ class ModelEvaluator:
             diff_matches = [r for r in diff_results if r.intent_match]
             difficulties[diff] = {
                 "total": len(diff_results),
-                "accuracy": len(diff_matches) / len(diff_results) if diff_results else 0.0
+                "accuracy": len(diff_matches) / len(diff_results) if diff_results else 0.0,
+                "accuracy_ci": wilson_interval(len(diff_matches), len(diff_results), confidence_level)
             }
         stats["by_difficulty"] = difficulties
         
@@ -391,12 +862,13 @@ class ModelEvaluator:
             cat_matches = [r for r in cat_results if r.intent_match]
             categories[cat] = {
                 "total": len(cat_results),
-                "accuracy": len(cat_matches) / len(cat_results) if cat_results else 0.0
+                "accuracy": len(cat_matches) / len(cat_results) if cat_results else 0.0,
+                "accuracy_ci": wilson_interval(len(cat_matches), len(cat_results), confidence_level)
             }
         stats["by_category"] = categories
         
         return stats
 
-def create_evaluator(model_config: ModelConfig) -> ModelEvaluator:
+def create_evaluator(model_config: ModelConfig, profiler: Optional[Profiler] = None) -> ModelEvaluator:
     """Factory function to create model evaluator"""
-    return ModelEvaluator(model_config)
+    return ModelEvaluator(model_config, profiler)
@@ -0,0 +1,421 @@
+"""
+Parse Cache for OdyTest - Model Evaluation Suite
+Normalized-utterance cache in front of the semantic parser, with a traffic replay benchmark
+"""
+
+import argparse
+import copy
+import random
+import statistics
+import sys
+import os
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import ModelConfig, get_model_config, get_model_list, PARSE_CACHE_CONFIG, TEST_CONFIG
+    from .test_cases import TestCase, get_test_cases
+    from .prompt_manager import get_prompt, get_generation_options, get_available_variants
+    from .test_ollama_library import OllamaClient, OllamaConfig
+    from .model_evaluator import extract_and_validate_json
+    from .results_manager import results_manager
+    from .stats_utils import latency_percentiles
+    from .metrics_server import metrics
+    from .timing import Timer, monotonic
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import ModelConfig, get_model_config, get_model_list, PARSE_CACHE_CONFIG, TEST_CONFIG # type: ignore
+    from test_cases import TestCase, get_test_cases
+    from prompt_manager import get_prompt, get_generation_options, get_available_variants
+    from test_ollama_library import OllamaClient, OllamaConfig
+    from model_evaluator import extract_and_validate_json
+    from results_manager import results_manager
+    from stats_utils import latency_percentiles
+    from metrics_server import metrics
+    from timing import Timer, monotonic
+
+def normalize_utterance(text: str) -> str:
+    """
+    Cache key of an utterance
+
+    Compatibility forms are folded (NFKC: full-width "？", non-breaking spaces,
+    decomposed umlauts), case is folded (including "ß" -> "ss"), punctuation
+    becomes whitespace and runs of whitespace collapse to one space.
+    """
+    folded = unicodedata.normalize("NFKC", unicodedata.normalize("NFKC", text).casefold())
+    return " ".join("".join(" " if unicodedata.category(char).startswith("P") else char
+                            for char in folded).split())
+
+@dataclass
+class ParseResult:
+    """Outcome of one parse through the cache"""
+    utterance: str
+    key: str
+    valid: bool
+    parsed_json: Optional[Dict[str, Any]]
+    validation_error: Optional[str]
+    cached: bool
+    latency: float
+    raw_output: Optional[str] = None
+
+class ParseCache:
+    """
+    Bounded LRU/TTL cache of validated parses in front of an OllamaClient
+
+    Entries are namespaced by model and prompt variant, so a client switched to
+    another model or a caller using another variant never sees foreign parses.
+    Only outputs that pass extract_and_validate_json are stored; a failed parse
+    is retried by the next request for the same utterance. The model is called
+    outside the lock; concurrent misses for one utterance share a generation
+    only when the client coalesces requests (OllamaConfig.coalesce).
+    """
+
+    def __init__(self, client: OllamaClient, prompt_variant: str = "production",
+                 max_entries: int = PARSE_CACHE_CONFIG["max_entries"],
+                 ttl: Optional[float] = PARSE_CACHE_CONFIG["ttl"],
+                 extra_tokens: int = 0, clock: Callable[[], float] = monotonic,
+                 inline_thinking: bool = False):
+        self.client = client
+        self.prompt_variant = prompt_variant
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Output allowance on top of the variant's cap, e.g. for <think> blocks
+        self.extra_tokens = extra_tokens
+        # Thinking arrives in the output text, so no stop sequences are sent
+        self.inline_thinking = inline_thinking
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "uncached_failures": 0}
+        self._latencies = {outcome: deque(maxlen=PARSE_CACHE_CONFIG["latency_window"]) for outcome in ("hit", "miss")}
+
+    def _lookup(self, namespace_key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(namespace_key)
+            if entry is None:
+                return None
+            stored_at, parsed = entry
+            if self.ttl is not None and self.clock() - stored_at > self.ttl:
+                del self._entries[namespace_key]
+                self._counts["expirations"] += 1
+                return None
+            self._entries.move_to_end(namespace_key)
+        # Callers get their own copy, so changing a result cannot change later hits
+        return copy.deepcopy(parsed)
+
+    def _store(self, namespace_key: Tuple[str, str, str], parsed: Dict[str, Any]):
+        snapshot = copy.deepcopy(parsed)
+        with self._lock:
+            self._entries[namespace_key] = (self.clock(), snapshot)
+            self._entries.move_to_end(namespace_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+            metrics.parse_cache_entries.set(len(self._entries))
+
+    def _record(self, model: str, prompt_variant: str, outcome: str, latency: float):
+        with self._lock:
+            self._counts["hits" if outcome == "hit" else "misses"] += 1
+            self._latencies[outcome].append(latency)
+        metrics.parse_cache_lookups_total.inc(model=model, prompt_variant=prompt_variant, outcome=outcome)
+        metrics.parse_cache_latency.observe(latency, model=model, outcome=outcome)
+
+    def parse(self, utterance: str, prompt_variant: Optional[str] = None) -> ParseResult:
+        """Parse an utterance, answering from the cache when an equivalent one was parsed before"""
+        timer = Timer()
+        variant = prompt_variant or self.prompt_variant
+        model = self.client.config.model
+        key = normalize_utterance(utterance)
+        namespace_key = (model, variant, key)
+
+        parsed = self._lookup(namespace_key)
+        if parsed is not None:
+            latency = timer.stop()
+            self._record(model, variant, "hit", latency)
+            return ParseResult(utterance, key, True, parsed, None, True, latency)
+
+        # The model sees the utterance as typed; only the key is normalized
+        options = get_generation_options(variant, self.extra_tokens, self.inline_thinking)
+        generation = self.client.generate_detailed(get_prompt(variant, utterance), options=options)
+        valid, parsed, error = extract_and_validate_json(generation.text)
+        if valid:
+            self._store(namespace_key, parsed)
+        else:
+            with self._lock:
+                self._counts["uncached_failures"] += 1
+        latency = timer.stop()
+        self._record(model, variant, "miss", latency)
+        return ParseResult(utterance, key, valid, parsed, None if valid else error, False, latency, generation.text)
+
+    def invalidate(self, model: Optional[str] = None, prompt_variant: Optional[str] = None) -> int:
+        """Drop the entries of one model and/or prompt variant (all entries by default); returns how many"""
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (model is None or k[0] == model) and (prompt_variant is None or k[1] == prompt_variant)]
+            for namespace_key in doomed:
+                del self._entries[namespace_key]
+            metrics.parse_cache_entries.set(len(self._entries))
+            return len(doomed)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, eviction counts and hit/miss latency percentiles (over the latest latency_window lookups)"""
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = {outcome: list(values) for outcome, values in self._latencies.items()}
+            entries = len(self._entries)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            **counts,
+            "lookups": lookups,
+            "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hit_latency": latency_percentiles(latencies["hit"]),
+            "miss_latency": latency_percentiles(latencies["miss"])
+        }
+
+def _perturb(text: str, rng: random.Random) -> str:
+    """Rewrite an utterance the way a repeated request typically differs from the first one"""
+    rewrites = [
+        str.lower,
+        str.upper,
+        lambda t: t[:1].upper() + t[1:],
+        lambda t: t.rstrip("?!. ") + rng.choice(["?", "!", ".", " ?", "??"]),
+        lambda t: "".join(c for c in t if not unicodedata.category(c).startswith("P")),
+        lambda t: "  " + t.replace(" ", rng.choice(["  ", " ", "\t"])) + " ",
+        lambda t: unicodedata.normalize("NFD", t),
+        lambda t: t.replace("?", "？").replace("!", "！")
+    ]
+    for rewrite in rng.sample(rewrites, rng.randint(1, 2)):
+        text = rewrite(text)
+    return text
+
+class ParseCacheReplay:
+    """
+    Replays test case inputs through a ParseCache with repetition like real traffic
+
+    Case popularity follows a Zipf distribution over a shuffled case order, so a
+    few utterances dominate and a long tail is seen once or twice. The report
+    compares the observed hit rate with the bounds of an unbounded cache keyed by
+    raw and by normalized text, and the intent accuracy of hits with misses.
+    """
+
+    def __init__(self, model_config: ModelConfig, prompt_variant: str = "production",
+                 test_cases: Optional[List[TestCase]] = None):
+        self.model_config = model_config
+        self.prompt_variant = prompt_variant
+        self.test_cases = test_cases or get_test_cases()
+        self.client = OllamaClient(OllamaConfig(
+            model=model_config.name,
+            temperature=model_config.temperature,
+            top_p=model_config.top_p,
+            timeout=model_config.timeout,
+            max_retries=model_config.max_retries,
+            think=model_config.think,
+            options=model_config.runtime_options,
+            coalesce=True
+        ))
+
+    def workload(self, requests: int = PARSE_CACHE_CONFIG["replay_requests"],
+                 zipf_exponent: float = PARSE_CACHE_CONFIG["zipf_exponent"],
+                 perturb_rate: float = PARSE_CACHE_CONFIG["perturb_rate"],
+                 seed: int = TEST_CONFIG["sample_seed"]) -> List[Tuple[TestCase, str]]:
+        """(test case, utterance as sent) pairs in arrival order"""
+        rng = random.Random(seed)
+        ranked = list(self.test_cases)
+        rng.shuffle(ranked)
+        weights = [1 / rank ** zipf_exponent for rank in range(1, len(ranked) + 1)]
+        drawn = rng.choices(ranked, weights=weights, k=requests)
+        return [(case, _perturb(case.input, rng) if rng.random() < perturb_rate else case.input) for case in drawn]
+
+    def run(self, requests: int = PARSE_CACHE_CONFIG["replay_requests"],
+            zipf_exponent: float = PARSE_CACHE_CONFIG["zipf_exponent"],
+            perturb_rate: float = PARSE_CACHE_CONFIG["perturb_rate"],
+            max_entries: int = PARSE_CACHE_CONFIG["max_entries"],
+            ttl: Optional[float] = PARSE_CACHE_CONFIG["ttl"],
+            seed: int = TEST_CONFIG["sample_seed"]) -> Dict[str, Any]:
+        """Replay one workload through a fresh cache"""
+        workload = self.workload(requests, zipf_exponent, perturb_rate, seed)
+        extra_tokens = 0 if self.model_config.think is False else self.model_config.reasoning_allowance
+        inline_thinking = self.model_config.reasoning_allowance > 0 and self.client.thinks_inline()
+        cache = ParseCache(self.client, self.prompt_variant, max_entries, ttl, extra_tokens,
+                           inline_thinking=inline_thinking)
+
+        print(f"   🔁 {self.model_config.name}: {len(workload)} requests over "
+              f"{len({case.case_id for case, _ in workload})} distinct cases")
+        outcomes = []
+        wall = Timer()
+        for case, utterance in workload:
+            try:
+                result = cache.parse(utterance)
+            except Exception as e:
+                outcomes.append({"cached": False, "error": str(e)})
+                continue
+            intent = (result.parsed_json or {}).get("intent") if result.valid else None
+            outcomes.append({"cached": result.cached, "latency": result.latency,
+                             "intent_match": intent == case.expected_intent})
+        total_time = wall.stop()
+
+        answered = [o for o in outcomes if "error" not in o]
+        hits = [o for o in answered if o["cached"]]
+        misses = [o for o in answered if not o["cached"]]
+        miss_mean = statistics.mean(o["latency"] for o in misses) if misses else None
+        utterances = [utterance for _, utterance in workload]
+
+        return {
+            "model_name": self.model_config.name,
+            "prompt_variant": self.prompt_variant,
+            "workload": {
+                "requests": len(workload),
+                "distinct_cases": len({case.case_id for case, _ in workload}),
+                "zipf_exponent": zipf_exponent,
+                "perturb_rate": perturb_rate,
+                "seed": seed
+            },
+            "cache": cache.stats(),
+            # Hit rates an unbounded cache would reach keyed by the raw or the normalized text
+            "raw_key_hit_rate_bound": 1 - len(set(utterances)) / len(utterances) if utterances else 0.0,
+            "normalized_key_hit_rate_bound": (1 - len({normalize_utterance(u) for u in utterances}) / len(utterances)
+                                              if utterances else 0.0),
+            "errors": len(outcomes) - len(answered),
+            "latency": latency_percentiles([o["latency"] for o in answered]),
+            "hit_intent_accuracy": sum(o["intent_match"] for o in hits) / len(hits) if hits else None,
+            "miss_intent_accuracy": sum(o["intent_match"] for o in misses) / len(misses) if misses else None,
+            "total_time": total_time,
+            # Every request paying the average miss latency, as without the cache
+            "uncached_time_estimate": miss_mean * len(answered) if miss_mean is not None else None
+        }
+
+def print_replay_report(report: Dict[str, Any]):
+    """Print hit rate, latency and accuracy of one replay"""
+    cache, workload = report["cache"], report["workload"]
+    print(f"\n📈 {report['model_name']} ({report['prompt_variant']})")
+    print(f"   Requests: {workload['requests']} over {workload['distinct_cases']} cases "
+          f"(zipf {workload['zipf_exponent']:g}, {workload['perturb_rate']:.0%} rewritten)")
+    print(f"   Hit rate: {cache['hit_rate']:.1%} (bound: {report['normalized_key_hit_rate_bound']:.1%} normalized, "
+          f"{report['raw_key_hit_rate_bound']:.1%} raw keys)")
+    print(f"   Evictions: {cache['evictions']}, expirations: {cache['expirations']}, "
+          f"uncached failures: {cache['uncached_failures']}, errors: {report['errors']}")
+    for outcome in ("hit", "miss"):
+        latency = cache[f"{outcome}_latency"]
+        if latency:
+            print(f"   {outcome.capitalize():<4} latency: p50 {latency['p50'] * 1000:.3f} ms, "
+                  f"p99 {latency['p99'] * 1000:.3f} ms")
+    for outcome in ("hit", "miss"):
+        accuracy = report[f"{outcome}_intent_accuracy"]
+        if accuracy is not None:
+            print(f"   {outcome.capitalize():<4} intent accuracy: {accuracy:.1%}")
+    if report["uncached_time_estimate"]:
+        print(f"   ⏱️  {report['total_time']:.1f}s with the cache vs ~{report['uncached_time_estimate']:.1f}s without "
+              f"({report['uncached_time_estimate'] / report['total_time']:.1f}x)")
+
+def test_parse_cache():
+    """Normalization, namespacing and LRU/TTL eviction against a stub client"""
+    assert normalize_utterance("  Who can replace ANNA,  Friday evening?? ") == "who can replace anna friday evening"
+    assert normalize_utterance("Wer kann Anna am Freitag ersetzen？") == normalize_utterance("wer kann anna am freitag ersetzen")
+    assert normalize_utterance(unicodedata.normalize("NFD", "Jürgen Straße")) == "jürgen strasse"
+    assert normalize_utterance("Anna krank!") == "anna krank"
+
+    class StubClient:
+        def __init__(self):
+            self.config = OllamaConfig(model="stub:1b")
+            self.calls = 0
+
+        def generate_detailed(self, prompt, options=None):
+            self.calls += 1
+            text = '{"intent": "emergency_replacement", "entities": {}, "confidence": 0.9}'
+            return type("Generation", (), {"text": text if "broken" not in prompt else "no json"})()
+
+    now = [0.0]
+    client = StubClient()
+    cache = ParseCache(client, max_entries=2, ttl=10.0, clock=lambda: now[0])
+    assert not cache.parse("Anna is sick").cached
+    assert cache.parse("anna is SICK!").cached and client.calls == 1
+    assert not cache.parse("Anna is sick", prompt_variant="concise").cached and client.calls == 2
+    client.config = OllamaConfig(model="stub:4b")
+    assert not cache.parse("Anna is sick").cached
+
+    assert cache.stats()["evictions"] == 1 and len(cache) == 2
+    assert not cache.parse("broken input").valid and not cache.parse("broken input").cached
+
+    now[0] = 11.0
+    assert not cache.parse("Anna is sick").cached and cache.stats()["expirations"] == 1
+    assert cache.invalidate(model="stub:4b") == 1 and len(cache) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 6 and stats["uncached_failures"] == 2
+
+    # Results are copies: changing one changes neither the cache nor later hits
+    cache = ParseCache(StubClient())
+    cache.parse("Anna is sick").parsed_json["intent"] = "changed"
+    cache.parse("Anna is sick").parsed_json["entities"]["date"] = "today"
+    assert cache.parse("Anna is sick").parsed_json == {"intent": "emergency_replacement", "entities": {}, "confidence": 0.9}
+    print("✅ Parse cache OK")
+
+def main():
+    """Main entry point for the parse cache replay"""
+
+    parser = argparse.ArgumentParser(
+        description="Replay test inputs with realistic repetition through the parse cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python parse_cache.py gemma3_1b
+  python parse_cache.py qwen3_0_6b --requests 1000 --zipf 1.3 --max-entries 32
+  python parse_cache.py --self-test
+        """
+    )
+
+    # No choices: Python < 3.12 rejects an empty list against them
+    parser.add_argument("models", nargs="*", metavar="MODEL",
+                        help=f"Models to replay against: {', '.join(get_model_list())} (default: all)")
+    parser.add_argument(
+        "--prompt",
+        choices=list(get_available_variants().keys()),
+        default="production",
+        help="Prompt variant to parse with (default: production)"
+    )
+    parser.add_argument("--requests", type=int, default=PARSE_CACHE_CONFIG["replay_requests"],
+                        help=f"Requests to replay (default: {PARSE_CACHE_CONFIG['replay_requests']})")
+    parser.add_argument("--zipf", type=float, default=PARSE_CACHE_CONFIG["zipf_exponent"],
+                        help=f"Zipf exponent of case popularity (default: {PARSE_CACHE_CONFIG['zipf_exponent']})")
+    parser.add_argument("--perturb", type=float, default=PARSE_CACHE_CONFIG["perturb_rate"],
+                        help=f"Share of requests rewritten (default: {PARSE_CACHE_CONFIG['perturb_rate']})")
+    parser.add_argument("--max-entries", type=int, default=PARSE_CACHE_CONFIG["max_entries"],
+                        help=f"Cache capacity (default: {PARSE_CACHE_CONFIG['max_entries']})")
+    parser.add_argument("--ttl", type=float, default=PARSE_CACHE_CONFIG["ttl"],
+                        help=f"Entry lifetime in seconds (default: {PARSE_CACHE_CONFIG['ttl']})")
+    parser.add_argument("--seed", type=int, default=TEST_CONFIG["sample_seed"], help="Random seed for the workload")
+    parser.add_argument("--self-test", action="store_true", help="Check the cache against a stub client and exit")
+
+    args = parser.parse_args()
+    unknown = [model for model in args.models if model not in get_model_list()]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+
+    if args.self_test:
+        test_parse_cache()
+        return
+
+    print(f"\n🚀 OdyTest - Parse Cache Replay")
+    print("=" * 60)
+
+    for model_key in args.models or get_model_list():
+        model_config = get_model_config(model_key)
+        report = ParseCacheReplay(model_config, args.prompt).run(
+            args.requests, args.zipf, args.perturb, args.max_entries, args.ttl, args.seed)
+        print_replay_report(report)
+        results_manager.save_benchmark_results("parse_cache", model_config.name, report)
+
+if __name__ == "__main__":
+    main()
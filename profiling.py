@@ -0,0 +1,258 @@
+"""
+Profiling for OdyTest - Model Evaluation Suite
+Span timings around evaluation pipeline stages with hook, cProfile and trace export support
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Iterator
+
+try:
+    from pyinstrument import Profiler as InstrumentProfiler
+except ImportError:
+    InstrumentProfiler = None
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import OUTPUT_CONFIG
+    from .stats_utils import percentile
+    from .timing import monotonic_ns, to_unix_ns
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import OUTPUT_CONFIG # type: ignore
+    from stats_utils import percentile
+    from timing import monotonic_ns, to_unix_ns
+
+# Pipeline stages instrumented by ModelEvaluator
+PIPELINE_STAGES = ["render_prompt", "query_model", "extract_json", "score_intent", "score_entities"]
+
+@dataclass
+class Span:
+    """Timed section of the evaluation pipeline"""
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    thread_id: int = 0
+    span_id: str = ""
+    parent_id: Optional[str] = None
+    trace_id: str = ""
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+class Profiler:
+    """
+    Collects spans around pipeline stages
+    
+    Hooks are called with every finished span, so custom collectors (metrics,
+    logging) can subscribe without touching the evaluator. One stage can be
+    captured with cProfile or pyinstrument to find where harness time goes.
+    """
+    
+    def __init__(self, enabled: bool = True, profile_stage: Optional[str] = None,
+                 profile_backend: str = "cprofile"):
+        """
+        Args:
+            enabled: Record spans; a disabled profiler only yields
+            profile_stage: Stage name to capture with a call profiler
+            profile_backend: "cprofile" (stdlib) or "pyinstrument" (optional dependency)
+        
+        Raises:
+            ValueError: Unknown profile_backend
+            ImportError: profile_backend is "pyinstrument" but it is not installed
+        """
+        if profile_backend not in ("cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profile backend: {profile_backend}")
+        # Checked up front: a failure inside the profiled stage would be caught by
+        # the evaluator and recorded as a failed request for every case
+        if profile_stage and profile_backend == "pyinstrument" and InstrumentProfiler is None:
+            raise ImportError("pyinstrument is not installed (pip install pyinstrument, "
+                              "or use the cprofile backend)")
+        self.enabled = enabled
+        self.profile_stage = profile_stage
+        self.profile_backend = profile_backend
+        self.spans: List[Span] = []
+        self.hooks: List[Callable[[Span], None]] = []
+        
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+        self._profile_lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._pyinstrument_sessions: List[Any] = []
+        if profile_stage and profile_backend == "cprofile":
+            self._cprofile = cProfile.Profile()
+    
+    def add_hook(self, hook: Callable[[Span], None]):
+        """Register a callable invoked with each finished span"""
+        self.hooks.append(hook)
+    
+    @contextmanager
+    def _capture(self, name: str) -> Iterator[None]:
+        """Run the profiled stage under the call profiler (one thread at a time)"""
+        if name != self.profile_stage or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        
+        try:
+            if self.profile_backend == "pyinstrument":
+                profiler = InstrumentProfiler()
+                profiler.start()
+                try:
+                    yield
+                finally:
+                    profiler.stop()
+                    self._pyinstrument_sessions.append(profiler)
+            else:
+                self._cprofile.enable()
+                try:
+                    yield
+                finally:
+                    self._cprofile.disable()
+        finally:
+            self._profile_lock.release()
+    
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time a pipeline stage; nested spans record their parent"""
+        if not self.enabled:
+            yield None
+            return
+        
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        
+        span = Span(
+            name=name,
+            start_ns=0,
+            thread_id=threading.get_ident(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            attributes=attributes
+        )
+        stack.append(span)
+        try:
+            with self._capture(name):
+                span.start_ns = monotonic_ns()
+                try:
+                    yield span
+                finally:
+                    span.end_ns = monotonic_ns()
+        finally:
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+            for hook in self.hooks:
+                hook(span)
+    
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and distribution of span durations per stage in milliseconds"""
+        by_name: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                by_name.setdefault(span.name, []).append(span.duration_ns / 1e6)
+        
+        return {
+            name: {
+                "count": len(durations),
+                "total_ms": sum(durations),
+                "mean_ms": sum(durations) / len(durations),
+                "p95_ms": percentile(durations, 95),
+                "max_ms": max(durations)
+            }
+            for name, durations in by_name.items()
+        }
+    
+    def export_chrome_trace(self, filepath: str) -> str:
+        """Write spans as Chrome trace events (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": span.name,
+                    "cat": "odytest",
+                    "ph": "X",
+                    "ts": to_unix_ns(span.start_ns) / 1000,
+                    "dur": span.duration_ns / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.attributes
+                }
+                for span in self.spans
+            ]
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        return filepath
+    
+    def export_otlp_json(self, filepath: str, service_name: str = "odytest") -> str:
+        """Write spans in the OpenTelemetry OTLP/JSON trace format"""
+        def attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+            converted = []
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    typed = {"boolValue": value}
+                elif isinstance(value, int):
+                    typed = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    typed = {"doubleValue": value}
+                else:
+                    typed = {"stringValue": str(value)}
+                converted.append({"key": key, "value": typed})
+            return converted
+        
+        with self._lock:
+            spans = [
+                {
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(to_unix_ns(span.start_ns)),
+                    "endTimeUnixNano": str(to_unix_ns(span.end_ns)),
+                    "attributes": attributes(dict(span.attributes, **{"thread.id": span.thread_id}))
+                }
+                for span in self.spans
+            ]
+        
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "odytest.profiling"}, "spans": spans}]
+            }]
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=OUTPUT_CONFIG["json_indent"], ensure_ascii=False)
+        return filepath
+    
+    def profile_report(self, limit: int = 20) -> Optional[str]:
+        """Text report of the call profile captured for profile_stage"""
+        if self._cprofile is not None:
+            stream = io.StringIO()
+            try:
+                pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(limit)
+            except TypeError:
+                return None  # Stage never ran, nothing captured
+            return stream.getvalue()
+        if self._pyinstrument_sessions:
+            return "\n".join(session.output_text() for session in self._pyinstrument_sessions)
+        return None
+    
+    def save_profile(self, filepath: str) -> Optional[str]:
+        """Save the captured cProfile data for snakeviz/pstats (cProfile backend only)"""
+        if self._cprofile is None:
+            return None
+        self._cprofile.dump_stats(filepath)
+        return filepath
@@ -5,9 +5,42 @@ Handles different prompt variants and production prompt loading
 
 import json
 import os
-from typing import Dict, Any, Optional
+import re
+import math
+import threading
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 
+try:
+    # Try relative imports first (when used as module)
+    from .config import OUTPUT_CONFIG, GENERATION_LIMITS_CONFIG, CONTEXT_SIZING_CONFIG
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import OUTPUT_CONFIG, GENERATION_LIMITS_CONFIG, CONTEXT_SIZING_CONFIG # type: ignore
+
+# Word pieces and individual punctuation marks; JSON-heavy prompts are
+# punctuation-dense, so counting symbols separately tracks BPE counts closely
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count when no server-reported count is available"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+def _schema_block(prompt: str) -> Optional[str]:
+    """First balanced {...} block of a rendered prompt, i.e. the output format it asks for"""
+    start = prompt.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    for position in range(start, len(prompt)):
+        if prompt[position] == "{":
+            depth += 1
+        elif prompt[position] == "}":
+            depth -= 1
+            if depth == 0:
+                return prompt[start:position + 1]
+    return None
+
 @dataclass
 class PromptVariant:
     """Single prompt variant configuration"""
@@ -15,13 +48,31 @@ class PromptVariant:
     template: str
     description: str
     best_for: str
+    # Output cap; None sizes it from the JSON schema in the template
+    max_tokens: Optional[int] = None
+    # Stop sequences; None uses GENERATION_LIMITS_CONFIG["stop"]
+    stop: Optional[Tuple[str, ...]] = None
+    # Tokens the variant asks the model to write before the JSON (e.g. reasoning steps)
+    reasoning_tokens: int = 0
 
 class PromptManager:
     """Manages different prompt variants for testing"""
     
-    def __init__(self):
+    def __init__(self, token_cache_path: Optional[str] = None, completion_cache_path: Optional[str] = None):
         self.variants = self._load_prompt_variants()
         self.production_prompt = self._load_production_prompt()
+        cache_dir = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), OUTPUT_CONFIG["results_dir"], OUTPUT_CONFIG["cache_dir"]
+        )
+        self.token_cache_path = token_cache_path or os.path.join(cache_dir, OUTPUT_CONFIG["token_cache_file"])
+        self.completion_cache_path = completion_cache_path or os.path.join(
+            cache_dir, OUTPUT_CONFIG["completion_cache_file"]
+        )
+        # model -> variant -> user_input -> server-reported prompt tokens
+        self._token_counts: Optional[Dict[str, Dict[str, Dict[str, int]]]] = None
+        # model -> variant -> [responses, answer tokens] of valid answers generated to the end
+        self._completion_counts: Optional[Dict[str, Dict[str, List[int]]]] = None
+        self._token_lock = threading.Lock()
     
     def _load_production_prompt(self) -> str:
         """Load production prompt from semantic parser config"""
@@ -109,7 +160,10 @@ Output ONLY the JSON, no other text:"""
                 name="chain_of_thought",
                 template=self._get_chain_of_thought_prompt(),
                 description="Step-by-step reasoning approach",
-                best_for="Complex scenarios, accuracy-critical tasks"
+                best_for="Complex scenarios, accuracy-critical tasks",
+                # The steps come first and may quote JSON, so only the cap applies
+                stop=(),
+                reasoning_tokens=384
             )
         }
     
@@ -289,12 +343,177 @@ Process the input and output ONLY the final JSON:"""
         
         return template.format(user_input=user_input, context_str=context_str)
     
-    def get_available_variants(self) -> Dict[str, str]:
-        """Get list of available prompt variants with descriptions"""
+    def get_available_variants(self, model: Optional[str] = None) -> Dict[str, str]:
+        """Get list of available prompt variants with descriptions and token cost"""
         variants = {"production": "Current production prompt from semantic parser config"}
         variants.update({name: variant.description for name, variant in self.variants.items() if name != "production"})
+        
+        for name in variants:
+            budget = self.get_token_budget(name, model)
+            label = "tokens" if budget["source"] == "server" else "tokens est."
+            variants[name] = f"{variants[name]} (~{budget['prompt_tokens']} {label})"
         return variants
     
+    def _load_token_counts(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Lazily load cached server-reported token counts"""
+        if self._token_counts is None:
+            try:
+                with open(self.token_cache_path, 'r', encoding='utf-8') as f:
+                    self._token_counts = json.load(f)
+            except (OSError, ValueError):
+                self._token_counts = {}
+        return self._token_counts
+    
+    def _load_completion_counts(self) -> Dict[str, Dict[str, List[int]]]:
+        """Lazily load cached full-length completion counts"""
+        if self._completion_counts is None:
+            try:
+                with open(self.completion_cache_path, 'r', encoding='utf-8') as f:
+                    self._completion_counts = json.load(f)
+            except (OSError, ValueError):
+                self._completion_counts = {}
+        return self._completion_counts
+    
+    def record_prompt_tokens(self, model: str, variant_name: str, user_input: str, prompt_tokens: int):
+        """Cache the server-reported prompt token count for a rendered test case"""
+        with self._token_lock:
+            by_input = self._load_token_counts().setdefault(model, {}).setdefault(variant_name, {})
+            # Ollama reports fewer tokens when the prompt prefix is served from its
+            # KV cache, so keep the largest count seen for the full rendered prompt
+            by_input[user_input] = max(prompt_tokens, by_input.get(user_input, 0))
+    
+    def record_completion_tokens(self, model: str, variant_name: str, answer_tokens: int):
+        """
+        Count a valid answer that was generated to the end (not cut by early
+        termination or num_predict), the baseline for estimating tokens saved
+        """
+        with self._token_lock:
+            counts = self._load_completion_counts().setdefault(model, {}).setdefault(variant_name, [0, 0])
+            counts[0] += 1
+            counts[1] += answer_tokens
+    
+    def typical_completion_tokens(self, model: str, variant_name: str) -> Optional[int]:
+        """Mean answer length of full valid completions for a model and variant, if any were seen"""
+        with self._token_lock:
+            responses, tokens = self._load_completion_counts().get(model, {}).get(variant_name, [0, 0])
+        return round(tokens / responses) if responses else None
+    
+    def save_token_cache(self):
+        """Persist cached token counts so later runs can report server counts"""
+        with self._token_lock:
+            for path, counts in ((self.token_cache_path, self._token_counts),
+                                 (self.completion_cache_path, self._completion_counts)):
+                if not counts:
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(counts, f, indent=OUTPUT_CONFIG["json_indent"], ensure_ascii=False)
+    
+    def count_prompt_tokens(self, variant_name: str, user_input: str = "", model: Optional[str] = None) -> int:
+        """Get prompt token count for a rendered test case, server-reported when cached"""
+        if model is not None:
+            cached = self._load_token_counts().get(model, {}).get(variant_name, {}).get(user_input)
+            if cached:
+                return cached
+        return estimate_tokens(self.get_prompt(variant_name, user_input))
+    
+    def get_token_budget(self, variant_name: str, model: Optional[str] = None,
+                         user_inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get prompt token accounting for a variant
+        
+        Uses the mean of server-reported counts cached for the model when available,
+        otherwise the estimate for the template rendered with the given inputs.
+        """
+        cached = self._load_token_counts().get(model, {}).get(variant_name, {}) if model else {}
+        if user_inputs is not None:
+            cached = {text: cached[text] for text in user_inputs if text in cached}
+        
+        if cached:
+            counts = list(cached.values())
+            source = "server"
+        else:
+            counts = [estimate_tokens(self.get_prompt(variant_name, text)) for text in (user_inputs or [""])]
+            source = "estimate"
+        
+        return {
+            "variant": variant_name,
+            "model": model,
+            "prompt_tokens": round(sum(counts) / len(counts)),
+            "min_prompt_tokens": min(counts),
+            "max_prompt_tokens": max(counts),
+            "samples": len(counts),
+            "source": source
+        }
+    
+    def get_generation_options(self, variant_name: str, extra_tokens: int = 0,
+                               inline_thinking: bool = False) -> Dict[str, Any]:
+        """
+        Get Ollama options that cap the output of a variant
+        
+        num_predict is the variant's max_tokens, or the estimated size of the JSON
+        schema in its template times the configured headroom (at least min_tokens)
+        plus its reasoning_tokens. extra_tokens is added for models that write a
+        <think> block first. With inline_thinking (reasoning arrives in the output
+        text, often with JSON drafts) no stop sequences are sent, since one inside
+        the <think> block would end generation before the answer. Returns {} when
+        generation limits are disabled.
+        """
+        if not GENERATION_LIMITS_CONFIG["enabled"]:
+            return {}
+        variant = self.get_variant_info(variant_name)
+        if variant is None:
+            raise ValueError(f"Unknown prompt variant: {variant_name}")
+        
+        max_tokens = variant.max_tokens
+        if max_tokens is None:
+            schema = _schema_block(self.get_prompt(variant_name, ""))
+            schema_tokens = estimate_tokens(schema) if schema else 0
+            max_tokens = max(GENERATION_LIMITS_CONFIG["min_tokens"],
+                             math.ceil(schema_tokens * GENERATION_LIMITS_CONFIG["headroom"]))
+            max_tokens += variant.reasoning_tokens
+        
+        stop = variant.stop if variant.stop is not None else GENERATION_LIMITS_CONFIG["stop"]
+        if inline_thinking:
+            stop = ()
+        options: Dict[str, Any] = {"num_predict": max_tokens + extra_tokens}
+        if stop:
+            options["stop"] = list(stop)
+        return options
+    
+    def get_context_window(self, variant_name: str, user_inputs: List[str], model: Optional[str] = None,
+                           extra_tokens: int = 0) -> Dict[str, Any]:
+        """
+        Get the smallest context window that fits every test input for a variant
+        
+        The need is the largest prompt (server-reported when cached for the model,
+        otherwise estimated with a safety margin) plus the variant's output cap,
+        rounded up to the configured granularity.
+        """
+        budget = self.get_token_budget(variant_name, model, user_inputs)
+        margin = CONTEXT_SIZING_CONFIG["estimate_margin"]
+        prompt_tokens = budget["max_prompt_tokens"]
+        if budget["source"] == "estimate":
+            prompt_tokens = math.ceil(prompt_tokens * margin)
+        elif budget["samples"] < len(set(user_inputs)):
+            # Inputs without a cached count are only estimated
+            estimated = max(estimate_tokens(self.get_prompt(variant_name, text)) for text in user_inputs)
+            prompt_tokens = max(prompt_tokens, math.ceil(estimated * margin))
+        
+        output_tokens = self.get_generation_options(variant_name, extra_tokens).get("num_predict")
+        if output_tokens is None:
+            output_tokens = CONTEXT_SIZING_CONFIG["default_output_tokens"] + extra_tokens
+        
+        granularity = CONTEXT_SIZING_CONFIG["granularity"]
+        needed = prompt_tokens + output_tokens
+        return {
+            "variant": variant_name,
+            "num_ctx": max(CONTEXT_SIZING_CONFIG["min_ctx"], math.ceil(needed / granularity) * granularity),
+            "max_prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "source": budget["source"]
+        }
+    
     def get_variant_info(self, variant_name: str) -> Optional[PromptVariant]:
         """Get detailed information about a specific variant"""
         if variant_name == "production":
@@ -313,6 +532,44 @@ def get_prompt(variant_name: str, user_input: str, context_str: str = "") -> str
     """Get formatted prompt for specific variant"""
     return prompt_manager.get_prompt(variant_name, user_input, context_str)
 
-def get_available_variants() -> Dict[str, str]:
+def get_available_variants(model: Optional[str] = None) -> Dict[str, str]:
     """Get list of available prompt variants"""
-    return prompt_manager.get_available_variants()
+    return prompt_manager.get_available_variants(model)
+
+def count_prompt_tokens(variant_name: str, user_input: str = "", model: Optional[str] = None) -> int:
+    """Get prompt token count for a rendered test case"""
+    return prompt_manager.count_prompt_tokens(variant_name, user_input, model)
+
+def get_generation_options(variant_name: str, extra_tokens: int = 0, inline_thinking: bool = False) -> Dict[str, Any]:
+    """Get num_predict/stop options for a prompt variant"""
+    return prompt_manager.get_generation_options(variant_name, extra_tokens, inline_thinking)
+
+def test_stop_sequences_with_inline_thinking():
+    """A stop sequence inside a <think> block cuts the answer off, so none are sent with inline thinking"""
+    try:
+        from .streaming_json import split_thinking, restore_stripped_brace
+    except ImportError:
+        from streaming_json import split_thinking, restore_stripped_brace
+
+    answer = '{"intent": "information", "entities": {"employee_name": "Anna"}, "confidence": 0.9}'
+    output = ('<think>\nDraft: {"intent": "view_schedule"}\n\nNo, they ask about a person.\n</think>\n'
+              + answer + "\n\nAnything else?")
+
+    def generate(options: Dict[str, Any]) -> str:
+        """Stub of the server: cut at the first stop sequence, which is dropped from the output"""
+        cuts = [output.find(stop) for stop in options.get("stop", []) if stop in output]
+        return output[:min(cuts)] if cuts else output
+
+    options = get_generation_options("production")
+    assert options["stop"], options
+    thinking, text = split_thinking(restore_stripped_brace(generate(options)))
+    assert text == "" and "Draft" in thinking, (thinking, text)
+
+    options = get_generation_options("production", inline_thinking=True)
+    assert "stop" not in options and options["num_predict"] == get_generation_options("production")["num_predict"]
+    thinking, text = split_thinking(generate(options))
+    assert text.strip().startswith(answer), text
+    print("✅ Stop sequences OK: left out when thinking arrives inline")
+
+if __name__ == "__main__":
+    test_stop_sequences_with_inline_thinking()
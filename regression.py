@@ -0,0 +1,239 @@
+"""
+Regression Checks for OdyTest - Model Evaluation Suite
+Compares a run against a stored baseline for the same model and prompt variant
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Dict, Any, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import REGRESSION_CONFIG, OUTPUT_CONFIG, TEST_CONFIG
+    from .results_manager import ResultsManager, results_manager
+    from .stats_utils import mann_whitney_u, bootstrap_difference_interval, percentile
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import REGRESSION_CONFIG, OUTPUT_CONFIG, TEST_CONFIG # type: ignore
+    from results_manager import ResultsManager, results_manager
+    from stats_utils import mann_whitney_u, bootstrap_difference_interval, percentile
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+def _p95(values: List[float]) -> float:
+    return percentile(values, 95)
+
+class RegressionChecker:
+    """Stores baseline runs and compares new runs against them"""
+    
+    def __init__(self, manager: ResultsManager = results_manager):
+        self.results_manager = manager
+        # Kept under the cache directory so report-only runs, which load every
+        # results/*.json, do not mistake it for a results file
+        self.baselines_path = os.path.join(
+            manager.results_dir, OUTPUT_CONFIG["cache_dir"], REGRESSION_CONFIG["baselines_file"]
+        )
+    
+    @staticmethod
+    def baseline_key(model_name: str, prompt_variant: str) -> str:
+        return f"{model_name}_{prompt_variant}"
+    
+    def _load_baselines(self) -> Dict[str, str]:
+        if not os.path.exists(self.baselines_path):
+            return {}
+        with open(self.baselines_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def set_baseline(self, filepath: str) -> Optional[str]:
+        """Designate a results file as the baseline for its model and prompt variant"""
+        data = self.results_manager.load_model_results(filepath)
+        if not data:
+            return None
+        
+        key = self.baseline_key(data["metadata"]["model_name"], data["metadata"]["prompt_variant"])
+        baselines = self._load_baselines()
+        baselines[key] = os.path.relpath(filepath, self.results_manager.base_dir)
+        os.makedirs(os.path.dirname(self.baselines_path), exist_ok=True)
+        with open(self.baselines_path, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=OUTPUT_CONFIG["json_indent"], ensure_ascii=False)
+        return key
+    
+    def get_baseline(self, model_name: str, prompt_variant: str) -> Optional[str]:
+        """Path of the baseline results file for a model and prompt variant, if one is set"""
+        path = self._load_baselines().get(self.baseline_key(model_name, prompt_variant))
+        return os.path.join(self.results_manager.base_dir, path) if path else None
+    
+    def _latency_checks(self, baseline: List[float], candidate: List[float]) -> List[Dict[str, Any]]:
+        threshold = REGRESSION_CONFIG["latency_threshold"]
+        alpha = REGRESSION_CONFIG["alpha"]
+        
+        # Median shift: rank test on per-case latencies, slower is worse
+        base_p50, cand_p50 = statistics.median(baseline), statistics.median(candidate)
+        _, p_value = mann_whitney_u(candidate, baseline, alternative="greater")
+        change = (cand_p50 - base_p50) / base_p50 if base_p50 else 0.0
+        checks = [{
+            "metric": "latency_p50", "baseline": base_p50, "candidate": cand_p50,
+            "change": change, "p_value": p_value,
+            "regressed": change > threshold and p_value < alpha
+        }]
+        
+        # Tail: bootstrap the p95 difference, since rank tests say little about tails
+        base_p95, cand_p95 = _p95(baseline), _p95(candidate)
+        low, high = bootstrap_difference_interval(baseline, candidate, _p95, 1 - 2 * alpha,
+                                                  REGRESSION_CONFIG["bootstrap_resamples"],
+                                                  TEST_CONFIG["sample_seed"])
+        change = (cand_p95 - base_p95) / base_p95 if base_p95 else 0.0
+        checks.append({
+            "metric": "latency_p95", "baseline": base_p95, "candidate": cand_p95,
+            "change": change, "ci": [low, high],
+            "regressed": change > threshold and low > 0
+        })
+        return checks
+    
+    def _throughput_check(self, baseline: List[float], candidate: List[float]) -> Dict[str, Any]:
+        base, cand = statistics.median(baseline), statistics.median(candidate)
+        _, p_value = mann_whitney_u(candidate, baseline, alternative="less")
+        change = (cand - base) / base if base else 0.0
+        return {
+            "metric": "tokens_per_second", "baseline": base, "candidate": cand,
+            "change": change, "p_value": p_value,
+            "regressed": -change > REGRESSION_CONFIG["tokens_per_second_threshold"]
+                         and p_value < REGRESSION_CONFIG["alpha"]
+        }
+    
+    def _rate_check(self, metric: str, baseline: List[float], candidate: List[float]) -> Dict[str, Any]:
+        alpha = REGRESSION_CONFIG["alpha"]
+        base, cand = _mean(baseline), _mean(candidate)
+        # One-sided at alpha: the upper bound of a (1 - 2*alpha) interval
+        low, high = bootstrap_difference_interval(baseline, candidate, _mean, 1 - 2 * alpha,
+                                                  REGRESSION_CONFIG["bootstrap_resamples"],
+                                                  TEST_CONFIG["sample_seed"])
+        return {
+            "metric": metric, "baseline": base, "candidate": cand,
+            "change": cand - base, "ci": [low, high],
+            "regressed": base - cand > REGRESSION_CONFIG["accuracy_threshold"] and high < 0
+        }
+    
+    def compare(self, baseline_data: Dict[str, Any], candidate_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compare two loaded results files on latency, tokens/sec, JSON validity and intent accuracy"""
+        
+        def per_case(data: Dict[str, Any]) -> Dict[str, List[float]]:
+            results = data["detailed_results"]
+            answered = [r for r in results if r["success"]]
+            return {
+                "latency": [r["inference_time"] for r in answered],
+                "tokens_per_second": [r["completion_tokens"] / r["inference_time"] for r in answered
+                                      if r.get("completion_tokens") and r["inference_time"] > 0],
+                "json_validity": [float(r["json_validity"]) for r in results],
+                "intent_accuracy": [float(r["intent_match"]) for r in results]
+            }
+        
+        baseline, candidate = per_case(baseline_data), per_case(candidate_data)
+        checks = []
+        if baseline["latency"] and candidate["latency"]:
+            checks.extend(self._latency_checks(baseline["latency"], candidate["latency"]))
+        if baseline["tokens_per_second"] and candidate["tokens_per_second"]:
+            checks.append(self._throughput_check(baseline["tokens_per_second"], candidate["tokens_per_second"]))
+        for metric in ("json_validity", "intent_accuracy"):
+            if baseline[metric] and candidate[metric]:
+                checks.append(self._rate_check(metric, baseline[metric], candidate[metric]))
+        
+        return {
+            "model_name": candidate_data["metadata"]["model_name"],
+            "prompt_variant": candidate_data["metadata"]["prompt_variant"],
+            "baseline_timestamp": baseline_data["metadata"]["timestamp"],
+            "candidate_timestamp": candidate_data["metadata"]["timestamp"],
+            "checks": checks,
+            "regressions": [check["metric"] for check in checks if check["regressed"]]
+        }
+    
+    def check_file(self, filepath: str, baseline_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Compare a results file against its stored (or an explicit) baseline"""
+        candidate = self.results_manager.load_model_results(filepath)
+        if not candidate:
+            return None
+        
+        metadata = candidate["metadata"]
+        baseline_path = baseline_path or self.get_baseline(metadata["model_name"], metadata["prompt_variant"])
+        if not baseline_path:
+            print(f"⚠️  No baseline set for {metadata['model_name']} ({metadata['prompt_variant']})")
+            return None
+        
+        baseline = self.results_manager.load_model_results(baseline_path)
+        return self.compare(baseline, candidate) if baseline else None
+
+def print_regression_report(report: Dict[str, Any]):
+    """Print each check with its change and significance"""
+    print(f"\n🔎 {report['model_name']} ({report['prompt_variant']}): "
+          f"{report['candidate_timestamp']} vs baseline {report['baseline_timestamp']}")
+    for check in report["checks"]:
+        marker = "❌" if check["regressed"] else "✅"
+        if check["metric"].startswith("latency") or check["metric"] == "tokens_per_second":
+            change = f"{check['change']:+.1%}"
+        else:
+            change = f"{check['change'] * 100:+.1f} pts"
+        evidence = f"p={check['p_value']:.3f}" if "p_value" in check else \
+            f"CI {check['ci'][0]:+.3f} to {check['ci'][1]:+.3f}"
+        print(f"   {marker} {check['metric']}: {check['baseline']:.3f} → {check['candidate']:.3f} ({change}, {evidence})")
+    
+    if report["regressions"]:
+        print(f"   ❌ Regressions: {', '.join(report['regressions'])}")
+    else:
+        print(f"   ✅ No regressions")
+
+def main():
+    """Main entry point for baseline management and regression checks"""
+    
+    parser = argparse.ArgumentParser(
+        description="Compare test runs against stored baselines",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python regression.py set-baseline results/gemma3_1b_production_20250101_120000.json
+  python regression.py compare results/gemma3_1b_production_20250102_120000.json
+  python regression.py compare new.json --baseline old.json
+
+Exit codes: 0 no regression, 1 regression detected, 2 missing baseline or unreadable file
+(a regression takes precedence over a missing baseline)
+        """
+    )
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    set_parser = subparsers.add_parser("set-baseline", help="Designate a results file as baseline")
+    set_parser.add_argument("results_file", help="Results file to use as baseline")
+    
+    compare_parser = subparsers.add_parser("compare", help="Compare results files against their baselines")
+    compare_parser.add_argument("results_files", nargs="+", help="Results files to check")
+    compare_parser.add_argument("--baseline", help="Explicit baseline file instead of the stored one")
+    
+    args = parser.parse_args()
+    checker = RegressionChecker()
+    
+    if args.command == "set-baseline":
+        key = checker.set_baseline(args.results_file)
+        if not key:
+            sys.exit(2)
+        print(f"📌 Baseline for {key}: {args.results_file}")
+        return
+    
+    regressed = missing = False
+    for filepath in args.results_files:
+        report = checker.check_file(filepath, args.baseline)
+        if report is None:
+            missing = True
+            continue
+        print_regression_report(report)
+        regressed = regressed or bool(report["regressions"])
+    
+    sys.exit(1 if regressed else 2 if missing else 0)
+
+if __name__ == "__main__":
+    main()
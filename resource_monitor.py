@@ -0,0 +1,221 @@
+"""
+Resource Monitor for OdyTest - Model Evaluation Suite
+Samples CPU time and memory of the Ollama server process and attributes them to requests
+"""
+
+import itertools
+import threading
+from typing import Dict, Any, List, Optional
+
+import ollama
+import psutil
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import RESOURCE_MONITOR_CONFIG
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import RESOURCE_MONITOR_CONFIG # type: ignore
+
+class ResourceSampler:
+    """
+    Background sampler attached to the Ollama server process tree
+    
+    Every interval the CPU time consumed by the server (and its model runner
+    children) since the previous sample is split evenly across the requests in
+    flight, and resident memory is recorded as a running peak per request.
+    Requests also take a sample when they begin and end, so short requests and
+    sequential runs are attributed exactly rather than at interval granularity.
+    """
+    
+    def __init__(self, pid: Optional[int] = RESOURCE_MONITOR_CONFIG["pid"],
+                 process_name: str = RESOURCE_MONITOR_CONFIG["process_name"],
+                 interval: float = RESOURCE_MONITOR_CONFIG["interval"],
+                 include_children: bool = RESOURCE_MONITOR_CONFIG["include_children"],
+                 sample_gpu: bool = RESOURCE_MONITOR_CONFIG["sample_gpu"]):
+        self.pid = pid
+        self.process_name = process_name.lower()
+        self.interval = interval
+        self.include_children = include_children
+        self.sample_gpu = sample_gpu
+        
+        self._roots: List[psutil.Process] = []
+        self._cpu_seen: Dict[int, float] = {}
+        self._in_flight: Dict[int, Dict[str, Any]] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._nvml = None
+        self.peak_rss_mb = 0.0
+        self.total_cpu_seconds = 0.0
+    
+    def _matches(self, name: str) -> bool:
+        """Match the server and its runners (ollama, ollama_llama_server) but not the tray app"""
+        base = name.lower()
+        if base.endswith(".exe"):
+            base = base[:-4]
+        return base == self.process_name or base.startswith(self.process_name + "_")
+    
+    def _find_roots(self) -> List[psutil.Process]:
+        """Locate the Ollama server process(es) by PID or name"""
+        if self.pid is not None:
+            return [psutil.Process(self.pid)]
+        
+        matches = [p for p in psutil.process_iter(['name']) if self._matches(p.info['name'] or "")]
+        match_pids = {p.pid for p in matches}
+        # Keep top-level matches only; runners are picked up as children
+        return [p for p in matches if p.ppid() not in match_pids]
+    
+    def _processes(self) -> List[psutil.Process]:
+        """Current server process tree (runners come and go as models load)"""
+        processes = []
+        for root in self._roots:
+            processes.append(root)
+            if self.include_children:
+                try:
+                    processes.extend(root.children(recursive=True))
+                except psutil.Error:
+                    pass
+        return processes
+    
+    def _gpu_memory_mb(self) -> Optional[float]:
+        """Device memory in use across GPUs (requires pynvml)"""
+        if self._nvml is None:
+            return None
+        try:
+            total = 0
+            for index in range(self._nvml.nvmlDeviceGetCount()):
+                handle = self._nvml.nvmlDeviceGetHandleByIndex(index)
+                total += self._nvml.nvmlDeviceGetMemoryInfo(handle).used
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+    
+    def _sample(self):
+        """Take one sample and attribute it to in-flight requests (caller holds the lock)"""
+        cpu_delta = 0.0
+        rss = 0
+        for process in self._processes():
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    cpu = times.user + times.system
+                    rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+            # Processes that appear mid-run (model runners) count from zero
+            cpu_delta += max(0.0, cpu - self._cpu_seen.get(process.pid, 0.0))
+            self._cpu_seen[process.pid] = cpu
+        
+        rss_mb = rss / (1024 * 1024)
+        gpu_mb = self._gpu_memory_mb() if self.sample_gpu else None
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.total_cpu_seconds += cpu_delta
+        
+        if not self._in_flight:
+            return
+        share = cpu_delta / len(self._in_flight)
+        for usage in self._in_flight.values():
+            usage["cpu_seconds"] += share
+            usage["peak_rss_mb"] = max(usage["peak_rss_mb"], rss_mb)
+            if gpu_mb is not None:
+                usage["gpu_memory_mb"] = max(usage["gpu_memory_mb"] or 0.0, gpu_mb)
+    
+    def _run(self):
+        """Sampling loop"""
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                self._sample()
+    
+    def start(self) -> bool:
+        """Attach to the Ollama process and start sampling; False if it cannot be found"""
+        try:
+            self._roots = self._find_roots()
+        except psutil.Error:
+            self._roots = []
+        if not self._roots:
+            return False
+        
+        if self.sample_gpu:
+            try:
+                import pynvml
+                pynvml.nvmlInit()
+                self._nvml = pynvml
+            except Exception:
+                self._nvml = None
+        
+        with self._lock:
+            # Baseline sample so CPU spent before the run is not attributed
+            for process in self._processes():
+                try:
+                    times = process.cpu_times()
+                    self._cpu_seen[process.pid] = times.user + times.system
+                except psutil.Error:
+                    continue
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    @property
+    def attached(self) -> bool:
+        """Whether the sampler found the server process"""
+        return bool(self._roots)
+    
+    def begin_request(self) -> int:
+        """Register an in-flight request; returns a token for end_request"""
+        with self._lock:
+            if self.attached:
+                self._sample()
+            token = next(self._tokens)
+            self._in_flight[token] = {"cpu_seconds": 0.0, "peak_rss_mb": 0.0, "gpu_memory_mb": None}
+            return token
+    
+    def end_request(self, token: int) -> Dict[str, Any]:
+        """Finish a request and return its CPU-seconds, peak RSS and peak GPU memory"""
+        with self._lock:
+            if self.attached:
+                self._sample()
+            return self._in_flight.pop(token)
+
+def _model_tag(name: str) -> str:
+    """Model name with the implicit :latest tag made explicit"""
+    return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+def running_model_memory(model: str) -> Optional[Dict[str, Any]]:
+    """
+    Memory of a loaded model from the server's running-models list (ollama ps)
+    
+    size covers weights plus KV cache and compute buffers, so it reflects num_ctx
+    and num_batch. Returns None when the model is not loaded or the server is unreachable.
+    """
+    try:
+        running = ollama.ps()
+    except Exception:
+        return None
+    
+    for entry in running.get('models') or []:
+        if _model_tag(model) in (_model_tag(entry.get('model') or ""), _model_tag(entry.get('name') or "")):
+            return {
+                "size_mb": (entry.get('size') or 0) / (1024 * 1024),
+                "size_vram_mb": (entry.get('size_vram') or 0) / (1024 * 1024),
+                # Only reported by newer servers
+                "context_length": entry.get('context_length')
+            }
+    return None
+
+def unload_model(model: str):
+    """Ask the server to unload a model so the next request loads it cold"""
+    try:
+        ollama.generate(model=model, keep_alive=0)
+    except Exception:
+        pass
@@ -0,0 +1,231 @@
+"""
+Result Store for OdyTest - Model Evaluation Suite
+Compact columnar storage for test results with a TestResult-compatible view
+"""
+
+import math
+from array import array
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Union
+
+# Fields taken from the test case; stored once per distinct case and referenced by index
+CASE_FIELDS = ("test_case_id", "input_query", "expected_intent", "expected_entities",
+               "language", "difficulty", "category")
+# Low-cardinality strings, stored as codes into a shared string table
+CODED_FIELDS = ("model_name", "prompt_variant", "intent_accuracy_type")
+BOOL_FIELDS = ("success", "json_validity", "intent_match")
+# Optional floats; None is stored as NaN
+FLOAT_FIELDS = ("inference_time", "confidence_score", "start_timestamp",
+                "cpu_seconds", "peak_rss_mb", "gpu_memory_mb", "eval_duration", "time_to_intent")
+# Optional non-negative ints; None is stored as -1
+INT_FIELDS = ("prompt_tokens", "completion_tokens", "tokens_saved", "thinking_tokens")
+OBJECT_FIELDS = ("raw_output", "parsed_json", "entity_accuracy")
+# Usually None; only rows that have a value pay for it
+SPARSE_FIELDS = ("validation_error", "error_message", "early_terminated", "tokens_estimated", "output_truncated",
+                 "brace_restored", "thinking", "hedged", "hedge_won", "sample_stats")
+
+# TestResult field order, used for dict output
+RESULT_FIELDS = ("model_name", "prompt_variant", "test_case_id", "input_query", "expected_intent",
+                 "expected_entities", "language", "difficulty", "category", "success", "inference_time",
+                 "raw_output", "json_validity", "parsed_json", "validation_error", "intent_match",
+                 "intent_accuracy_type", "entity_accuracy", "confidence_score", "error_message",
+                 "start_timestamp", "cpu_seconds", "peak_rss_mb", "gpu_memory_mb", "prompt_tokens",
+                 "completion_tokens", "eval_duration", "early_terminated", "tokens_saved",
+                 "tokens_estimated", "time_to_intent", "output_truncated", "brace_restored", "thinking",
+                 "thinking_tokens", "hedged", "hedge_won", "sample_stats")
+
+_CASE_POSITIONS = {name: position for position, name in enumerate(CASE_FIELDS)}
+
+class ResultView:
+    """Read/write view of one stored result with the attributes of TestResult"""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "ResultStore", index: int):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name: str) -> Any:
+        return self._store.get(self._index, name)
+
+    def __setattr__(self, name: str, value: Any):
+        self._store.set(self._index, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values as a dict (nested values are shared, not copied)"""
+        return self._store.to_dict(self._index)
+
+    def __repr__(self) -> str:
+        return f"ResultView({self.model_name!r}, {self.test_case_id!r})"
+
+class ResultStore:
+    """
+    Append-only, list-like collection of test results stored column by column
+
+    Scalars live in typed arrays, repeated strings in a shared table, and the
+    test case fields (input, expected intent/entities, language, ...) once per
+    distinct case. Indexing and iteration yield ResultView objects, so code
+    written against List[TestResult] keeps working.
+    """
+
+    def __init__(self, results: Optional[List[Any]] = None):
+        self._cases: List[Tuple[Any, ...]] = []
+        self._case_index: Dict[Any, int] = {}
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+
+        self._case_refs = array("I")
+        self._coded = {name: array("H") for name in CODED_FIELDS}
+        self._bools = {name: array("b") for name in BOOL_FIELDS}
+        self._floats = {name: array("d") for name in FLOAT_FIELDS}
+        self._ints = {name: array("q") for name in INT_FIELDS}
+        self._objects: Dict[str, List[Any]] = {name: [] for name in OBJECT_FIELDS}
+        self._sparse: Dict[str, Dict[int, Any]] = {name: {} for name in SPARSE_FIELDS}
+
+        for result in results or []:
+            self.append(result)
+
+    def _code(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def _case_ref(self, result: Any) -> int:
+        case = tuple(getattr(result, name) for name in CASE_FIELDS)
+        # Case IDs are content hashes, so the ID alone normally identifies the case;
+        # custom IDs that collide with different content fall back to a full key
+        ref = self._case_index.get(case[0])
+        if ref is not None and self._cases[ref][1:3] == case[1:3]:
+            return ref
+        key = case[0] if ref is None else case[:3] + case[4:]
+        ref = self._case_index.get(key)
+        if ref is None:
+            ref = self._case_index[key] = len(self._cases)
+            self._cases.append(case)
+        return ref
+    
+    def append(self, result: Any):
+        """Store a TestResult (or any object with the same attributes)"""
+        index = len(self._case_refs)
+        self._case_refs.append(self._case_ref(result))
+        for name, column in self._coded.items():
+            column.append(self._code(getattr(result, name)))
+        for name, column in self._bools.items():
+            column.append(bool(getattr(result, name)))
+        for name, column in self._floats.items():
+            value = getattr(result, name)
+            column.append(math.nan if value is None else value)
+        for name, column in self._ints.items():
+            value = getattr(result, name)
+            column.append(-1 if value is None else value)
+        for name, column in self._objects.items():
+            column.append(getattr(result, name))
+        for name, column in self._sparse.items():
+            value = getattr(result, name)
+            if value is not None:
+                column[index] = value
+
+    def get(self, index: int, name: str) -> Any:
+        """Value of one field of one result"""
+        if name in self._floats:
+            value = self._floats[name][index]
+            return None if math.isnan(value) else value
+        if name in self._coded:
+            return self._strings[self._coded[name][index]]
+        if name in self._bools:
+            return bool(self._bools[name][index])
+        if name in self._objects:
+            return self._objects[name][index]
+        if name in self._sparse:
+            return self._sparse[name].get(index)
+        if name in self._ints:
+            value = self._ints[name][index]
+            return None if value < 0 else value
+        if name in _CASE_POSITIONS:
+            return self._cases[self._case_refs[index]][_CASE_POSITIONS[name]]
+        raise AttributeError(f"TestResult has no field '{name}'")
+
+    def set(self, index: int, name: str, value: Any):
+        """Update one field of one result"""
+        if name in self._floats:
+            self._floats[name][index] = math.nan if value is None else value
+        elif name in self._coded:
+            self._coded[name][index] = self._code(value)
+        elif name in self._bools:
+            self._bools[name][index] = bool(value)
+        elif name in self._objects:
+            self._objects[name][index] = value
+        elif name in self._sparse:
+            if value is None:
+                self._sparse[name].pop(index, None)
+            else:
+                self._sparse[name][index] = value
+        elif name in self._ints:
+            self._ints[name][index] = -1 if value is None else value
+        elif name in CASE_FIELDS:
+            raise AttributeError(f"'{name}' belongs to the test case and is shared between results")
+        else:
+            raise AttributeError(f"TestResult has no field '{name}'")
+
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """One result as a dict in TestResult field order"""
+        return {name: self.get(index, name) for name in RESULT_FIELDS}
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """All results as dicts, e.g. for JSON serialization"""
+        return [self.to_dict(index) for index in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self._case_refs)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ResultView, List[ResultView]]:
+        if isinstance(index, slice):
+            return [ResultView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return ResultView(self, index)
+
+    def __iter__(self) -> Iterator[ResultView]:
+        for index in range(len(self)):
+            yield ResultView(self, index)
+
+def test_result_store():
+    """Round-trip results through the store and compare with the dataclass"""
+    from dataclasses import asdict, fields
+    from model_evaluator import TestResult
+
+    assert list(RESULT_FIELDS) == [f.name for f in fields(TestResult)], "store does not match TestResult fields"
+    assert set(RESULT_FIELDS) == set(CASE_FIELDS + CODED_FIELDS + BOOL_FIELDS + FLOAT_FIELDS +
+                                     INT_FIELDS + OBJECT_FIELDS + SPARSE_FIELDS)
+
+    entities = {"employee_name": "Anna"}
+    results = [
+        TestResult(
+            model_name="gemma3:1b", prompt_variant="production", test_case_id=f"case{i % 3}",
+            input_query=f"query {i % 3}", expected_intent="information", expected_entities=entities,
+            language="English", difficulty="easy", category="general", success=i != 4,
+            inference_time=0.5 + i, raw_output=f"output {i}", json_validity=i % 2 == 0,
+            parsed_json={"intent": "information"} if i % 2 == 0 else None, validation_error=None,
+            intent_match=i % 2 == 0, intent_accuracy_type="exact", entity_accuracy={"accuracy_score": 1.0},
+            confidence_score=0.9 if i % 2 == 0 else None, error_message="boom" if i == 4 else None,
+            start_timestamp=1_700_000_000.0 + i, prompt_tokens=120 if i != 4 else None, completion_tokens=0
+        )
+        for i in range(6)
+    ]
+
+    store = ResultStore(results)
+    assert len(store) == 6 and len(store._cases) == 3
+    for original, view in zip(results, store):
+        assert list(asdict(original).items()) == list(view.to_dict().items())
+
+    store[1].sample_stats = {"majority_match": True}
+    store[-1].confidence_score = None
+    assert store[1].sample_stats == {"majority_match": True} and store[5].confidence_score is None
+    assert [view.inference_time for view in store[2:4]] == [2.5, 3.5]
+    print("✅ Result store round trip OK")
+
+if __name__ == "__main__":
+    test_result_store()
@@ -3,21 +3,24 @@ Results Manager for OdyTest - Model Evaluation Suite
 Handles result storage, analysis, and report generation
 """
 
-import json
+import glob
 import os
 import time
 from typing import Dict, Any, List, Optional
-from dataclasses import asdict
 import statistics
 
 try:
     # Try relative imports first (when used as module)
     from .config import OUTPUT_CONFIG
     from .model_evaluator import TestResult
+    from .timing import summarize_timeline
+    from .serialization import write_json, read_json
 except ImportError:
     # Fall back to direct imports (when run as script)
     from config import OUTPUT_CONFIG # type: ignore
     from model_evaluator import TestResult
+    from timing import summarize_timeline
+    from serialization import write_json, read_json
 
 class ResultsManager:
     """Manages test results storage and analysis"""
@@ -41,36 +44,81 @@ class ResultsManager:
         filename = f"{safe_model_name}_{prompt_variant}_{timestamp}.json"
         filepath = os.path.join(self.results_dir, filename)
         
-        # Convert results to serializable format
-        serializable_results = [asdict(result) for result in results]
-        
         output_data = {
             "metadata": {
                 "model_name": model_name,
                 "prompt_variant": prompt_variant,
                 "timestamp": timestamp,
                 "total_test_cases": len(results),
-                "test_duration": self._calculate_total_duration(results)
+                "test_duration": self._calculate_total_duration(results),
+                "timeline": self._calculate_timeline(results),
+                "truncated": "truncation" in summary_stats,
+                "think": summary_stats.get("thinking", {}).get("think"),
+                "hedge": summary_stats.get("hedging", {}).get("hedge_percentile")
             },
             "summary_stats": summary_stats,
-            "detailed_results": serializable_results
+            # Encoded straight from the TestResults / ResultStore by the serializer
+            "detailed_results": results
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=OUTPUT_CONFIG["json_indent"], ensure_ascii=False)
+        write_json(filepath, output_data)
         
         print(f"💾 Results saved to: {filepath}")
         return filepath
     
+    def save_benchmark_results(self, benchmark: str, model_name: str, data: Dict[str, Any]) -> str:
+        """Save a benchmark report (load test, scaling sweep, ...) under results/benchmarks"""
+        
+        timestamp = time.strftime(OUTPUT_CONFIG["timestamp_format"])
+        safe_model_name = model_name.replace(":", "_").replace("/", "_").replace("\\", "_")
+        benchmarks_dir = os.path.join(self.results_dir, OUTPUT_CONFIG["benchmarks_dir"])
+        os.makedirs(benchmarks_dir, exist_ok=True)
+        filepath = os.path.join(benchmarks_dir, f"{benchmark}_{safe_model_name}_{timestamp}.json")
+        
+        output_data = {
+            "metadata": {
+                "benchmark": benchmark,
+                "model_name": model_name,
+                "timestamp": timestamp
+            },
+            "results": data
+        }
+        
+        write_json(filepath, output_data)
+        
+        print(f"💾 Benchmark results saved to: {filepath}")
+        return filepath
+    
+    def load_latest_benchmarks(self, benchmark: str) -> Dict[str, Dict[str, Any]]:
+        """Most recent benchmark report of one kind per model, keyed by model name"""
+        
+        pattern = os.path.join(self.results_dir, OUTPUT_CONFIG["benchmarks_dir"], f"{benchmark}_*.json")
+        latest = {}
+        for filepath in glob.glob(pattern):
+            data = self.load_model_results(filepath)
+            if not data:
+                continue
+            metadata = data["metadata"]
+            current = latest.get(metadata["model_name"])
+            if current is None or metadata["timestamp"] > current[0]:
+                latest[metadata["model_name"]] = (metadata["timestamp"], data["results"])
+        return {model: results for model, (_, results) in latest.items()}
+    
     def _calculate_total_duration(self, results: List[TestResult]) -> float:
-        """Calculate total test duration"""
+        """Calculate total test duration (summed inference time of successful requests)"""
         return sum(result.inference_time for result in results if result.success)
     
+    def _calculate_timeline(self, results: List[TestResult]) -> Optional[Dict[str, Any]]:
+        """Reconstruct the run timeline: true wall-clock, summed request time and throughput"""
+        return summarize_timeline(
+            (result.start_timestamp, result.inference_time)
+            for result in results if result.start_timestamp is not None
+        )
+    
     def load_model_results(self, filepath: str) -> Optional[Dict[str, Any]]:
         """Load results from file"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(filepath)
         except Exception as e:
             print(f"❌ Error loading results from {filepath}: {e}")
             return None
@@ -86,11 +134,16 @@ class ResultsManager:
         # Load all result files
         for filepath in result_files:
             data = self.load_model_results(filepath)
-            if data:
-                model_name = data["metadata"]["model_name"]
-                prompt_variant = data["metadata"]["prompt_variant"]
-                key = f"{model_name}_{prompt_variant}"
-                all_results[key] = data
+            if not isinstance(data, dict) or "metadata" not in data or "detailed_results" not in data:
+                if data is not None:
+                    print(f"⚠️  Skipping {filepath}: not a model results file")
+                continue
+            model_name = data["metadata"]["model_name"]
+            prompt_variant = data["metadata"]["prompt_variant"]
+            key = f"{model_name}_{prompt_variant}{self._think_suffix(data['metadata'].get('think'))}"
+            if data["metadata"].get("hedge") is not None:
+                key += "_hedged"
+            all_results[key] = data
         
         if not all_results:
             return {"error": "No valid result files found"}
@@ -98,13 +151,20 @@ class ResultsManager:
         # Generate comparative analysis
         comparison = self._analyze_model_performance(all_results)
         
+        # Attach the latest concurrency sweep for each tested model, if one was run
+        tested_models = {data["metadata"]["model_name"] for data in all_results.values()}
+        scaling = {model: sweep for model, sweep in self.load_latest_benchmarks("concurrency").items()
+                   if model in tested_models}
+        if scaling:
+            comparison["concurrency_scaling"] = self._summarize_concurrency_scaling(scaling)
+            comparison["recommendations"].extend(self._concurrency_recommendations(scaling))
+        
         # Save comparative report
         timestamp = time.strftime(OUTPUT_CONFIG["timestamp_format"])
         report_filename = f"comparative_analysis_{timestamp}.json"
         report_filepath = os.path.join(self.results_dir, report_filename)
         
-        with open(report_filepath, 'w', encoding='utf-8') as f:
-            json.dump(comparison, f, indent=OUTPUT_CONFIG["json_indent"], ensure_ascii=False)
+        write_json(report_filepath, comparison)
         
         print(f"📋 Comparative report saved to: {report_filepath}")
         return comparison
@@ -132,22 +192,39 @@ class ResultsManager:
             stats = data["summary_stats"]
             model_name = data["metadata"]["model_name"]
             prompt_variant = data["metadata"]["prompt_variant"]
+            # No successful cases: no timing (or None, as infinities are saved as null)
+            avg_inference_time = stats.get("timing", {}).get("avg_inference_time")
             
             model_metrics[key] = {
                 "model_name": model_name,
                 "prompt_variant": prompt_variant,
+                "truncated": data["metadata"].get("truncated", False),
                 "intent_accuracy": stats.get("intent_accuracy_rate", 0.0),
+                "intent_accuracy_ci": stats.get("intent_accuracy_ci"),
                 "json_validity": stats.get("json_validity_rate", 0.0),
-                "avg_inference_time": stats.get("timing", {}).get("avg_inference_time", float('inf')),
+                "avg_inference_time": avg_inference_time if avg_inference_time is not None else float('inf'),
+                "throughput_rps": stats.get("timing", {}).get("throughput_rps"),
                 "avg_confidence": stats.get("confidence", {}).get("avg_confidence", 0.0),
                 "success_rate": stats.get("success_rate", 0.0),
                 "total_tests": stats.get("total_tests", 0),
+                "avg_prompt_tokens": stats.get("tokens", {}).get("avg_prompt_tokens"),
+                "tokens_per_correct_answer": stats.get("tokens", {}).get("tokens_per_correct_answer"),
+                "seconds_per_correct_answer": stats.get("tokens", {}).get("seconds_per_correct_answer"),
+                "self_consistency": stats.get("self_consistency"),
+                "avg_cpu_seconds_per_case": stats.get("resources", {}).get("avg_cpu_seconds_per_case"),
+                "peak_rss_mb": stats.get("resources", {}).get("peak_rss_mb"),
+                "think": data["metadata"].get("think"),
+                "avg_thinking_tokens": stats.get("thinking", {}).get("avg_thinking_tokens"),
+                "p99_inference_time": stats.get("timing", {}).get("p99_inference_time"),
+                "hedge_percentile": data["metadata"].get("hedge"),
+                "hedge_rate": stats.get("hedging", {}).get("hedge_rate"),
                 "by_language": stats.get("by_language", {}),
                 "by_difficulty": stats.get("by_difficulty", {}),
                 "by_category": stats.get("by_category", {})
             }
         
         analysis["summary"]["test_cases_per_model"] = list(set(m["total_tests"] for m in model_metrics.values()))
+        analysis["summary"]["truncated_runs"] = [key for key, m in model_metrics.items() if m["truncated"]]
         
         # Generate rankings
         analysis["model_rankings"] = self._generate_rankings(model_metrics)
@@ -161,6 +238,16 @@ class ResultsManager:
         # Difficulty analysis
         analysis["difficulty_analysis"] = self._analyze_difficulty_performance(model_metrics)
         
+        # Thinking on vs off for the same model and prompt
+        thinking = self._analyze_thinking_tradeoff(model_metrics)
+        if thinking:
+            analysis["thinking_tradeoff"] = thinking
+        
+        # Hedged vs unhedged runs of the same model, prompt and thinking mode
+        hedging = self._analyze_hedging(model_metrics)
+        if hedging:
+            analysis["hedging"] = hedging
+        
         # Generate recommendations
         analysis["recommendations"] = self._generate_recommendations(model_metrics, analysis)
         
@@ -179,6 +266,7 @@ class ResultsManager:
                 "model": key,
                 "model_name": metrics["model_name"],
                 "prompt_variant": metrics["prompt_variant"],
+                "truncated": metrics["truncated"],
                 "score": overall_score,
                 "intent_accuracy": metrics["intent_accuracy"],
                 "json_validity": metrics["json_validity"]
@@ -194,6 +282,7 @@ class ResultsManager:
                     "model": key,
                     "model_name": metrics["model_name"],
                     "prompt_variant": metrics["prompt_variant"],
+                    "truncated": metrics["truncated"],
                     "avg_inference_time": metrics["avg_inference_time"]
                 })
         
@@ -212,6 +301,22 @@ class ResultsManager:
         
         rankings["confidence"] = sorted(confidence_scores, key=lambda x: x["avg_confidence"], reverse=True)
         
+        # Cost ranking (tokens spent per correct intent)
+        cost_scores = []
+        for key, metrics in model_metrics.items():
+            if metrics["tokens_per_correct_answer"] is not None:
+                cost_scores.append({
+                    "model": key,
+                    "model_name": metrics["model_name"],
+                    "prompt_variant": metrics["prompt_variant"],
+                    "truncated": metrics["truncated"],
+                    "tokens_per_correct_answer": metrics["tokens_per_correct_answer"],
+                    "seconds_per_correct_answer": metrics["seconds_per_correct_answer"],
+                    "avg_prompt_tokens": metrics["avg_prompt_tokens"]
+                })
+        
+        rankings["cost_per_correct_answer"] = sorted(cost_scores, key=lambda x: x["tokens_per_correct_answer"])
+        
         return rankings
     
     def _create_performance_matrix(self, model_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
@@ -221,15 +326,34 @@ class ResultsManager:
         
         for key, metrics in model_metrics.items():
             matrix[key] = {
+                "truncated": metrics["truncated"],
                 "intent_accuracy": metrics["intent_accuracy"],
+                "intent_accuracy_ci": metrics["intent_accuracy_ci"],
                 "json_validity": metrics["json_validity"],
                 "avg_inference_time": metrics["avg_inference_time"] if metrics["avg_inference_time"] != float('inf') else None,
                 "avg_confidence": metrics["avg_confidence"],
-                "success_rate": metrics["success_rate"]
+                "success_rate": metrics["success_rate"],
+                "avg_prompt_tokens": metrics["avg_prompt_tokens"],
+                "tokens_per_correct_answer": metrics["tokens_per_correct_answer"],
+                "avg_cpu_seconds_per_case": metrics["avg_cpu_seconds_per_case"],
+                "peak_rss_mb": metrics["peak_rss_mb"],
+                "throughput_rps": metrics["throughput_rps"]
             }
+            
+            consistency = metrics["self_consistency"]
+            if consistency:
+                matrix[key]["majority_vote_accuracy"] = consistency["majority_vote_accuracy"]
+                matrix[key]["avg_agreement_rate"] = consistency["avg_agreement_rate"]
+                matrix[key]["majority_vote_justified"] = consistency["majority_vote_justified"]
         
         return matrix
     
+    def _complete_runs(self, scores: List[Dict[str, Any]],
+                       model_metrics: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Prefer runs that were not stopped early when picking a best model"""
+        complete = [s for s in scores if not model_metrics[s["model"]]["truncated"]]
+        return complete or scores
+    
     def _analyze_language_performance(self, model_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
         """Analyze performance by language"""
         
@@ -250,7 +374,7 @@ class ResultsManager:
             
             if lang_scores:
                 language_analysis[lang] = {
-                    "best_model": max(lang_scores, key=lambda x: x["accuracy"])["model"],
+                    "best_model": max(self._complete_runs(lang_scores, model_metrics), key=lambda x: x["accuracy"])["model"],
                     "avg_accuracy": statistics.mean([s["accuracy"] for s in lang_scores]),
                     "model_scores": {s["model"]: s["accuracy"] for s in lang_scores}
                 }
@@ -277,35 +401,147 @@ class ResultsManager:
             
             if diff_scores:
                 difficulty_analysis[diff] = {
-                    "best_model": max(diff_scores, key=lambda x: x["accuracy"])["model"],
+                    "best_model": max(self._complete_runs(diff_scores, model_metrics), key=lambda x: x["accuracy"])["model"],
                     "avg_accuracy": statistics.mean([s["accuracy"] for s in diff_scores]),
                     "model_scores": {s["model"]: s["accuracy"] for s in diff_scores}
                 }
         
         return difficulty_analysis
     
+    def _think_suffix(self, think: Optional[bool]) -> str:
+        """Run key suffix that keeps thinking on/off runs of one model and prompt apart"""
+        if think is None:
+            return ""
+        return "_think" if think else "_no_think"
+    
+    def _analyze_thinking_tradeoff(self, model_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Latency and accuracy of thinking vs non-thinking runs of the same model and prompt"""
+        
+        runs: Dict[str, Dict[str, str]] = {}
+        for key, metrics in model_metrics.items():
+            if metrics["truncated"]:
+                continue
+            pair = runs.setdefault(f"{metrics['model_name']}_{metrics['prompt_variant']}", {})
+            if metrics["think"] is False:
+                pair["off"] = key
+            elif metrics["think"] or metrics["avg_thinking_tokens"]:
+                # think=True, or the model's default when it produced thinking
+                if "on" not in pair or metrics["think"]:
+                    pair["on"] = key
+        
+        tradeoff = {}
+        for name, pair in sorted(runs.items()):
+            if "on" not in pair or "off" not in pair:
+                continue
+            on, off = model_metrics[pair["on"]], model_metrics[pair["off"]]
+            if on["avg_inference_time"] == float('inf') or off["avg_inference_time"] == float('inf'):
+                continue
+            tradeoff[name] = {
+                "model_name": on["model_name"],
+                "prompt_variant": on["prompt_variant"],
+                "thinking_run": pair["on"],
+                "no_thinking_run": pair["off"],
+                "avg_thinking_tokens": on["avg_thinking_tokens"],
+                "avg_inference_time_on": on["avg_inference_time"],
+                "avg_inference_time_off": off["avg_inference_time"],
+                "latency_saved": on["avg_inference_time"] - off["avg_inference_time"],
+                "intent_accuracy_on": on["intent_accuracy"],
+                "intent_accuracy_off": off["intent_accuracy"],
+                "accuracy_change": off["intent_accuracy"] - on["intent_accuracy"],
+                "json_validity_on": on["json_validity"],
+                "json_validity_off": off["json_validity"]
+            }
+        return tradeoff
+    
+    def _analyze_hedging(self, model_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Tail latency and accuracy of hedged vs unhedged runs of the same model, prompt and thinking mode"""
+        
+        tradeoff = {}
+        for key, hedged in sorted(model_metrics.items()):
+            if hedged["hedge_percentile"] is None or hedged["truncated"]:
+                continue
+            plain = model_metrics.get(key[:-len("_hedged")])
+            if not plain or plain["truncated"] or None in (hedged["p99_inference_time"], plain["p99_inference_time"]):
+                continue
+            tradeoff[key[:-len("_hedged")]] = {
+                "model_name": hedged["model_name"],
+                "prompt_variant": hedged["prompt_variant"],
+                "hedged_run": key,
+                "unhedged_run": key[:-len("_hedged")],
+                "hedge_percentile": hedged["hedge_percentile"],
+                "hedge_rate": hedged["hedge_rate"],
+                "p99_inference_time_on": hedged["p99_inference_time"],
+                "p99_inference_time_off": plain["p99_inference_time"],
+                "p99_improvement": plain["p99_inference_time"] - hedged["p99_inference_time"],
+                "avg_inference_time_on": hedged["avg_inference_time"],
+                "avg_inference_time_off": plain["avg_inference_time"],
+                "intent_accuracy_on": hedged["intent_accuracy"],
+                "intent_accuracy_off": plain["intent_accuracy"]
+            }
+        return tradeoff
+    
     def _generate_recommendations(self, model_metrics: Dict[str, Dict[str, Any]], 
                                 analysis: Dict[str, Any]) -> List[str]:
         """Generate deployment recommendations"""
         
         recommendations = []
         
+        # Runs stopped early were cut because they were clearly losing; their metrics
+        # come from a partial, adaptively chosen sample, so never recommend them
+        def complete(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return [entry for entry in entries if not entry.get("truncated")]
+        
         # Best overall model
-        if analysis["model_rankings"]["overall_accuracy"]:
-            best_overall = analysis["model_rankings"]["overall_accuracy"][0]
+        if complete(analysis["model_rankings"]["overall_accuracy"]):
+            best_overall = complete(analysis["model_rankings"]["overall_accuracy"])[0]
             recommendations.append(
                 f"🏆 Best Overall Performance: {best_overall['model_name']} with {best_overall['prompt_variant']} prompt "
                 f"({best_overall['score']:.1%} combined score)"
             )
         
         # Fastest model
-        if analysis["model_rankings"]["speed"]:
-            fastest = analysis["model_rankings"]["speed"][0]
+        if complete(analysis["model_rankings"]["speed"]):
+            fastest = complete(analysis["model_rankings"]["speed"])[0]
             recommendations.append(
                 f"⚡ Fastest Inference: {fastest['model_name']} with {fastest['prompt_variant']} prompt "
                 f"({fastest['avg_inference_time']:.2f}s average)"
             )
         
+        # Cheapest model per correct answer
+        if complete(analysis["model_rankings"].get("cost_per_correct_answer", [])):
+            cheapest = complete(analysis["model_rankings"]["cost_per_correct_answer"])[0]
+            recommendations.append(
+                f"💰 Lowest Cost per Correct Answer: {cheapest['model_name']} with {cheapest['prompt_variant']} prompt "
+                f"({cheapest['tokens_per_correct_answer']:.0f} tokens, {cheapest['seconds_per_correct_answer']:.2f}s)"
+            )
+        
+        # Majority voting verdicts
+        for key, metrics in model_metrics.items():
+            consistency = metrics["self_consistency"]
+            if consistency and not metrics["truncated"]:
+                verdict = "justifies" if consistency["majority_vote_justified"] else "does not justify"
+                recommendations.append(
+                    f"🗳️  Majority Vote for {metrics['model_name']} with {metrics['prompt_variant']} prompt: "
+                    f"{consistency['accuracy_gain']:+.1%} accuracy {verdict} {consistency['cost_multiplier']}x cost"
+                )
+        
+        # Thinking on vs off
+        for data in analysis.get("thinking_tradeoff", {}).values():
+            verdict = " - switch it off" if data["accuracy_change"] >= 0 and data["latency_saved"] > 0 else ""
+            recommendations.append(
+                f"🧠 Thinking for {data['model_name']} with {data['prompt_variant']} prompt: off saves "
+                f"{data['latency_saved']:.2f}s per request at {data['accuracy_change']:+.1%} intent accuracy{verdict}"
+            )
+        
+        # Hedged vs unhedged tail latency
+        for data in analysis.get("hedging", {}).values():
+            verdict = " - worth enabling" if data["p99_improvement"] > 0 else ""
+            recommendations.append(
+                f"🔁 Hedging at p{data['hedge_percentile']:g} for {data['model_name']} with {data['prompt_variant']} "
+                f"prompt: p99 {data['p99_inference_time_on']:.2f}s vs {data['p99_inference_time_off']:.2f}s "
+                f"unhedged, {data['hedge_rate'] or 0:.1%} of requests duplicated{verdict}"
+            )
+        
         # Language-specific recommendations
         for lang, lang_data in analysis["language_analysis"].items():
             best_model = lang_data["best_model"]
@@ -321,10 +557,10 @@ class ResultsManager:
             # Find model with best balance of accuracy and speed
             balanced_scores = []
             for key, metrics in model_metrics.items():
-                if metrics["avg_inference_time"] != float('inf'):
+                if metrics["avg_inference_time"] != float('inf') and not metrics["truncated"]:
                     # Normalize speed (lower is better) and combine with accuracy
                     max_time = max(m["avg_inference_time"] for m in model_metrics.values() 
-                                 if m["avg_inference_time"] != float('inf'))
+                                 if m["avg_inference_time"] != float('inf') and not m["truncated"])
                     speed_score = 1 - (metrics["avg_inference_time"] / max_time)
                     balanced_score = (metrics["intent_accuracy"] * 0.6 + speed_score * 0.4)
                     balanced_scores.append((key, balanced_score, metrics))
@@ -340,6 +576,44 @@ class ResultsManager:
         
         return recommendations
     
+    def _summarize_concurrency_scaling(self, scaling: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Scaling curve (throughput and p95 per concurrency level) for each model"""
+        
+        return {
+            model: {
+                "prompt_variant": sweep["prompt_variant"],
+                "recommended_concurrency": sweep["recommended_concurrency"],
+                "recommended_throughput_rps": sweep["recommended_throughput_rps"],
+                "curve": [
+                    {
+                        "concurrency": level["concurrency"],
+                        "throughput_rps": level["throughput_rps"],
+                        "speedup": level["speedup"],
+                        "p95_latency": level["latency"]["p95"] if level["latency"] else None,
+                        "error_rate": level["error_rate"]
+                    }
+                    for level in sweep["levels"]
+                ]
+            }
+            for model, sweep in scaling.items()
+        }
+    
+    def _concurrency_recommendations(self, scaling: Dict[str, Dict[str, Any]]) -> List[str]:
+        """One recommendation line per model with a concurrency sweep"""
+        
+        recommendations = []
+        for model, sweep in sorted(scaling.items()):
+            concurrency = sweep["recommended_concurrency"]
+            if concurrency is None:
+                recommendations.append(f"🔀 {model}: no concurrency level met the latency SLO")
+            else:
+                recommendations.append(
+                    f"🔀 {model}: run with {concurrency} parallel request(s) "
+                    f"({sweep['recommended_throughput_rps']:.2f} req/s, p95 {sweep['recommended_p95_latency']:.2f}s); "
+                    f"set OLLAMA_NUM_PARALLEL >= {concurrency}"
+                )
+        return recommendations
+    
     def print_summary_report(self, comparison: Dict[str, Any]):
         """Print a formatted summary report to console"""
         
@@ -353,6 +627,8 @@ class ResultsManager:
         print(f"   Models Tested: {summary['total_models_tested']}")
         print(f"   Test Cases per Model: {summary['test_cases_per_model']}")
         print(f"   Analysis Date: {summary['analysis_timestamp']}")
+        if summary.get("truncated_runs"):
+            print(f"   Stopped Early (excluded from recommendations): {', '.join(summary['truncated_runs'])}")
         
         # Rankings
         rankings = comparison["model_rankings"]
@@ -360,13 +636,20 @@ class ResultsManager:
         if rankings.get("overall_accuracy"):
             print(f"\n🏆 Overall Performance Ranking:")
             for i, model in enumerate(rankings["overall_accuracy"][:3], 1):
-                print(f"   {i}. {model['model_name']} ({model['prompt_variant']}) - {model['score']:.1%}")
+                marker = " [truncated]" if model.get("truncated") else ""
+                print(f"   {i}. {model['model_name']} ({model['prompt_variant']}) - {model['score']:.1%}{marker}")
         
         if rankings.get("speed"):
             print(f"\n⚡ Speed Ranking:")
             for i, model in enumerate(rankings["speed"][:3], 1):
                 print(f"   {i}. {model['model_name']} ({model['prompt_variant']}) - {model['avg_inference_time']:.2f}s")
         
+        if rankings.get("cost_per_correct_answer"):
+            print(f"\n💰 Cost per Correct Answer Ranking:")
+            for i, model in enumerate(rankings["cost_per_correct_answer"][:3], 1):
+                print(f"   {i}. {model['model_name']} ({model['prompt_variant']}) - "
+                      f"{model['tokens_per_correct_answer']:.0f} tokens, {model['seconds_per_correct_answer']:.2f}s")
+        
         # Language performance
         lang_analysis = comparison["language_analysis"]
         if lang_analysis:
@@ -376,6 +659,34 @@ class ResultsManager:
                 accuracy = data["model_scores"][best_model]
                 print(f"   {lang}: {best_model} ({accuracy:.1%})")
         
+        # Thinking on vs off
+        thinking = comparison.get("thinking_tradeoff")
+        if thinking:
+            print(f"\n🧠 Thinking On vs Off:")
+            for data in thinking.values():
+                print(f"   {data['model_name']} ({data['prompt_variant']}): "
+                      f"{data['avg_inference_time_on']:.2f}s / {data['intent_accuracy_on']:.1%} on "
+                      f"({data['avg_thinking_tokens'] or 0:.0f} thinking tokens) vs "
+                      f"{data['avg_inference_time_off']:.2f}s / {data['intent_accuracy_off']:.1%} off")
+        
+        # Hedged vs unhedged
+        hedging = comparison.get("hedging")
+        if hedging:
+            print(f"\n🔁 Hedged Requests (p99 latency):")
+            for data in hedging.values():
+                print(f"   {data['model_name']} ({data['prompt_variant']}): "
+                      f"{data['p99_inference_time_on']:.2f}s / {data['intent_accuracy_on']:.1%} hedged at "
+                      f"p{data['hedge_percentile']:g} ({data['hedge_rate'] or 0:.1%} duplicated) vs "
+                      f"{data['p99_inference_time_off']:.2f}s / {data['intent_accuracy_off']:.1%} unhedged")
+        
+        # Concurrency scaling
+        scaling = comparison.get("concurrency_scaling")
+        if scaling:
+            print(f"\n🔀 Concurrency Scaling (req/s by client concurrency):")
+            for model, data in scaling.items():
+                curve = ", ".join(f"{point['concurrency']}: {point['throughput_rps']:.2f}" for point in data["curve"])
+                print(f"   {model}: {curve} → recommended {data['recommended_concurrency']}")
+        
         # Recommendations
         recommendations = comparison["recommendations"]
         if recommendations:
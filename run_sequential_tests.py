@@ -7,29 +7,48 @@ import os
 import sys
 import glob
 import argparse
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     # Try relative imports first (when used as module)
-    from .config import get_model_list, get_model_config
+    from .config import get_model_list, get_model_config, TEST_CONFIG, EARLY_STOPPING_CONFIG, SELF_CONSISTENCY_CONFIG
     from .test_single_model import test_single_model
-    from .results_manager import generate_comparative_report, print_summary
+    from .results_manager import generate_comparative_report, print_summary, results_manager
     from .prompt_manager import get_available_variants
+    from .metrics_server import start_metrics_server
 except ImportError:
     # Fall back to direct imports (when run as script)
-    from config import get_model_list, get_model_config # type: ignore
+    from config import get_model_list, get_model_config, TEST_CONFIG, EARLY_STOPPING_CONFIG, SELF_CONSISTENCY_CONFIG # type: ignore
     from test_single_model import test_single_model
-    from results_manager import generate_comparative_report, print_summary
+    from results_manager import generate_comparative_report, print_summary, results_manager
     from prompt_manager import get_available_variants
+    from metrics_server import start_metrics_server
 
 class SequentialTestRunner:
     """Manages sequential testing of multiple models"""
     
-    def __init__(self, prompt_variant: str = "production"):
+    def __init__(self, prompt_variant: str = "production", cases_file: Optional[str] = None,
+                 sample_fraction: Optional[float] = None, seed: int = TEST_CONFIG["sample_seed"],
+                 adaptive: bool = EARLY_STOPPING_CONFIG["enabled"],
+                 stop_margin: float = EARLY_STOPPING_CONFIG["margin"],
+                 samples_per_case: int = SELF_CONSISTENCY_CONFIG["samples"],
+                 stop_at_json: Optional[bool] = None, stream: Optional[bool] = None,
+                 think: Optional[bool] = None, hedge: Optional[float] = None):
         self.prompt_variant = prompt_variant
+        self.cases_file = cases_file
+        self.sample_fraction = sample_fraction
+        self.seed = seed
+        self.adaptive = adaptive
+        self.stop_margin = stop_margin
+        self.samples_per_case = samples_per_case
+        self.stop_at_json = stop_at_json
+        self.stream = stream
+        self.think = think
+        self.hedge = hedge
+        self.best_run: Optional[Dict[str, float]] = None
         self.result_files = []
         self.models_tested = []
     
@@ -72,10 +91,16 @@ class SequentialTestRunner:
 
             # Run test for this model
             print(f"\n🧪 Starting tests for {model_config.name}...")
-            result_file = test_single_model(model_key, self.prompt_variant)
+            result_file = test_single_model(model_key, self.prompt_variant, self.cases_file,
+                                            self.sample_fraction, self.seed,
+                                            self.best_run if self.adaptive else None, self.stop_margin,
+                                            self.samples_per_case, stop_at_json=self.stop_at_json,
+                                            stream=self.stream, think=self.think, hedge=self.hedge)
 
             if result_file:
                 self.result_files.append(result_file)
+                if self.adaptive:
+                    self._update_best_run(result_file)
                 self.models_tested.append(model_key)
                 success_count += 1
                 print(f"✅ {model_config.name} testing completed successfully")
@@ -103,6 +128,19 @@ class SequentialTestRunner:
         
         return success_count == len(models)
     
+    def _update_best_run(self, result_file: str):
+        """Track the best completed (non-truncated) run as the adaptive stopping baseline"""
+        data = results_manager.load_model_results(result_file)
+        if not data or data["metadata"].get("truncated"):
+            return
+        
+        stats = data["summary_stats"]
+        if self.best_run is None or stats["intent_accuracy_rate"] > self.best_run["intent_accuracy"]:
+            self.best_run = {
+                "intent_accuracy": stats["intent_accuracy_rate"],
+                "json_validity": stats["json_validity_rate"]
+            }
+    
     def generate_final_report(self) -> bool:
         """Generate comparative analysis report from all test results"""
         
@@ -187,6 +225,81 @@ Examples:
         help="Specific models to test (default: all models)"
     )
     
+    parser.add_argument(
+        "--cases",
+        metavar="FILE",
+        help="Load test cases from a JSONL/CSV/Parquet file instead of the built-in suite"
+    )
+    
+    parser.add_argument(
+        "--sample",
+        type=float,
+        metavar="FRACTION",
+        help="Run a stratified subset (e.g. 0.1 for a 10%% smoke run) for every model"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=TEST_CONFIG["sample_seed"],
+        help=f"Random seed for --sample (default: {TEST_CONFIG['sample_seed']})"
+    )
+    
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Stop models early once they are clearly worse than the best completed model"
+    )
+    
+    parser.add_argument(
+        "--stop-margin",
+        type=float,
+        default=EARLY_STOPPING_CONFIG["margin"],
+        help=f"Margin below the best model that triggers an early stop (default: {EARLY_STOPPING_CONFIG['margin']})"
+    )
+    
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=SELF_CONSISTENCY_CONFIG["samples"],
+        help="Concurrent samples per case to measure agreement and majority-vote accuracy (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help="Stream responses and record time-to-intent alongside total latency"
+    )
+    
+    parser.add_argument(
+        "--stop-at-json",
+        action="store_true",
+        default=None,
+        help="Stream responses and stop generating after the first complete JSON object"
+    )
+    
+    parser.add_argument(
+        "--think",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Switch reasoning (thinking) on or off for models that support it (default: model config)"
+    )
+    
+    parser.add_argument(
+        "--hedge",
+        type=float,
+        metavar="PERCENTILE",
+        help="Send a duplicate of requests still running after this latency percentile, e.g. 95 (default: model config)"
+    )
+    
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve live Prometheus-style metrics on http://127.0.0.1:PORT/metrics during the sweep"
+    )
+    
     parser.add_argument(
         "--generate-report-only",
         action="store_true",
@@ -246,8 +359,14 @@ Examples:
             print("❌ Results directory not found")
         return
     
+    if args.metrics_port is not None:
+        server = start_metrics_server(args.metrics_port)
+        print(f"📡 Live metrics at {server.url}")
+    
     # Run sequential tests
-    runner = SequentialTestRunner(args.prompt)
+    runner = SequentialTestRunner(args.prompt, args.cases, args.sample, args.seed,
+                                  args.adaptive or EARLY_STOPPING_CONFIG["enabled"], args.stop_margin,
+                                  args.samples, args.stop_at_json, args.stream, args.think, args.hedge)
     
     try:
         success = runner.run_complete_evaluation(args.models)
@@ -0,0 +1,112 @@
+"""
+Serialization for OdyTest - Model Evaluation Suite
+Fast JSON encoding of results files with orjson or msgspec and a stdlib fallback
+"""
+
+import json
+import math
+from dataclasses import fields, is_dataclass
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import OUTPUT_CONFIG
+    from .result_store import ResultStore, ResultView
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import OUTPUT_CONFIG # type: ignore
+    from result_store import ResultStore, ResultView
+
+BACKEND = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+def _finite(obj: Any) -> Any:
+    """
+    Replace NaN and ±inf with None in nested dicts and lists, copying only what changes
+
+    orjson and msgspec write non-finite floats as null, the stdlib as NaN/Infinity
+    (not valid JSON); None gives every backend the same output.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        cleaned = None
+        for key, value in obj.items():
+            clean = _finite(value)
+            if clean is not value:
+                if cleaned is None:
+                    cleaned = dict(obj)
+                cleaned[key] = clean
+        return obj if cleaned is None else cleaned
+    if isinstance(obj, (list, tuple)):
+        items = [_finite(value) for value in obj]
+        return obj if all(a is b for a, b in zip(items, obj)) else items
+    return obj
+
+def _default(obj: Any) -> Any:
+    """Encode results without dataclasses.asdict's recursive deep copy"""
+    if isinstance(obj, ResultStore):
+        return obj.to_dicts()
+    if isinstance(obj, ResultView):
+        return obj.to_dict()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow: nested dicts are encoded in place, not copied first
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(data: Any, indent: Optional[int] = OUTPUT_CONFIG["json_indent"]) -> bytes:
+    """
+    Encode data (which may contain TestResults or a ResultStore) as UTF-8 JSON
+
+    Non-finite floats are written as null by every backend, so a reload gives
+    None for them. orjson only indents by two spaces, so any indent selects its
+    two-space mode; the other backends honour the indent (OUTPUT_CONFIG uses 2).
+    """
+    data = _finite(data)
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=_default, option=options)
+    if msgspec is not None:
+        encoded = msgspec.json.encode(data, enc_hook=_default)
+        return msgspec.json.format(encoded, indent=indent) if indent else encoded
+    # Results encoded through _default bypass the top-level pass; orjson and msgspec null them natively
+    return json.dumps(data, default=lambda obj: _finite(_default(obj)), indent=indent,
+                      ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+def loads(raw: bytes) -> Any:
+    """Decode UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    if msgspec is not None:
+        return msgspec.json.decode(raw)
+    return json.loads(raw)
+
+def write_json(filepath: str, data: Any, indent: Optional[int] = OUTPUT_CONFIG["json_indent"]):
+    """Encode data and write it to filepath in one call"""
+    with open(filepath, 'wb') as f:
+        f.write(dumps(data, indent))
+
+def read_json(filepath: str) -> Any:
+    """Read and decode a JSON file"""
+    with open(filepath, 'rb') as f:
+        return loads(f.read())
+
+def test_non_finite_floats():
+    """Every backend writes NaN and infinities as null"""
+    data = {"best": float("inf"), "values": [1.5, float("nan"), {"worst": -float("inf")}], "name": "run"}
+    encoded = loads(dumps(data, indent=None))
+    assert encoded == {"best": None, "values": [1.5, None, {"worst": None}], "name": "run"}, encoded
+    assert data["best"] == float("inf"), "input must not be modified"
+    print(f"✅ Serialization OK ({BACKEND}): non-finite floats written as null")
+
+if __name__ == "__main__":
+    test_non_finite_floats()
@@ -0,0 +1,133 @@
+"""
+Statistics helpers for OdyTest - Model Evaluation Suite
+Confidence intervals and two-sample tests used for accuracy and regression reporting
+"""
+
+import math
+import random
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+def z_score(confidence_level: float) -> float:
+    """Two-sided standard normal critical value for a confidence level"""
+    return NormalDist().inv_cdf((1 + confidence_level) / 2)
+
+def wilson_interval(successes: int, total: int, confidence_level: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion
+    
+    Stays inside [0, 1] and behaves well for small samples and rates near 0 or 1,
+    which is the normal case for smoke runs over a few dozen test cases.
+    """
+    if total == 0:
+        return 0.0, 1.0
+    
+    z = z_score(confidence_level)
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile (q in 0-100) with linear interpolation between closest ranks"""
+    if not values:
+        raise ValueError("percentile requires at least one value")
+    
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def latency_percentiles(latencies: List[float]) -> Optional[Dict[str, float]]:
+    """p50/p90/p95/p99 and max of a latency sample, or None when it is empty"""
+    if not latencies:
+        return None
+    return {
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies)
+    }
+
+def mann_whitney_u(x: Sequence[float], y: Sequence[float], alternative: str = "two-sided") -> Tuple[float, float]:
+    """
+    Mann-Whitney U test of x against y using the normal approximation
+    
+    Returns (U of x, p-value). alternative "greater" tests whether x tends to be
+    larger than y, "less" whether it tends to be smaller. Ties get average ranks
+    and the variance is tie-corrected, with a continuity correction of 0.5.
+    """
+    nx, ny = len(x), len(y)
+    if nx == 0 or ny == 0:
+        raise ValueError("mann_whitney_u requires two non-empty samples")
+    
+    pooled = sorted([(value, 0) for value in x] + [(value, 1) for value in y])
+    n = nx + ny
+    rank_sum_x = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        rank_sum_x += average_rank * sum(1 for k in range(i, j + 1) if pooled[k][1] == 0)
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    
+    u = rank_sum_x - nx * (nx + 1) / 2
+    mean = nx * ny / 2
+    variance = nx * ny / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u, 1.0
+    sigma = math.sqrt(variance)
+    
+    normal = NormalDist()
+    p_greater = 1 - normal.cdf((u - mean - 0.5) / sigma)
+    p_less = normal.cdf((u - mean + 0.5) / sigma)
+    if alternative == "greater":
+        return u, p_greater
+    if alternative == "less":
+        return u, p_less
+    return u, min(1.0, 2 * min(p_greater, p_less))
+
+def bootstrap_difference_interval(baseline: Sequence[float], candidate: Sequence[float],
+                                  statistic: Callable[[Sequence[float]], float],
+                                  confidence_level: float = 0.95, resamples: int = 2000,
+                                  seed: int = 42) -> Tuple[float, float]:
+    """Percentile bootstrap interval for statistic(candidate) - statistic(baseline)"""
+    if not baseline or not candidate:
+        raise ValueError("bootstrap_difference_interval requires two non-empty samples")
+    
+    rng = random.Random(seed)
+    differences = [
+        statistic(rng.choices(candidate, k=len(candidate))) - statistic(rng.choices(baseline, k=len(baseline)))
+        for _ in range(resamples)
+    ]
+    alpha = (1 - confidence_level) / 2
+    return percentile(differences, 100 * alpha), percentile(differences, 100 * (1 - alpha))
+
+def pareto_front(points: Sequence[Dict[str, Any]], objectives: Dict[str, str]) -> List[int]:
+    """
+    Indices of the points no other point dominates
+    
+    objectives maps a key to "min" or "max". A point dominates another when it is
+    at least as good on every objective and strictly better on one.
+    """
+    signs = {key: 1 if direction == "min" else -1 for key, direction in objectives.items()}
+    
+    def dominates(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        better = False
+        for key, sign in signs.items():
+            if sign * a[key] > sign * b[key]:
+                return False
+            if sign * a[key] < sign * b[key]:
+                better = True
+        return better
+    
+    return [i for i, point in enumerate(points)
+            if not any(dominates(other, point) for j, other in enumerate(points) if j != i)]
@@ -0,0 +1,197 @@
+"""
+Streaming JSON helpers for OdyTest - Model Evaluation Suite
+Incremental parsing of the first JSON object in streamed model output
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+class JSONObjectTracker:
+    """
+    Finds the first complete top-level JSON object in text fed chunk by chunk
+
+    Brackets are counted outside of JSON strings (escape-aware) and outside of
+    <think> blocks, so each character is scanned once no matter how the text is
+    split into chunks. A balanced object that does not parse (e.g. "{name}" in
+    prose before the answer) is skipped and scanning continues.
+
+    Each top-level member is parsed as soon as its value is complete, and
+    on_field(key, value) is called for it, so a caller can act on "intent"
+    while "entities" is still being generated.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self._member_start: Optional[int] = None
+        self._parts: List[str] = []
+        self._length = 0
+        self._tail = ""
+        self._in_think = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.value: Optional[Any] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once a complete object has been seen"""
+        if not chunk:
+            return self.complete
+
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        if self.complete:
+            # Keep the text after the object, but there is nothing left to scan
+            return True
+
+        for i, char in enumerate(chunk):
+            position = offset + i
+            if self._start is None:
+                # Outside an object: only watch for think blocks and an opening brace
+                self._tail = (self._tail + char)[-len(THINK_CLOSE):]
+                if self._in_think:
+                    self._in_think = not self._tail.endswith(THINK_CLOSE)
+                elif self._tail.endswith(THINK_OPEN):
+                    self._in_think = True
+                elif char == "{":
+                    self._start = position
+                    self._member_start = position + 1
+                    self._depth = 1
+                    self.fields = {}
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._member_end(position)
+                    if self._close(position + 1):
+                        return True
+            elif char == "," and self._depth == 1:
+                self._member_end(position)
+                self._member_start = position + 1
+        return False
+
+    def _member_end(self, end: int):
+        """Parse the top-level "key": value member that ends at end and report it"""
+        member = self.text[self._member_start:end]
+        if not member.strip():
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            if self.on_field:
+                self.on_field(key, value)
+
+    def _close(self, end: int) -> bool:
+        """Accept the balanced candidate ending at end if it parses"""
+        candidate = self.text[self._start:end]
+        self._start = None
+        try:
+            self.value = json.loads(candidate)
+        except json.JSONDecodeError:
+            return False
+        self.end = end
+        return True
+
+def split_thinking(text: str) -> Tuple[str, str]:
+    """
+    Separate <think> blocks from the answer; returns (thinking, answer)
+
+    An unclosed block (output cut off while reasoning) counts as thinking up to
+    the end. Text without think tags is returned unchanged as the answer.
+    """
+    if THINK_OPEN not in text:
+        return "", text
+    thinking: List[str] = []
+    answer: List[str] = []
+    position = 0
+    while True:
+        start = text.find(THINK_OPEN, position)
+        if start < 0:
+            answer.append(text[position:])
+            break
+        answer.append(text[position:start])
+        end = text.find(THINK_CLOSE, start)
+        if end < 0:
+            thinking.append(text[start + len(THINK_OPEN):])
+            break
+        thinking.append(text[start + len(THINK_OPEN):end])
+        position = end + len(THINK_CLOSE)
+    return "\n".join(part.strip() for part in thinking).strip(), "".join(answer).strip()
+
+def restore_stripped_brace(text: str) -> str:
+    """
+    Put back the closing brace of an answer cut by a stop sequence such as "}\\n\\n"
+
+    Ollama drops the matched stop sequence from the output, including the brace
+    that closes the object. The brace is only appended when the text holds no
+    complete object yet and one more "}" completes it.
+    """
+    tracker = JSONObjectTracker()
+    if tracker.feed(text) or not tracker.feed("}"):
+        return text
+    return text + "}"
+
+def test_json_object_tracker():
+    """Feed split outputs through the tracker"""
+    answer = '{"intent": "information", "entities": {"note": "brace } in \\" string"}, "confidence": 0.9}'
+    output = "<think>maybe {x}</think>\nSure {here}:\n```json\n" + answer + "\n```\nMore prose {y}"
+
+    for size in (1, 3, 7, len(output)):
+        tracker = JSONObjectTracker()
+        for start in range(0, len(output), size):
+            if tracker.feed(output[start:start + size]):
+                break
+        assert tracker.complete, size
+        assert tracker.text[:tracker.end].endswith(answer), size
+        assert tracker.value["entities"]["note"] == 'brace } in " string'
+
+    events = []
+    tracker = JSONObjectTracker(on_field=lambda key, value: events.append(key))
+    assert not tracker.feed('{"intent": "information", "entities": {"a": [1, 2], ')
+    assert events == ["intent"]
+    tracker.feed('"b": "}"}, "missing_info": ["x", "y"], "confidence": 0.5} trailing')
+    assert events == ["intent", "entities", "missing_info", "confidence"]
+    assert tracker.fields["missing_info"] == ["x", "y"] and tracker.text.endswith("trailing")
+
+    assert restore_stripped_brace(output[:output.index(answer) + len(answer) - 1]).endswith(answer)
+    assert restore_stripped_brace(answer + "\n") == answer + "\n"
+
+    assert split_thinking(output) == ("maybe {x}", output[output.index("Sure"):].strip())
+    assert split_thinking("<think>\n\n</think>\n\n" + answer) == ("", answer)
+    assert split_thinking("<think>still going {") == ("still going {", "")
+    assert split_thinking(answer) == ("", answer)
+    assert restore_stripped_brace('{"intent": "unknown", "entities": {') == '{"intent": "unknown", "entities": {'
+    print("✅ JSON object tracker OK")
+
+if __name__ == "__main__":
+    test_json_object_tracker()
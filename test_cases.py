@@ -3,9 +3,22 @@ Test Cases module for OdyTest - Model Evaluation Suite
 Contains comprehensive test scenarios for multilingual semantic parsing
 """
 
-from typing import Dict, Any, List
+import csv
+import hashlib
+import json
+import os
+import random
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+# Attributes with prebuilt lookup indexes in TestCaseGenerator
+INDEXED_FIELDS = {
+    "language": "language",
+    "difficulty": "difficulty",
+    "category": "category",
+    "intent": "expected_intent"
+}
+
 @dataclass
 class TestCase:
     """Single test case for model evaluation"""
@@ -16,12 +29,81 @@ class TestCase:
     difficulty: str
     description: str
     category: str
+    
+    @property
+    def case_id(self) -> str:
+        """Stable content-hash ID, independent of position in the corpus"""
+        content = json.dumps(
+            [self.input, self.expected_intent, self.expected_entities, self.language, self.difficulty, self.category],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "TestCase":
+        """Build a test case from a data file record"""
+        entities = record.get("expected_entities") or {}
+        if isinstance(entities, str):
+            entities = json.loads(entities)
+        
+        return cls(
+            input=record["input"],
+            expected_intent=record["expected_intent"],
+            expected_entities=entities,
+            language=record.get("language") or "Unknown",
+            difficulty=record.get("difficulty") or "Unknown",
+            description=record.get("description") or "",
+            category=record.get("category") or "uncategorized"
+        )
+
+def iter_test_cases(path: str) -> Iterator[TestCase]:
+    """
+    Stream test cases from a JSONL, CSV or Parquet file
+    
+    Records use the TestCase field names; in CSV files expected_entities is a JSON string.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    
+    if extension in (".jsonl", ".ndjson"):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield TestCase.from_record(json.loads(line))
+    elif extension == ".csv":
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for record in csv.DictReader(f):
+                yield TestCase.from_record(record)
+    elif extension == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet test cases requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches():
+            for record in batch.to_pylist():
+                yield TestCase.from_record(record)
+    else:
+        raise ValueError(f"Unsupported test case file format: {path}")
 
 class TestCaseGenerator:
     """Generates comprehensive test cases for model evaluation"""
     
-    def __init__(self):
-        self.test_cases = self._create_test_cases()
+    def __init__(self, source: Optional[str] = None):
+        """
+        Args:
+            source: Optional JSONL/CSV/Parquet file to load instead of the built-in cases
+        """
+        self.test_cases: List[TestCase] = []
+        self._indexes: Dict[str, Dict[str, List[TestCase]]] = {name: {} for name in INDEXED_FIELDS}
+        self._by_id: Dict[str, TestCase] = {}
+        self.add_test_cases(iter_test_cases(source) if source else self._create_test_cases())
+    
+    def add_test_cases(self, cases: Iterable[TestCase]):
+        """Append test cases, updating lookup indexes incrementally"""
+        for case in cases:
+            self.test_cases.append(case)
+            self._by_id.setdefault(case.case_id, case)
+            for name, attribute in INDEXED_FIELDS.items():
+                self._indexes[name].setdefault(getattr(case, attribute), []).append(case)
     
     def _create_test_cases(self) -> List[TestCase]:
         """Create comprehensive test case collection"""
@@ -369,34 +451,105 @@ class TestCaseGenerator:
     
     def get_test_cases_by_language(self, language: str) -> List[TestCase]:
         """Get test cases filtered by language"""
-        return [case for case in self.test_cases if case.language == language]
+        return list(self._indexes["language"].get(language, []))
     
     def get_test_cases_by_difficulty(self, difficulty: str) -> List[TestCase]:
         """Get test cases filtered by difficulty"""
-        return [case for case in self.test_cases if case.difficulty == difficulty]
+        return list(self._indexes["difficulty"].get(difficulty, []))
     
     def get_test_cases_by_category(self, category: str) -> List[TestCase]:
         """Get test cases filtered by category"""
-        return [case for case in self.test_cases if case.category == category]
+        return list(self._indexes["category"].get(category, []))
     
-    def get_test_summary(self) -> Dict[str, Any]:
-        """Get summary statistics of test cases"""
-        total = len(self.test_cases)
+    def get_test_cases_by_intent(self, intent: str) -> List[TestCase]:
+        """Get test cases filtered by expected intent"""
+        return list(self._indexes["intent"].get(intent, []))
+    
+    def get_test_case(self, case_id: str) -> Optional[TestCase]:
+        """Get a test case by its content-hash ID"""
+        return self._by_id.get(case_id)
+    
+    def sample_stratified(self, fraction: float, seed: int = 42,
+                          strata: Sequence[str] = ("language", "difficulty", "category"),
+                          min_per_stratum: int = 1) -> List[TestCase]:
+        """
+        Draw a reproducible stratified subset of the test cases
+        
+        Exactly round(fraction * total) cases are drawn (at least one). Each
+        stratum (combination of the given attributes) first gets min_per_stratum
+        cases if every stratum fits in that target; otherwise the minimum applies
+        to each attribute value on its own, so rare languages or difficulties
+        stay represented without inflating small smoke runs. The rest goes to
+        the strata furthest below their proportional share.
+        
+        Args:
+            fraction: Share of the corpus to draw, in (0, 1]
+            seed: Random seed; the same seed and corpus give the same subset
+            strata: TestCase attributes (or "intent") to stratify on
+            min_per_stratum: Minimum cases drawn from every stratum (or attribute value)
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+        if not self.test_cases:
+            return []
         
-        languages = {}
-        difficulties = {}
-        categories = {}
+        attributes = [INDEXED_FIELDS.get(name, name) for name in strata]
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        for position, case in enumerate(self.test_cases):
+            key = tuple(getattr(case, attribute) for attribute in attributes)
+            groups.setdefault(key, []).append(position)
         
-        for case in self.test_cases:
-            languages[case.language] = languages.get(case.language, 0) + 1
-            difficulties[case.difficulty] = difficulties.get(case.difficulty, 0) + 1
-            categories[case.category] = categories.get(case.category, 0) + 1
+        rng = random.Random(seed)
+        keys = sorted(groups, key=repr)
+        target = max(1, round(len(self.test_cases) * fraction))
+        quotas = {key: len(groups[key]) * fraction for key in keys}
+        counts = {key: 0 for key in keys}
+        # Ties are broken by the seeded generator
+        tiebreak = {key: rng.random() for key in keys}
+        
+        def open_keys() -> List[Tuple[Any, ...]]:
+            return [key for key in keys if counts[key] < len(groups[key])]
+        
+        if len(keys) * min_per_stratum <= target:
+            for key in keys:
+                counts[key] = min(len(groups[key]), min_per_stratum)
+        else:
+            # Too many combinations for the sample: cover each attribute value instead
+            def uncovered(key: Tuple[Any, ...]) -> int:
+                return sum(1 for i, value in enumerate(key)
+                           if sum(count for other, count in counts.items() if other[i] == value) < min_per_stratum)
+            
+            while sum(counts.values()) < target:
+                candidates = [key for key in open_keys() if uncovered(key)]
+                if not candidates:
+                    break
+                key = max(candidates, key=lambda key: (uncovered(key), quotas[key] - counts[key], tiebreak[key]))
+                counts[key] += 1
+        
+        # Fill up to the target, largest shortfall against the proportional share first
+        while sum(counts.values()) < target:
+            key = max(open_keys(), key=lambda key: (quotas[key] - counts[key], tiebreak[key]))
+            counts[key] += 1
+        
+        selected = []
+        for key in keys:
+            selected.extend(rng.sample(groups[key], counts[key]))
+        
+        return [self.test_cases[position] for position in sorted(selected)]
+    
+    def get_test_summary(self) -> Dict[str, Any]:
+        """Get summary statistics of test cases"""
+        counts = {
+            name: {value: len(cases) for value, cases in index.items()}
+            for name, index in self._indexes.items()
+        }
         
         return {
-            "total_cases": total,
-            "by_language": languages,
-            "by_difficulty": difficulties,
-            "by_category": categories
+            "total_cases": len(self.test_cases),
+            "by_language": counts["language"],
+            "by_difficulty": counts["difficulty"],
+            "by_category": counts["category"],
+            "by_intent": counts["intent"]
         }
 
 # Global instance for easy access
@@ -409,3 +562,23 @@ def get_test_cases() -> List[TestCase]:
 def get_test_summary() -> Dict[str, Any]:
     """Get test case summary"""
     return test_generator.get_test_summary()
+
+def load_test_cases(path: str) -> TestCaseGenerator:
+    """Load an indexed test case corpus from a JSONL/CSV/Parquet file"""
+    return TestCaseGenerator(source=path)
+
+def test_sample_stratified():
+    """Sample size follows the fraction, and small samples still cover every attribute value"""
+    cases = test_generator.get_all_test_cases()
+    for fraction in (0.1, 0.25, 0.5, 1.0):
+        sample = test_generator.sample_stratified(fraction, seed=7)
+        assert len(sample) == max(1, round(len(cases) * fraction)), (fraction, len(sample))
+        assert sample == test_generator.sample_stratified(fraction, seed=7)
+    
+    sample = test_generator.sample_stratified(0.5, seed=7)
+    for attribute in ("language", "difficulty"):
+        assert {getattr(case, attribute) for case in sample} == {getattr(case, attribute) for case in cases}
+    print("✅ Stratified sampling OK")
+
+if __name__ == "__main__":
+    test_sample_stratified()
@@ -3,16 +3,34 @@
 Professional Ollama client for tool use and JSON parsing.
 """
 
+import copy
 import json
 import logging
+import queue
+import socket
 import time
 import threading
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable
+from dataclasses import dataclass, field
 
+import httpx
 import ollama
 from ollama import ResponseError
 
+try:
+    # Try relative imports first (when used as module)
+    from .timing import Timer
+    from .metrics_server import metrics
+    from .streaming_json import JSONObjectTracker, restore_stripped_brace, split_thinking
+    from .stats_utils import percentile
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from timing import Timer
+    from metrics_server import metrics
+    from streaming_json import JSONObjectTracker, restore_stripped_brace, split_thinking
+    from stats_utils import percentile
+
 
 # Configure logging - suppress verbose logs for cleaner output
 logging.basicConfig(level=logging.WARNING)
@@ -22,6 +40,12 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("ollama").setLevel(logging.WARNING)
 
+# Qwen3-style soft switch appended to the prompt when the server cannot take the think option
+NO_THINK_DIRECTIVE = "/no_think"
+
+# Recent request latencies the hedging delay is taken from
+HEDGE_LATENCY_WINDOW = 200
+
 
 @dataclass
 class OllamaConfig:
@@ -31,6 +55,110 @@ class OllamaConfig:
     top_p: float = 0.95
     timeout: int = 10
     max_retries: int = 2
+    stop_at_json: bool = False  # Stream and hang up after the first complete JSON object
+    think: Optional[bool] = None  # Server think option for reasoning models; None keeps the model default
+    options: Dict[str, Any] = field(default_factory=dict)  # Runtime options (num_ctx, num_thread, ...)
+    coalesce: bool = False  # Share one upstream generation between concurrent identical requests
+    host: Optional[str] = None  # Ollama server URL; None uses OLLAMA_HOST or the local default
+    hedge_percentile: Optional[float] = None  # Duplicate a request still running after this latency percentile
+    hedge_hosts: List[str] = field(default_factory=list)  # Servers for duplicates; empty uses the same server
+    hedge_min_samples: int = 10  # Latencies to observe before hedging starts
+    hedge_min_delay: float = 0.1  # Never hedge earlier than this many seconds
+
+
+@dataclass
+class GenerationResult:
+    """Generated text together with server-reported token and timing stats."""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_duration: Optional[float] = None
+    load_duration: Optional[float] = None
+    prompt_eval_duration: Optional[float] = None
+    eval_duration: Optional[float] = None
+    early_terminated: bool = False
+    tokens_estimated: bool = False  # Token counts not reported by the server (early termination)
+    field_times: Optional[Dict[str, float]] = None  # Streaming: seconds until each top-level JSON field
+    done_reason: Optional[str] = None  # "stop" (end of answer or stop sequence) or "length" (num_predict reached)
+    brace_restored: bool = False  # A closing "}" was appended, assuming a stop sequence consumed it
+    thinking: Optional[str] = None  # Reasoning, separated from the answer text
+    thinking_tokens: Optional[int] = None  # Exact count when thinking was streamed separately
+    hedged: Optional[bool] = None  # Hedging enabled: whether a duplicate request was sent
+    hedge_won: Optional[bool] = None  # Hedged: whether the duplicate answered first
+
+    @classmethod
+    def from_response(cls, response: Any, text: Optional[str] = None) -> "GenerationResult":
+        """Build from an Ollama generate response (durations converted from ns to s)."""
+        def seconds(key: str) -> Optional[float]:
+            value = response.get(key)
+            return value / 1e9 if value is not None else None
+
+        return cls(
+            text=response['response'] if text is None else text,
+            prompt_tokens=response.get('prompt_eval_count'),
+            completion_tokens=response.get('eval_count'),
+            total_duration=seconds('total_duration'),
+            load_duration=seconds('load_duration'),
+            prompt_eval_duration=seconds('prompt_eval_duration'),
+            eval_duration=seconds('eval_duration'),
+            done_reason=response.get('done_reason'),
+            thinking=response.get('thinking') or None
+        )
+
+
+class _InFlight:
+    """A generation that concurrent identical requests wait for."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.generation: Optional[GenerationResult] = None
+        self.error: Optional[Exception] = None
+
+
+class _StreamConnection:
+    """
+    A streamed generation on its own connection, which cancel() can close from another thread.
+    
+    The socket is captured when the connection opens (httpx trace extension), so
+    cancelling also works before the response headers arrive, e.g. while the
+    server is still loading the model. Shutting it down makes the server see the
+    client go away and wakes the reading thread.
+    """
+    
+    def __init__(self, host: Optional[str], ssl_context: Any):
+        self.cancelled = threading.Event()
+        self._socket: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self.api = ollama.Client(host=host, verify=ssl_context, event_hooks={"request": [self._trace_request]})
+    
+    def _trace_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._trace
+    
+    def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event != "connection.connect_tcp.complete":
+            return
+        with self._lock:
+            self._socket = info["return_value"].get_extra_info("socket")
+            cancelled = self.cancelled.is_set()
+        if cancelled:
+            self._shutdown()
+    
+    def _shutdown(self) -> None:
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already closed
+    
+    def cancel(self) -> None:
+        """Stop reading and hang up on the server."""
+        with self._lock:
+            self.cancelled.set()
+            connected = self._socket is not None
+        if connected:
+            self._shutdown()
+    
+    def close(self) -> None:
+        self.api._client.close()
 
 
 class OllamaClient:
@@ -38,12 +166,36 @@ class OllamaClient:
     
     def __init__(self, config: OllamaConfig):
         self.config = config
+        self._api = ollama.Client(host=config.host)
+        # Set once the server rejects or ignores the think option
+        self._think_via_prompt = False
+        # Single-flight: generations in progress by request key, and how many requests shared one
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._in_flight_lock = threading.Lock()
+        self._coalescing_counts = {"upstream": 0, "coalesced": 0}
+        # Streams get a connection each so they can be closed; the TLS setup is shared
+        self._ssl_context = httpx.create_ssl_context()
+        # Hedging: latencies callers saw, and servers for the duplicates (round-robin)
+        self._latencies: deque = deque(maxlen=HEDGE_LATENCY_WINDOW)
+        self._hedge_hosts = config.hedge_hosts or [config.host]
+        self._hedge_lock = threading.Lock()
+        self._hedge_counts = {"requests": 0, "hedged": 0, "hedge_wins": 0}
         self._validate_model()
     
+    def thinks_inline(self) -> bool:
+        """
+        Whether reasoning can arrive inside the answer text as <think> blocks.
+        
+        True unless thinking is off or the server returns it separately (think
+        option accepted). Only meaningful for reasoning models.
+        """
+        think = self.config.think
+        return think is None or (think and self._think_via_prompt)
+    
     def _validate_model(self) -> None:
         """Verify model exists before using it."""
         try:
-            models = ollama.list()
+            models = self._api.list()
             # Debug: Print the actual structure
             logger.debug(f"Ollama models response: {models}")
             
@@ -68,15 +220,17 @@ class OllamaClient:
         self, 
         prompt: str, 
         format_type: Optional[str] = None,
-        stream: bool = False
-    ) -> str: # type: ignore
+        stream: bool = False,
+        stop_at_json: Optional[bool] = None
+    ) -> str:
         """
-        Generate response with retry logic and proper error handling.
+        Generate response text with retry logic and proper error handling.
         
         Args:
             prompt: Input prompt
             format_type: 'json' for structured output
             stream: Whether to stream response
+            stop_at_json: Stop after the first complete JSON object (default: config)
             
         Returns:
             Generated text response
@@ -84,56 +238,297 @@ class OllamaClient:
         Raises:
             OllamaError: When generation fails after retries
         """
-        options = {
-            "temperature": self.config.temperature,
-            "top_p": self.config.top_p
+        return self.generate_detailed(prompt, format_type, stream, stop_at_json).text
+    
+    def generate_detailed(
+        self, 
+        prompt: str, 
+        format_type: Optional[str] = None,
+        stream: bool = False,
+        stop_at_json: Optional[bool] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> GenerationResult: # type: ignore
+        """
+        Generate response with retry logic, keeping server-reported stats.
+        
+        Args:
+            prompt: Input prompt
+            format_type: 'json' for structured output
+            stream: Whether to stream response
+            stop_at_json: Stream and close the connection as soon as the first
+                complete top-level JSON object has arrived (default: config)
+            on_field: Streaming only; called with (key, value) as each top-level
+                field of the JSON answer completes, e.g. to act on the intent early
+            options: Extra Ollama options such as num_predict and stop
+            
+        With config.coalesce, a request identical to one already in flight (same
+        model, prompt, format, streaming mode and options) waits for that
+        generation and gets a copy of its result (or its error) instead of
+        reaching the server. Requests with on_field are never coalesced.
+        
+        With config.hedge_percentile, a request still running after that
+        percentile of recent latencies is streamed again (to config.hedge_hosts
+        if set) and the first answer wins; see _generate_hedged.
+            
+        Returns:
+            GenerationResult with text, token counts and server timings
+            
+        Raises:
+            OllamaError: When generation fails after retries
+        """
+        if stop_at_json is None:
+            stop_at_json = self.config.stop_at_json
+        if not self.config.coalesce or on_field is not None:
+            return self._generate_upstream(prompt, format_type, stream, stop_at_json, on_field, options)
+        
+        key = self._request_key(prompt, format_type, stream, stop_at_json, options)
+        with self._in_flight_lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+            self._coalescing_counts["upstream" if leader else "coalesced"] += 1
+        
+        if not leader:
+            metrics.coalesced_requests_total.inc(model=self.config.model)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.generation)
+        
+        try:
+            generation = self._generate_upstream(prompt, format_type, stream, stop_at_json, on_field, options)
+            # Followers deep-copy a snapshot (field_times is a dict), so any caller may modify its result
+            flight.generation = copy.deepcopy(generation)
+            return generation
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            flight.done.set()
+    
+    def _request_key(
+        self, 
+        prompt: str, 
+        format_type: Optional[str], 
+        stream: bool,
+        stop_at_json: bool,
+        extra_options: Optional[Dict[str, Any]]
+    ) -> str:
+        """Identity of a request for coalescing: everything that shapes the generation."""
+        return json.dumps({
+            "model": self.config.model,
+            "prompt": prompt,
+            "format": format_type,
+            "stream": bool(stream or stop_at_json),
+            "stop_at_json": stop_at_json,
+            "think": self.config.think,
+            "options": self._merged_options(extra_options)
+        }, sort_keys=True, default=str)
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Requests sent upstream and requests served by sharing an in-flight generation."""
+        with self._in_flight_lock:
+            counts = dict(self._coalescing_counts)
+        total = counts["upstream"] + counts["coalesced"]
+        return {
+            "upstream_requests": counts["upstream"],
+            "coalesced_requests": counts["coalesced"],
+            "coalesced_rate": counts["coalesced"] / total if total else 0.0
+        }
+    
+    def hedging_stats(self) -> Dict[str, Any]:
+        """Requests, how many were duplicated and won by the duplicate, and the current hedging delay."""
+        with self._hedge_lock:
+            counts = dict(self._hedge_counts)
+        return {
+            "requests": counts["requests"],
+            "hedged_requests": counts["hedged"],
+            "hedge_wins": counts["hedge_wins"],
+            "hedge_rate": counts["hedged"] / counts["requests"] if counts["requests"] else 0.0,
+            "hedge_win_rate": counts["hedge_wins"] / counts["hedged"] if counts["hedged"] else 0.0,
+            "hedge_delay": self._hedge_delay()
         }
+    
+    def _generate_upstream(
+        self, 
+        prompt: str, 
+        format_type: Optional[str], 
+        stream: bool,
+        stop_at_json: bool,
+        on_field: Optional[Callable[[str, Any], None]],
+        options: Optional[Dict[str, Any]]
+    ) -> GenerationResult:
+        """Send one generation to the server, recording request metrics."""
+        model = self.config.model
+        metrics.requests_in_flight.inc(model=model)
+        timer = Timer()
         
-        for attempt in range(self.config.max_retries):
+        try:
+            generation = self._generate_with_retries(prompt, format_type, stream, stop_at_json, on_field, options)
+        except OllamaTimeoutError:
+            metrics.timeouts_total.inc(model=model)
+            metrics.requests_total.inc(model=model, outcome="timeout")
+            raise
+        except Exception:
+            metrics.requests_total.inc(model=model, outcome="error")
+            raise
+        finally:
+            metrics.requests_in_flight.dec(model=model)
+        
+        metrics.requests_total.inc(model=model, outcome="success")
+        metrics.request_latency.observe(timer.stop(), model=model)
+        if generation.field_times and "intent" in generation.field_times:
+            metrics.time_to_intent.observe(generation.field_times["intent"], model=model)
+        if generation.completion_tokens and generation.eval_duration:
+            metrics.tokens_per_second.observe(generation.completion_tokens / generation.eval_duration, model=model)
+        return generation
+    
+    def _generate_with_retries(
+        self, 
+        prompt: str, 
+        format_type: Optional[str], 
+        stream: bool,
+        stop_at_json: bool = False,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        extra_options: Optional[Dict[str, Any]] = None
+    ) -> GenerationResult: # type: ignore
+        """Run one generation, retrying server errors with exponential backoff."""
+        options = self._merged_options(extra_options)
+        
+        def dispatch() -> GenerationResult:
+            delay = self._hedge_delay() if on_field is None else None
             try:
-                if stream:
-                    return self._generate_stream(prompt, format_type, options)
+                if delay is not None:
+                    return self._generate_hedged(prompt, format_type, options, stop_at_json, delay)
+                timer = Timer()
+                if stream or stop_at_json:
+                    generation = self._generate_stream(prompt, format_type, options, stop_at_json, on_field)
                 else:
-                    return self._generate_blocking(prompt, format_type, options)
+                    generation = self._generate_blocking(prompt, format_type, options)
+                self._observe_latency(timer.stop(), generation, hedged=False)
+                return generation
+            except OllamaTimeoutError:
+                # The caller waited the full timeout; leaving it out would bias the hedging delay low
+                self._observe_latency(float(self.config.timeout), None, hedged=delay is not None)
+                raise
+        
+        for attempt in range(self.config.max_retries):
+            try:
+                try:
+                    generation = dispatch()
+                except ResponseError as e:
+                    if not self._fall_back_to_think_directive(e):
+                        raise
+                    generation = dispatch()
+                if options.get("stop") and generation.done_reason == "stop":
+                    # "stop" is also reported for a natural end, so the repair may hide
+                    # a model that really left the brace out; flagged for reporting
+                    restored = restore_stripped_brace(generation.text)
+                    generation.brace_restored = restored != generation.text
+                    generation.text = restored
+                self._separate_thinking(generation)
+                return generation
                     
             except ResponseError as e:
                 logger.error(f"Ollama error (attempt {attempt + 1}): {e}")
                 if attempt == self.config.max_retries - 1:
                     raise OllamaError(f"Failed after {self.config.max_retries} attempts: {e}")
+                metrics.retries_total.inc(model=self.config.model)
                 time.sleep(2 ** attempt)  # Exponential backoff
+            
+            except OllamaError:
+                raise
                 
             except Exception as e:
                 # Don't log here, let the evaluator handle it
                 raise OllamaError(f"Unexpected error: {e}")
     
-    def _generate_blocking(
+    def _merged_options(self, extra_options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sampling settings, then runtime options, then per-request options."""
+        return {
+            "temperature": self.config.temperature,
+            "top_p": self.config.top_p,
+            **self.config.options,
+            **(extra_options or {})
+        }
+    
+    def _build_payload(
         self, 
         prompt: str, 
         format_type: Optional[str], 
-        options: Dict[str, Any]
-    ) -> str:
-        """Generate non-streaming response with proper timeout."""
+        options: Dict[str, Any],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Request arguments for ollama.generate, including the think setting."""
         payload = {
             "model": self.config.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": options
         }
         
         if format_type:
             payload["format"] = format_type
         
+        think = self.config.think
+        if think is not None:
+            if not self._think_via_prompt:
+                payload["think"] = think
+            elif not think:
+                payload["prompt"] = f"{prompt} {NO_THINK_DIRECTIVE}"
+        return payload
+    
+    def _fall_back_to_think_directive(self, error: ResponseError) -> bool:
+        """Switch to the prompt directive if the server rejected the think option."""
+        if self.config.think is None or self._think_via_prompt or "think" not in str(error).lower():
+            return False
+        logger.warning(f"Server rejected the think option ({error}); falling back to the prompt")
+        self._think_via_prompt = True
+        return True
+    
+    def _separate_thinking(self, generation: GenerationResult) -> None:
+        """Move inline <think> blocks from the answer text to generation.thinking."""
+        thinking, answer = split_thinking(generation.text)
+        if answer == generation.text:
+            return
+        if thinking and self.config.think is False and not self._think_via_prompt:
+            # Older servers ignore the think option instead of rejecting it
+            logger.warning("Server ignored think=false; falling back to the prompt directive")
+            self._think_via_prompt = True
+        generation.text = answer
+        generation.thinking = "\n".join(part for part in (generation.thinking, thinking) if part) or None
+    
+    def _generate_blocking(
+        self, 
+        prompt: str, 
+        format_type: Optional[str], 
+        options: Dict[str, Any]
+    ) -> GenerationResult:
+        """Generate non-streaming response with proper timeout."""
+        payload = self._build_payload(prompt, format_type, options, stream=False)
+        
         logger.info(f"Sending request to model {self.config.model} (timeout: {self.config.timeout}s)...")
-        start_time = time.time()
+        return self._call_with_timeout(lambda: GenerationResult.from_response(self._api.generate(**payload)))
+    
+    def _call_with_timeout(
+        self, 
+        func: Callable[[], GenerationResult], 
+        on_timeout: Optional[Callable[[], None]] = None
+    ) -> GenerationResult:
+        """Run a generation in a worker thread, giving up after the configured timeout."""
+        timer = Timer()
         
         # Use threading to implement timeout
-        result: List[Optional[str]] = [None]
+        result: List[Optional[GenerationResult]] = [None]
         exception: List[Optional[Exception]] = [None]
         
         def target():
             try:
-                response = ollama.generate(**payload)
-                result[0] = response['response']
+                result[0] = func()
             except Exception as e:
                 exception[0] = e
         
@@ -142,11 +537,13 @@ class OllamaClient:
         thread.start()
         thread.join(timeout=self.config.timeout)
         
-        elapsed = time.time() - start_time
+        elapsed = timer.stop()
         
         if thread.is_alive():
+            if on_timeout:
+                on_timeout()
             # Timeout occurred - don't log here, let the evaluator handle it
-            raise OllamaError(f"Request timed out after {self.config.timeout} seconds")
+            raise OllamaTimeoutError(f"Request timed out after {self.config.timeout} seconds")
         
         if exception[0]:
             raise exception[0]
@@ -158,31 +555,193 @@ class OllamaClient:
         logger.info(f"✅ Response received in {elapsed:.2f}s")
         return result[0]
     
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which a request is duplicated, or None while hedging is off or still warming up."""
+        if self.config.hedge_percentile is None:
+            return None
+        with self._hedge_lock:
+            samples = list(self._latencies)
+        if len(samples) < self.config.hedge_min_samples:
+            return None
+        return max(self.config.hedge_min_delay, percentile(samples, self.config.hedge_percentile))
+    
+    def _observe_latency(
+        self, 
+        elapsed: float, 
+        generation: Optional[GenerationResult], 
+        hedged: bool,
+        hedge_won: bool = False
+    ) -> None:
+        """
+        Add the latency the caller saw to the hedging window and mark the result.
+        
+        Timed-out requests have no generation and count at the timeout.
+        """
+        if self.config.hedge_percentile is None:
+            return
+        with self._hedge_lock:
+            self._latencies.append(elapsed)
+            self._hedge_counts["requests"] += 1
+            self._hedge_counts["hedge_wins"] += hedged and hedge_won
+        if generation is None:
+            return
+        generation.hedged = hedged
+        generation.hedge_won = hedge_won if hedged else None
+        if hedged:
+            metrics.hedged_requests_total.inc(model=self.config.model, winner="hedge" if hedge_won else "primary")
+    
+    def _generate_hedged(
+        self, 
+        prompt: str, 
+        format_type: Optional[str], 
+        options: Dict[str, Any],
+        stop_at_json: bool,
+        delay: float
+    ) -> GenerationResult:
+        """
+        Stream the request and send a duplicate if it has not finished after delay seconds.
+        
+        The first attempt to answer wins; the other one is cancelled by closing its
+        connection, even while it waits for its first chunk, so the server stops
+        working on it (the same happens to both on timeout). If the first attempt
+        to finish failed, the other one is awaited instead. Duplicates go to
+        config.hedge_hosts in turn, or to the same server when none are set.
+        """
+        payload = self._build_payload(prompt, format_type, options, stream=True)
+        finished: "queue.Queue" = queue.Queue()
+        attempts: List[_StreamConnection] = []
+        
+        def launch(host: Optional[str]) -> None:
+            index, connection = len(attempts), _StreamConnection(host, self._ssl_context)
+            attempts.append(connection)
+            
+            def attempt():
+                try:
+                    finished.put((index, self._consume_stream(connection, payload, stop_at_json, None), None))
+                except Exception as e:
+                    finished.put((index, None, e))
+            
+            threading.Thread(target=attempt, daemon=True).start()
+        
+        def cancel_all() -> None:
+            for connection in attempts:
+                connection.cancel()
+        
+        def race() -> GenerationResult:
+            # Latency as the caller sees it: a duplicate's win includes the hedging delay
+            timer = Timer()
+            launch(self.config.host)
+            try:
+                index, generation, error = finished.get(timeout=delay)
+            except queue.Empty:
+                with self._hedge_lock:
+                    host = self._hedge_hosts[self._hedge_counts["hedged"] % len(self._hedge_hosts)]
+                    self._hedge_counts["hedged"] += 1
+                launch(host)
+                index, generation, error = finished.get()
+                if error is not None:
+                    index, generation, error = finished.get()
+            elapsed = timer.stop()
+            cancel_all()
+            if error is not None:
+                raise error
+            self._observe_latency(elapsed, generation, hedged=len(attempts) > 1, hedge_won=index > 0)
+            return generation
+        
+        return self._call_with_timeout(race, on_timeout=cancel_all)
+    
     def _generate_stream(
         self, 
         prompt: str, 
         format_type: Optional[str], 
-        options: Dict[str, Any]
-    ) -> str:
-        """Generate streaming response."""
-        payload = {
-            "model": self.config.model,
-            "prompt": prompt,
-            "stream": True,
-            "options": options
-        }
+        options: Dict[str, Any],
+        stop_at_json: bool = False,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> GenerationResult:
+        """
+        Generate streaming response.
         
-        if format_type:
-            payload["format"] = format_type
+        Chunks are fed to a JSONObjectTracker, which parses each top-level field of
+        the answer as soon as it is complete: on_field(key, value) is called and the
+        time since the request started is kept in field_times.
         
-        stream = ollama.generate(**payload)
-        full_response = ""
+        With stop_at_json the stream is closed as soon as the first complete
+        top-level object has arrived, which makes the server stop generating.
+        The text then ends at the closing brace. On timeout the connection is
+        closed as well.
         
-        for chunk in stream:
-            if 'response' in chunk:
-                full_response += chunk['response']
+        Reasoning the server streams separately (think option) is collected in
+        thinking and counted exactly, one token per chunk.
+        """
+        payload = self._build_payload(prompt, format_type, options, stream=True)
+        connection = _StreamConnection(self.config.host, self._ssl_context)
+        return self._call_with_timeout(
+            lambda: self._consume_stream(connection, payload, stop_at_json, on_field),
+            on_timeout=connection.cancel
+        )
+    
+    def _consume_stream(
+        self, 
+        connection: _StreamConnection, 
+        payload: Dict[str, Any], 
+        stop_at_json: bool,
+        on_field: Optional[Callable[[str, Any], None]]
+    ) -> GenerationResult:
+        """
+        Read one streamed generation until it is done, cancelled or (stop_at_json)
+        the JSON is complete, then close its connection.
+        """
+        timer = Timer()
+        field_times: Dict[str, float] = {}
         
-        return full_response
+        def field_done(key: str, value: Any):
+            field_times.setdefault(key, timer.elapsed)
+            if on_field:
+                on_field(key, value)
+        
+        stream = connection.api.generate(**payload)
+        tracker = JSONObjectTracker(on_field=field_done)
+        chunks = 0
+        thinking: List[str] = []
+        last_chunk = None
+        
+        try:
+            for chunk in stream:
+                last_chunk = chunk
+                if connection.cancelled.is_set():
+                    break
+                thought = chunk.get('thinking')
+                if thought:
+                    thinking.append(thought)
+                text = chunk.get('response') or ''
+                if not text:
+                    continue
+                chunks += 1
+                if tracker.feed(text) and stop_at_json:
+                    # The server reports counts on the final chunk only; Ollama streams
+                    # one token per chunk, so the chunk count stands in (prompt_tokens unknown)
+                    return GenerationResult(
+                        text=tracker.text[:tracker.end],
+                        completion_tokens=chunks + len(thinking),
+                        early_terminated=True,
+                        tokens_estimated=True,
+                        field_times=field_times,
+                        thinking="".join(thinking) or None,
+                        thinking_tokens=len(thinking) or None
+                    )
+        finally:
+            stream.close()
+            connection.close()
+        
+        # Token counts and timings are only reported on the final chunk
+        if last_chunk is None or not last_chunk.get('done'):
+            generation = GenerationResult(text=tracker.text)
+        else:
+            generation = GenerationResult.from_response(last_chunk, text=tracker.text)
+        generation.field_times = field_times
+        generation.thinking = "".join(thinking) or None
+        generation.thinking_tokens = len(thinking) or None
+        return generation
     
     def generate_json(self, prompt: str) -> Dict[str, Any]:
         """
@@ -220,6 +779,11 @@ class JSONParseError(OllamaError):
     pass
 
 
+class OllamaTimeoutError(OllamaError):
+    """Exception for requests exceeding the client timeout."""
+    pass
+
+
 def create_client(model: str, **kwargs) -> OllamaClient:
     """Factory function to create configured client."""
     config = OllamaConfig(model=model, **kwargs)
@@ -251,5 +815,186 @@ def test_client():
         logger.error(f"Test failed: {e}")
 
 
+def test_request_coalescing():
+    """Concurrent identical requests reach a local fake Ollama server only once."""
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    calls: List[str] = []
+
+    class FakeOllama(BaseHTTPRequestHandler):
+        def _send(self, body: Dict[str, Any]):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send({"models": [{"name": "fake:1b", "model": "fake:1b"}]})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls.append(request["prompt"])
+            time.sleep(0.3)  # Long enough for every concurrent request to arrive
+            # Streamed or not, the whole answer comes as one message (one NDJSON line when streamed)
+            self._send({"model": request["model"], "created_at": "2025-01-01T00:00:00Z",
+                        "response": f'{{"echo": {len(calls)}}}', "done": True, "done_reason": "stop",
+                        "prompt_eval_count": 12, "eval_count": 5})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        client = OllamaClient(OllamaConfig(model="fake:1b", host=host, coalesce=True))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            texts = list(pool.map(lambda _: client.generate("Who can replace Anna?"), range(8)))
+        assert calls == ["Who can replace Anna?"], calls
+        assert texts == ['{"echo": 1}'] * 8, texts
+        stats = client.coalescing_stats()
+        assert stats["upstream_requests"] == 1 and stats["coalesced_requests"] == 7, stats
+
+        # Different options are a different request, and finished requests are not reused
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda n: client.generate_detailed("Who can replace Anna?", options={"num_predict": n}),
+                          (64, 128)))
+        client.generate("Who can replace Anna?")
+        assert len(calls) == 4, calls
+
+        # Each caller owns its copy, including the field_times of a streamed generation
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            streamed = list(pool.map(lambda _: client.generate_detailed("Who covers Felix?", stream=True), range(3)))
+        assert len(calls) == 5 and all(g.field_times for g in streamed), (calls, streamed)
+        streamed[0].field_times["echo"] = -1.0
+        assert all(g.field_times["echo"] >= 0 for g in streamed[1:]), streamed
+
+        uncoalesced = OllamaClient(OllamaConfig(model="fake:1b", host=host))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: uncoalesced.generate("Who can replace Anna?"), range(4)))
+        assert len(calls) == 9, calls
+    finally:
+        server.shutdown()
+    print("✅ Request coalescing OK: 8 concurrent identical requests, 1 upstream call")
+
+
+def test_request_hedging():
+    """A request stuck past the hedging delay is answered by its duplicate on a local fake Ollama server."""
+    import select
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    calls: List[str] = []
+    stalled: List[str] = []
+    hung_up: List[str] = []
+
+    class FakeOllama(BaseHTTPRequestHandler):
+        def _send(self, body: Dict[str, Any]):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send({"models": [{"name": "fake:1b", "model": "fake:1b"}]})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls.append(request["prompt"])
+            # The first attempt at a "stalled" prompt hangs, as behind a slow batch or a cold load
+            stall = request["prompt"].startswith("stalled") and request["prompt"] not in stalled
+            if stall:
+                stalled.append(request["prompt"])
+                # No headers before the first token, as while Ollama loads the model;
+                # stop early if the client hangs up (the connection turns readable at EOF)
+                if select.select([self.connection], [], [], 1.5)[0] and not self.connection.recv(1):
+                    hung_up.append(request["prompt"])
+                    return
+            chunks = [{"response": token, "done": False} for token in ('{"intent": ', '"replace"', '}')]
+            chunks.append({"response": "", "done": True, "done_reason": "stop",
+                           "prompt_eval_count": 12, "eval_count": 3})
+            if not request.get("stream"):
+                time.sleep(0.03)
+                self._send({**chunks[-1], "model": request["model"], "created_at": "2025-01-01T00:00:00Z",
+                            "response": "".join(chunk["response"] for chunk in chunks)})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for chunk in chunks:
+                    time.sleep(0.01)
+                    line = json.dumps({"model": request["model"], "created_at": "2025-01-01T00:00:00Z", **chunk})
+                    line = line.encode("utf-8") + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client hung up on the losing attempt
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        client = OllamaClient(OllamaConfig(model="fake:1b", host=host, hedge_percentile=95,
+                                           hedge_min_samples=5, hedge_min_delay=0.2))
+        for i in range(5):
+            assert client.generate_detailed(f"Who can replace Anna? ({i})").hedged is False
+        assert client.hedging_stats()["hedge_delay"] == 0.2
+
+        timer = Timer()
+        generation = client.generate_detailed("stalled: Who can replace Anna?")
+        assert timer.stop() < 1.0, timer.elapsed
+        assert generation.text == '{"intent": "replace"}', generation.text
+        assert generation.hedged and generation.hedge_won, generation
+        assert calls.count("stalled: Who can replace Anna?") == 2, calls
+        # The window gets the caller's latency (delay plus the duplicate's time), not the duplicate's alone
+        assert client._latencies[-1] >= 0.2, list(client._latencies)
+        # The losing attempt's connection is closed while it still waits for its first chunk
+        deadline = time.monotonic() + 0.5
+        while not hung_up and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hung_up == ["stalled: Who can replace Anna?"], hung_up
+
+        # A fast request is not duplicated
+        assert client.generate_detailed("Who can replace Anna?").hedged is False
+        stats = client.hedging_stats()
+        assert stats["requests"] == 7 and stats["hedged_requests"] == 1 and stats["hedge_wins"] == 1, stats
+
+        # Timed-out requests count at the timeout
+        impatient = OllamaClient(OllamaConfig(model="fake:1b", host=host, timeout=1, max_retries=1,
+                                              hedge_percentile=95))
+        try:
+            impatient.generate_detailed("stalled: Who covers for Anna?", stream=True)
+            assert False, "expected a timeout"
+        except OllamaTimeoutError:
+            pass
+        assert list(impatient._latencies) == [1.0], list(impatient._latencies)
+        deadline = time.monotonic() + 0.3
+        while len(hung_up) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hung_up[-1] == "stalled: Who covers for Anna?", hung_up
+
+        unhedged = OllamaClient(OllamaConfig(model="fake:1b", host=host))
+        timer = Timer()
+        generation = unhedged.generate_detailed("stalled: Who can take over?", stream=True)
+        assert generation.hedged is None and timer.stop() > 1.0, timer.elapsed
+    finally:
+        server.shutdown()
+    print("✅ Request hedging OK: stalled request answered by its duplicate")
+
+
 if __name__ == "__main__":
+    test_request_coalescing()
+    test_request_hedging()
     test_client()
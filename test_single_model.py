@@ -4,37 +4,67 @@ Tests one model at a time for fair comparison using Ollama client
 """
 
 import argparse
+import random
 import sys
 import os
-from typing import Optional
+from dataclasses import replace
+from typing import Dict, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     # Try relative imports first (when used as module)
-    from .config import get_model_config, get_model_list
-    from .test_cases import get_test_cases, get_test_summary
-    from .model_evaluator import create_evaluator
+    from .config import get_model_config, get_model_list, TEST_CONFIG, EARLY_STOPPING_CONFIG, SELF_CONSISTENCY_CONFIG
+    from .test_cases import test_generator, load_test_cases
+    from .model_evaluator import create_evaluator, EarlyStoppingMonitor
     from .results_manager import save_results
     from .prompt_manager import get_available_variants
     from .test_ollama_library import OllamaError
+    from .profiling import Profiler, PIPELINE_STAGES
+    from .metrics_server import start_metrics_server
+    from .regression import RegressionChecker, print_regression_report
 except ImportError:
     # Fall back to direct imports (when run as script)
-    from config import get_model_config, get_model_list # type: ignore
-    from test_cases import get_test_cases, get_test_summary
-    from model_evaluator import create_evaluator
+    from config import get_model_config, get_model_list, TEST_CONFIG, EARLY_STOPPING_CONFIG, SELF_CONSISTENCY_CONFIG # type: ignore
+    from test_cases import test_generator, load_test_cases
+    from model_evaluator import create_evaluator, EarlyStoppingMonitor
     from results_manager import save_results
     from prompt_manager import get_available_variants
     from test_ollama_library import OllamaError
+    from profiling import Profiler, PIPELINE_STAGES
+    from metrics_server import start_metrics_server
+    from regression import RegressionChecker, print_regression_report
 
-def test_single_model(model_key: str, prompt_variant: str = "production") -> Optional[str]:
+def test_single_model(model_key: str, prompt_variant: str = "production",
+                      cases_file: Optional[str] = None, sample_fraction: Optional[float] = None,
+                      seed: int = TEST_CONFIG["sample_seed"],
+                      stop_against: Optional[Dict[str, float]] = None,
+                      stop_margin: float = EARLY_STOPPING_CONFIG["margin"],
+                      samples_per_case: int = SELF_CONSISTENCY_CONFIG["samples"],
+                      profiler: Optional[Profiler] = None,
+                      stop_at_json: Optional[bool] = None,
+                      stream: Optional[bool] = None,
+                      think: Optional[bool] = None,
+                      hedge: Optional[float] = None) -> Optional[str]:
     """
     Test a single model with specified prompt variant
     
     Args:
         model_key: Model configuration key
         prompt_variant: Prompt variant to use
+        cases_file: Optional JSONL/CSV/Parquet test case file (default: built-in cases)
+        sample_fraction: Run a stratified subset of this size instead of all cases
+        seed: Random seed for the stratified subset (and case order in adaptive mode)
+        stop_against: Best completed run so far ({"intent_accuracy": ..., "json_validity": ...});
+            enables adaptive mode, stopping early if this combination is clearly worse
+        stop_margin: Margin below the best run that triggers an early stop
+        samples_per_case: Concurrent samples per case for self-consistency evaluation
+        profiler: Optional profiler recording per-stage spans
+        stop_at_json: Override the model's early termination after the first complete JSON object
+        stream: Override whether the model's responses are streamed (records time-to-intent)
+        think: Override the model's thinking mode (reasoning models only)
+        hedge: Hedge requests still running after this latency percentile (overrides the model config)
         
     Returns:
         Path to results file if successful, None otherwise
@@ -48,23 +78,58 @@ def test_single_model(model_key: str, prompt_variant: str = "production") -> Opt
     try:
         # Get model configuration
         model_config = get_model_config(model_key)
+        if stop_at_json is not None:
+            model_config = replace(model_config, stop_at_json=stop_at_json)
+        if stream is not None:
+            model_config = replace(model_config, stream=stream)
+        if think is not None:
+            model_config = replace(model_config, think=think)
+        if hedge is not None:
+            model_config = replace(model_config, hedge_percentile=hedge)
         print(f"📋 Model Config: {model_config.description}")
+        if model_config.stop_at_json:
+            print(f"✂️  Early termination: streaming stops after the first complete JSON object")
+        if model_config.think is not None:
+            print(f"🧠 Thinking: {'on' if model_config.think else 'off'}")
+        if model_config.hedge_percentile is not None:
+            print(f"🔁 Hedging: requests still running after p{model_config.hedge_percentile:g} latency are sent again")
         
         # Get test cases
-        test_cases = get_test_cases()
-        test_summary = get_test_summary()
+        generator = load_test_cases(cases_file) if cases_file else test_generator
+        if cases_file:
+            print(f"📂 Test Cases: {cases_file}")
+        test_summary = generator.get_test_summary()
+        
+        if sample_fraction:
+            test_cases = generator.sample_stratified(sample_fraction, seed)
+        else:
+            test_cases = generator.get_all_test_cases()
         
         print(f"\n📊 Test Suite Summary:")
         print(f"   Total Cases: {test_summary['total_cases']}")
         print(f"   Languages: {list(test_summary['by_language'].keys())}")
         print(f"   Difficulties: {list(test_summary['by_difficulty'].keys())}")
         print(f"   Categories: {list(test_summary['by_category'].keys())}")
+        if sample_fraction:
+            print(f"   Stratified Sample: {len(test_cases)} cases ({sample_fraction:.0%}, seed {seed})")
         
         # Create evaluator
-        evaluator = create_evaluator(model_config)
+        evaluator = create_evaluator(model_config, profiler)
+        
+        # Adaptive mode: running accuracy is only a fair estimate if the built-in
+        # category ordering is broken up, so shuffle with the run's seed
+        early_stopping = None
+        if stop_against:
+            test_cases = list(test_cases)
+            random.Random(seed).shuffle(test_cases)
+            early_stopping = EarlyStoppingMonitor(
+                stop_against["intent_accuracy"], stop_against.get("json_validity"), margin=stop_margin
+            )
+            print(f"   Adaptive Mode: stop if clearly below {stop_against['intent_accuracy']:.1%} "
+                  f"intent accuracy (margin {stop_margin:.1%})")
         
         # Run tests
-        results = evaluator.execute_test_suite(test_cases, prompt_variant)
+        results = evaluator.execute_test_suite(test_cases, prompt_variant, early_stopping, samples_per_case)
         
         if not results:
             print("❌ No results generated - model may not be available")
@@ -72,31 +137,98 @@ def test_single_model(model_key: str, prompt_variant: str = "production") -> Opt
         
         # Generate summary statistics
         summary_stats = evaluator.generate_summary_stats(results)
+        if sample_fraction:
+            summary_stats["sampling"] = {
+                "fraction": sample_fraction,
+                "seed": seed,
+                "sampled_cases": len(test_cases),
+                "corpus_cases": test_summary["total_cases"],
+                "sampled_fraction": len(test_cases) / test_summary["total_cases"]
+            }
         
         # Print immediate summary
+        level = summary_stats['confidence_level']
+        json_low, json_high = summary_stats['json_validity_ci']
+        intent_low, intent_high = summary_stats['intent_accuracy_ci']
         print(f"\n📈 Test Results Summary:")
         print(f"   Success Rate: {summary_stats['success_rate']:.1%}")
-        print(f"   JSON Validity: {summary_stats['json_validity_rate']:.1%}")
-        print(f"   Intent Accuracy: {summary_stats['intent_accuracy_rate']:.1%}")
+        print(f"   JSON Validity: {summary_stats['json_validity_rate']:.1%} ({level:.0%} CI {json_low:.1%}-{json_high:.1%})")
+        print(f"   Intent Accuracy: {summary_stats['intent_accuracy_rate']:.1%} ({level:.0%} CI {intent_low:.1%}-{intent_high:.1%})")
         
         if 'timing' in summary_stats:
             timing = summary_stats['timing']
             print(f"   Avg Inference Time: {timing['avg_inference_time']:.2f}s")
             print(f"   Min/Max Time: {timing['min_inference_time']:.2f}s / {timing['max_inference_time']:.2f}s")
+            print(f"   p95/p99 Time: {timing['p95_inference_time']:.2f}s / {timing['p99_inference_time']:.2f}s")
+            if 'avg_time_to_intent' in timing:
+                print(f"   Avg Time to Intent: {timing['avg_time_to_intent']:.2f}s "
+                      f"({timing['avg_intent_lead_time']:.2f}s before the full response)")
         
         if 'confidence' in summary_stats:
             confidence = summary_stats['confidence']
             print(f"   Avg Confidence: {confidence['avg_confidence']:.2f}")
         
+        if 'self_consistency' in summary_stats:
+            consistency = summary_stats['self_consistency']
+            verdict = "worth it" if consistency['majority_vote_justified'] else "not worth it"
+            print(f"\n🗳️  Self-Consistency ({consistency['samples_per_case']} samples per case):")
+            print(f"   Agreement Rate: {consistency['avg_agreement_rate']:.1%} (unanimous {consistency['unanimous_rate']:.1%})")
+            print(f"   Single Sample Accuracy: {consistency['single_sample_accuracy']:.1%}")
+            print(f"   Majority Vote Accuracy: {consistency['majority_vote_accuracy']:.1%} "
+                  f"({consistency['accuracy_gain']:+.1%}, {verdict} at {consistency['cost_multiplier']}x cost)")
+        
+        if 'early_termination' in summary_stats:
+            early = summary_stats['early_termination']
+            saved = f", ~{early['est_tokens_saved']} tokens saved" if early['est_tokens_saved'] is not None else ""
+            print(f"\n✂️  Early Termination: {early['terminated']}/{early['cases']} responses cut after the JSON object{saved}")
+        
+        if 'context_window' in summary_stats:
+            window = summary_stats['context_window']
+            memory = f", model {window['memory_mb']:.0f} MB" if window['memory_mb'] is not None else ""
+            load = f", loaded in {window['load_time']:.2f}s" if window['load_time'] is not None else ""
+            print(f"\n📐 Context Window: {window['num_ctx'] or 'server default'} tokens{memory}{load}")
+        
+        if 'thinking' in summary_stats:
+            thinking = summary_stats['thinking']
+            share = thinking['thinking_token_share']
+            share_text = f" ({share:.0%} of completion tokens)" if share is not None else ""
+            print(f"\n🧠 Thinking: {thinking['avg_thinking_tokens']:.0f} tokens per answer{share_text}, "
+                  f"{thinking['cases_with_thinking']} answers with reasoning")
+        
+        if 'hedging' in summary_stats:
+            hedging = summary_stats['hedging']
+            wins = f", duplicate answered first {hedging['hedge_wins']}x" if hedging['hedged'] else ""
+            print(f"\n🔁 Hedging (p{hedging['hedge_percentile']:g}): {hedging['hedged']}/{hedging['requests']} "
+                  f"requests duplicated{wins}")
+        
+        if 'generation_limits' in summary_stats:
+            limits = summary_stats['generation_limits']
+            caps = ", ".join(f"{variant} {cap}" for variant, cap in limits['num_predict'].items())
+            print(f"\n📏 Output Caps ({caps} tokens): {limits['truncated']}/{limits['cases']} responses truncated")
+            if limits['truncated']:
+                complete = limits['json_validity_complete']
+                versus = f" vs {complete:.1%} complete" if complete is not None else ""
+                print(f"   JSON Validity: {limits['json_validity_truncated']:.1%} truncated{versus}")
+            if limits['brace_restored']:
+                print(f"   Closing brace restored: {limits['brace_restored']} responses (JSON validity "
+                      f"{limits['json_validity']:.1%}, {limits['json_validity_without_restored']:.1%} without them)")
+        
+        if 'stages' in summary_stats:
+            print(f"\n⏱️  Pipeline Stages:")
+            for stage, timing in summary_stats['stages'].items():
+                print(f"   {stage}: {timing['mean_ms']:.3f}ms mean, {timing['p95_ms']:.3f}ms p95 ({timing['count']} spans)")
+        
         # Language breakdown
         print(f"\n🌍 Language Performance:")
         for lang, data in summary_stats['by_language'].items():
-            print(f"   {lang}: {data['accuracy']:.1%} ({data['total']} tests)")
+            low, high = data['accuracy_ci']
+            print(f"   {lang}: {data['accuracy']:.1%} (CI {low:.1%}-{high:.1%}, {data['total']} tests)")
         
         # Difficulty breakdown
         print(f"\n📊 Difficulty Performance:")
         for diff, data in summary_stats['by_difficulty'].items():
-            print(f"   {diff}: {data['accuracy']:.1%} ({data['total']} tests)")
+            low, high = data['accuracy_ci']
+            print(f"   {diff}: {data['accuracy']:.1%} (CI {low:.1%}-{high:.1%}, {data['total']} tests)")
         
         # Save results
         results_file = save_results(model_config.name, prompt_variant, results, summary_stats)
@@ -121,6 +253,10 @@ Examples:
   python test_single_model.py qwen3_4b
   python test_single_model.py deepseek_r1 --prompt multilingual
   python test_single_model.py llama_3_3_8b --prompt chain_of_thought
+  python test_single_model.py gemma3_1b --cases production_utterances.jsonl
+  python test_single_model.py gemma3_1b --sample 0.1 --seed 7
+  python test_single_model.py gemma3_1b --trace trace.json --profile-stage extract_json
+  python test_single_model.py gemma3_1b --check-regression
         """
     )
     
@@ -138,6 +274,114 @@ Examples:
         help="Prompt variant to use (default: production)"
     )
     
+    parser.add_argument(
+        "--cases",
+        metavar="FILE",
+        help="Load test cases from a JSONL/CSV/Parquet file instead of the built-in suite"
+    )
+    
+    parser.add_argument(
+        "--sample",
+        type=float,
+        metavar="FRACTION",
+        help="Run a stratified subset (e.g. 0.1 for a 10%% smoke run) by language, difficulty and category"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=TEST_CONFIG["sample_seed"],
+        help=f"Random seed for --sample (default: {TEST_CONFIG['sample_seed']})"
+    )
+    
+    parser.add_argument(
+        "--stop-below",
+        type=float,
+        metavar="ACCURACY",
+        help="Adaptive mode: stop early once intent accuracy is clearly below this best-known value"
+    )
+    
+    parser.add_argument(
+        "--stop-margin",
+        type=float,
+        default=EARLY_STOPPING_CONFIG["margin"],
+        help=f"Margin for --stop-below (default: {EARLY_STOPPING_CONFIG['margin']})"
+    )
+    
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=SELF_CONSISTENCY_CONFIG["samples"],
+        help="Concurrent samples per case to measure agreement and majority-vote accuracy (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help="Stream responses and record time-to-intent alongside total latency"
+    )
+    
+    parser.add_argument(
+        "--stop-at-json",
+        action="store_true",
+        default=None,
+        help="Stream responses and stop generating after the first complete JSON object"
+    )
+    
+    parser.add_argument(
+        "--think",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Switch reasoning (thinking) on or off for models that support it (default: model config)"
+    )
+    
+    parser.add_argument(
+        "--hedge",
+        type=float,
+        metavar="PERCENTILE",
+        help="Send a duplicate of requests still running after this latency percentile, e.g. 95 (default: model config)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record per-stage spans and write them to FILE"
+    )
+    
+    parser.add_argument(
+        "--trace-format",
+        choices=["chrome", "otlp"],
+        default="chrome",
+        help="Trace file format: Chrome trace events or OpenTelemetry OTLP/JSON (default: chrome)"
+    )
+    
+    parser.add_argument(
+        "--profile-stage",
+        choices=PIPELINE_STAGES,
+        help="Capture a call profile of one pipeline stage"
+    )
+    
+    parser.add_argument(
+        "--profile-backend",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="Call profiler for --profile-stage (pyinstrument must be installed)"
+    )
+    
+    parser.add_argument(
+        "--check-regression",
+        action="store_true",
+        help="Compare the run against the stored baseline and exit non-zero on regression"
+    )
+    
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve live Prometheus-style metrics on http://127.0.0.1:PORT/metrics during the run"
+    )
+    
     parser.add_argument(
         "--list-models",
         action="store_true",
@@ -171,7 +415,42 @@ Examples:
         parser.error("Model argument is required when not using --list-models or --list-prompts")
     
     # Run test
-    result_file = test_single_model(args.model, args.prompt)
+    stop_against = {"intent_accuracy": args.stop_below} if args.stop_below is not None else None
+    profiler = None
+    if args.trace or args.profile_stage:
+        try:
+            profiler = Profiler(profile_stage=args.profile_stage, profile_backend=args.profile_backend)
+        except ImportError as e:
+            parser.error(str(e))
+    
+    if args.metrics_port is not None:
+        server = start_metrics_server(args.metrics_port)
+        print(f"📡 Live metrics at {server.url}")
+    
+    result_file = test_single_model(args.model, args.prompt, args.cases, args.sample, args.seed,
+                                    stop_against, args.stop_margin, args.samples, profiler,
+                                    args.stop_at_json, args.stream, args.think, args.hedge)
+    
+    if profiler and args.trace:
+        if args.trace_format == "otlp":
+            profiler.export_otlp_json(args.trace)
+        else:
+            profiler.export_chrome_trace(args.trace)
+        print(f"🧵 Trace written to: {args.trace}")
+    
+    if profiler and args.profile_stage:
+        report = profiler.profile_report()
+        if report:
+            print(f"\n🔬 Profile of stage '{args.profile_stage}':")
+            print(report)
+    
+    if result_file and args.check_regression:
+        report = RegressionChecker().check_file(result_file)
+        if report:
+            print_regression_report(report)
+            if report["regressions"]:
+                print(f"\n❌ Performance regression against baseline!")
+                sys.exit(1)
     
     if result_file:
         print(f"\n🎉 Test completed successfully!")
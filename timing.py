@@ -0,0 +1,81 @@
+"""
+Timing utilities for OdyTest - Model Evaluation Suite
+Monotonic high-resolution clock with wall-clock anchored timestamps
+"""
+
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+# Unix time at which the monotonic clock read zero, fixed once per process so
+# timestamps derived from perf_counter stay consistent when NTP adjusts the
+# system clock during long sweeps
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+def monotonic() -> float:
+    """Monotonic high-resolution clock reading in seconds"""
+    return time.perf_counter()
+
+def monotonic_ns() -> int:
+    """Monotonic high-resolution clock reading in nanoseconds"""
+    return time.perf_counter_ns()
+
+def to_unix(monotonic_time: float) -> float:
+    """Convert a monotonic() reading to a Unix timestamp in seconds"""
+    return monotonic_time + _EPOCH_OFFSET_NS / 1e9
+
+def to_unix_ns(monotonic_time_ns: int) -> int:
+    """Convert a monotonic_ns() reading to a Unix timestamp in nanoseconds"""
+    return monotonic_time_ns + _EPOCH_OFFSET_NS
+
+class Timer:
+    """Measures an interval on the monotonic clock and remembers when it started"""
+    
+    def __init__(self):
+        self.start = monotonic()
+        self.end: Optional[float] = None
+    
+    def stop(self) -> float:
+        """Stop the timer and return the elapsed seconds"""
+        self.end = monotonic()
+        return self.elapsed
+    
+    @property
+    def elapsed(self) -> float:
+        """Elapsed seconds, up to now if the timer is still running"""
+        return (self.end if self.end is not None else monotonic()) - self.start
+    
+    @property
+    def start_timestamp(self) -> float:
+        """Unix timestamp of the start, derived from the monotonic clock"""
+        return to_unix(self.start)
+    
+    def __enter__(self) -> "Timer":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def summarize_timeline(intervals: Iterable[Tuple[float, float]]) -> Optional[Dict[str, Any]]:
+    """
+    Reconstruct suite timing from (start_timestamp, duration) pairs
+    
+    Returns true wall-clock span, summed request time, achieved throughput and
+    average concurrency (summed / wall-clock), or None without intervals.
+    """
+    intervals = list(intervals)
+    if not intervals:
+        return None
+    
+    first_start = min(start for start, _ in intervals)
+    last_end = max(start + duration for start, duration in intervals)
+    wall_clock = last_end - first_start
+    summed = sum(duration for _, duration in intervals)
+    
+    return {
+        "first_request_start": first_start,
+        "last_request_end": last_end,
+        "wall_clock_time": wall_clock,
+        "summed_request_time": summed,
+        "throughput_rps": len(intervals) / wall_clock if wall_clock > 0 else None,
+        "avg_concurrency": summed / wall_clock if wall_clock > 0 else None
+    }
@@ -0,0 +1,251 @@
+"""
+Runtime Tuning for OdyTest - Model Evaluation Suite
+Grid-searches Ollama runtime options and quantization tags per model
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import os
+from dataclasses import MISSING, asdict, fields, replace
+from typing import Dict, Any, List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    # Try relative imports first (when used as module)
+    from .config import ModelConfig, get_model_config, get_model_list, RUNTIME_TUNING_CONFIG, TEST_CONFIG
+    from .test_cases import TestCase, test_generator
+    from .prompt_manager import get_available_variants
+    from .model_evaluator import create_evaluator
+    from .results_manager import results_manager
+    from .resource_monitor import running_model_memory, unload_model
+    from .stats_utils import latency_percentiles, pareto_front
+except ImportError:
+    # Fall back to direct imports (when run as script)
+    from config import ModelConfig, get_model_config, get_model_list, RUNTIME_TUNING_CONFIG, TEST_CONFIG # type: ignore
+    from test_cases import TestCase, test_generator
+    from prompt_manager import get_available_variants
+    from model_evaluator import create_evaluator
+    from results_manager import results_manager
+    from resource_monitor import running_model_memory, unload_model
+    from stats_utils import latency_percentiles, pareto_front
+
+OBJECTIVES = {"p50_latency": "min", "tokens_per_second": "max", "memory_mb": "min", "intent_accuracy": "max"}
+
+class RuntimeTuner:
+    """
+    Runs a sample of the test suite under each combination of runtime options
+
+    Every candidate starts from a cold load (the model is unloaded first), so
+    load time and the memory reported by the server's running-models list
+    reflect that candidate's num_ctx/num_batch rather than a previous one's.
+    """
+
+    def __init__(self, model_config: ModelConfig, prompt_variant: str = "production",
+                 test_cases: Optional[List[TestCase]] = None):
+        self.model_config = model_config
+        self.prompt_variant = prompt_variant
+        self.test_cases = test_cases or test_generator.sample_stratified(
+            RUNTIME_TUNING_CONFIG["sample_fraction"], TEST_CONFIG["sample_seed"])
+
+    def candidates(self, grid: Dict[str, List[Optional[int]]] = RUNTIME_TUNING_CONFIG["grid"],
+                   tags: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Model tag and runtime options of every grid point; None values are left to the server"""
+        names = list(grid)
+        candidates = [{"model_name": self.model_config.name, "runtime_options": dict(self.model_config.runtime_options)}]
+        for model_name in [self.model_config.name] + list(tags or []):
+            for values in itertools.product(*(grid[name] for name in names)):
+                options = dict(self.model_config.runtime_options)
+                options.update({name: value for name, value in zip(names, values) if value is not None})
+                candidate = {"model_name": model_name, "runtime_options": options}
+                if candidate not in candidates:
+                    candidates.append(candidate)
+        return candidates
+
+    def run_candidate(self, model_name: str, runtime_options: Dict[str, Any]) -> Dict[str, Any]:
+        """Load the model with the given options and run the sampled test cases"""
+        config = replace(self.model_config, name=model_name, runtime_options=runtime_options)
+        label = ", ".join(f"{k}={v}" for k, v in runtime_options.items()) or "server defaults"
+        print(f"   🔧 {model_name} ({label})")
+
+        unload_model(model_name)
+        evaluator = create_evaluator(config)
+        result = {"model_name": model_name, "runtime_options": runtime_options}
+        try:
+            warmup = evaluator.ollama_client.generate_detailed("Test", options={"num_predict": 1})
+        except Exception as e:
+            print(f"      ❌ {e}")
+            return {**result, "error": str(e)}
+
+        results = [evaluator.execute_test_case(case, self.prompt_variant) for case in self.test_cases]
+        answered = [r for r in results if r.success]
+        memory = running_model_memory(model_name)
+        # Server-side decode speed; client wall time would add prompt eval and
+        # queueing and mostly repeat the latency objective
+        timed = [r for r in answered if r.completion_tokens and r.eval_duration]
+        generation_time = sum(r.eval_duration for r in timed)
+
+        latency = latency_percentiles([r.inference_time for r in answered])
+        result.update({
+            "load_time": warmup.load_duration,
+            "memory": memory,
+            "memory_mb": memory["size_mb"] if memory else None,
+            "latency": latency,
+            "p50_latency": latency["p50"] if latency else None,
+            "tokens_per_second": sum(r.completion_tokens for r in timed) / generation_time if generation_time else None,
+            "intent_accuracy": sum(r.intent_match for r in results) / len(results),
+            "json_validity": sum(r.json_validity for r in results) / len(results),
+            "error_rate": (len(results) - len(answered)) / len(results)
+        })
+        if latency:
+            print(f"      p50 {latency['p50']:.2f}s, accuracy {result['intent_accuracy']:.1%}, "
+                  f"memory {result['memory_mb'] or 0:.0f} MB, load {result['load_time'] or 0:.2f}s")
+        return result
+
+    def recommend(self, results: List[Dict[str, Any]],
+                  max_accuracy_drop: float = RUNTIME_TUNING_CONFIG["max_accuracy_drop"]) -> Dict[str, Any]:
+        """
+        Mark the Pareto-optimal candidates and pick one
+
+        The pick is the fastest (then smallest) Pareto-optimal candidate whose
+        accuracy is within max_accuracy_drop of the most accurate candidate.
+        """
+        measured = [r for r in results if r.get("p50_latency") is not None and r.get("tokens_per_second")]
+        if not measured:
+            return {"pareto_optimal": [], "recommended": None}
+
+        # Memory is only comparable when the server reported it for every candidate
+        objectives = {key: direction for key, direction in OBJECTIVES.items()
+                      if all(r[key] is not None for r in measured)}
+        front = [measured[i] for i in pareto_front(measured, objectives)]
+        for result in results:
+            result["pareto_optimal"] = any(result is point for point in front)
+
+        best_accuracy = max(r["intent_accuracy"] for r in measured)
+        eligible = [r for r in front if r["intent_accuracy"] >= best_accuracy - max_accuracy_drop]
+        recommended = min(eligible, key=lambda r: (r["p50_latency"], r["memory_mb"] or 0))
+        return {"pareto_optimal": front, "recommended": recommended}
+
+    def run(self, grid: Dict[str, List[Optional[int]]] = RUNTIME_TUNING_CONFIG["grid"],
+            tags: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Evaluate every candidate and derive the recommended ModelConfig"""
+        results = [self.run_candidate(c["model_name"], c["runtime_options"]) for c in self.candidates(grid, tags)]
+        choice = self.recommend(results)
+        recommended = choice["recommended"]
+        baseline = results[0]
+
+        report = {
+            "model_name": self.model_config.name,
+            "prompt_variant": self.prompt_variant,
+            "test_cases": len(self.test_cases),
+            "candidates": results,
+            "baseline": baseline,
+            "recommended": recommended,
+            "recommended_config": None
+        }
+        if recommended:
+            report["recommended_config"] = asdict(replace(
+                self.model_config, name=recommended["model_name"], runtime_options=recommended["runtime_options"]
+            ))
+        return report
+
+def format_model_config(model_key: str, config: Dict[str, Any]) -> str:
+    """MODEL_CONFIGS entry for a config dict, omitting fields left at their defaults"""
+    lines = []
+    for f in fields(ModelConfig):
+        value = config[f.name]
+        if (f.default is not MISSING and f.default == value) or (f.name == "runtime_options" and not value):
+            continue
+        text = json.dumps(value, ensure_ascii=False) if isinstance(value, (str, dict)) else repr(value)
+        lines.append(f"        {f.name}={text}")
+    return f'    "{model_key}": ModelConfig(\n' + ",\n".join(lines) + "\n    ),"
+
+def print_tuning_report(model_key: str, report: Dict[str, Any]):
+    """Print every candidate, the Pareto front and the recommended config"""
+    print(f"\n📈 {report['model_name']} ({report['prompt_variant']}, {report['test_cases']} cases)")
+    print(f"   {'model':<28} {'options':<34} {'p50':>6} {'tok/s':>6} {'MB':>7} {'load':>6} {'acc':>6}")
+    for result in report["candidates"]:
+        options = ", ".join(f"{k}={v}" for k, v in result["runtime_options"].items()) or "defaults"
+        if "error" in result or result.get("p50_latency") is None:
+            print(f"   {result['model_name']:<28} {options:<34} failed")
+            continue
+        marker = " ★" if result.get("pareto_optimal") else ""
+        memory = f"{result['memory_mb']:>7.0f}" if result["memory_mb"] is not None else f"{'-':>7}"
+        print(f"   {result['model_name']:<28} {options:<34} {result['p50_latency']:>5.2f}s "
+              f"{result['tokens_per_second'] or 0:>6.1f} {memory} {result['load_time'] or 0:>5.2f}s "
+              f"{result['intent_accuracy']:>6.1%}{marker}")
+
+    if not report["recommended_config"]:
+        print(f"   ⚠️  No candidate completed")
+        return
+    baseline, recommended = report["baseline"], report["recommended"]
+    if baseline.get("p50_latency"):
+        print(f"   ✅ Recommended: p50 {recommended['p50_latency']:.2f}s vs {baseline['p50_latency']:.2f}s with defaults")
+    print(format_model_config(model_key, report["recommended_config"]))
+
+def main():
+    """Main entry point for the runtime options grid search"""
+
+    parser = argparse.ArgumentParser(
+        description="Grid-search Ollama runtime options and quantization tags per model",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python tune_runtime.py gemma3_1b
+  python tune_runtime.py qwen3_0_6b --num-ctx 1024 2048 --num-thread 4 8 --num-batch 64 128
+  python tune_runtime.py gemma3_1b --tags gemma3:1b-it-q4_K_M gemma3:1b-it-q8_0 --sample 0.5
+        """
+    )
+
+    # No choices: Python < 3.12 rejects an empty list against them
+    parser.add_argument("models", nargs="*", metavar="MODEL",
+                        help=f"Models to tune: {', '.join(get_model_list())} (default: all)")
+    parser.add_argument(
+        "--prompt",
+        choices=list(get_available_variants().keys()),
+        default="production",
+        help="Prompt variant to render test cases with (default: production)"
+    )
+    for option in RUNTIME_TUNING_CONFIG["grid"]:
+        parser.add_argument(
+            f"--{option.replace('_', '-')}",
+            dest=option,
+            nargs="+",
+            type=int,
+            help=f"Values of {option} to try (default: {RUNTIME_TUNING_CONFIG['grid'][option]}, None = server default)"
+        )
+    parser.add_argument("--tags", nargs="+", help="Alternative quantization tags to try (default: from config)")
+    parser.add_argument("--no-tags", action="store_true", help="Only tune the configured model tag")
+    parser.add_argument(
+        "--sample",
+        type=float,
+        default=RUNTIME_TUNING_CONFIG["sample_fraction"],
+        help=f"Stratified fraction of test cases per candidate (default: {RUNTIME_TUNING_CONFIG['sample_fraction']})"
+    )
+    parser.add_argument("--seed", type=int, default=TEST_CONFIG["sample_seed"], help="Random seed for the sample")
+
+    args = parser.parse_args()
+    unknown = [model for model in args.models if model not in get_model_list()]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+
+    grid = {option: getattr(args, option) or values for option, values in RUNTIME_TUNING_CONFIG["grid"].items()}
+    test_cases = test_generator.sample_stratified(args.sample, args.seed)
+
+    print(f"\n🚀 OdyTest - Runtime Tuning")
+    print("=" * 60)
+
+    for model_key in args.models or get_model_list():
+        model_config = get_model_config(model_key)
+        tags = [] if args.no_tags else args.tags or RUNTIME_TUNING_CONFIG["quantization_tags"].get(model_key, [])
+        report = RuntimeTuner(model_config, args.prompt, test_cases).run(grid, tags)
+        print_tuning_report(model_key, report)
+        results_manager.save_benchmark_results("runtime_tuning", model_config.name, report)
+
+    print(f"\n💡 Paste the recommended entries into MODEL_CONFIGS in config.py")
+
+if __name__ == "__main__":
+    main()